@@ -0,0 +1,171 @@
+# Copyright (C) 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks running many commands with --batch.
+
+The processes benchmark runs the same commands for a small CLI once with a
+fresh interpreter per command, as a job scheduler shelling out to the CLI
+would, and once as a single --batch run reading them from stdin.
+
+The jobs benchmark runs a batch of commands that wait, as if on I/O, and a
+batch of commands that compute, one at a time and with --jobs in a pool of
+threads and in a pool of processes.
+
+The map benchmark applies a command to each line of stdin, once with a fresh
+interpreter per line, as xargs -n1 would, once as a --batch of commands and
+once with --map.
+
+Usage: python -m benchmarks.batch_benchmark processes [--commands=200]
+       python -m benchmarks.batch_benchmark jobs [--commands=64] [--jobs=8]
+       python -m benchmarks.batch_benchmark map [--lines=200]
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+import time
+
+import mock
+import six
+import strictfire
+from strictfire import core
+from strictfire import parser
+
+CLI = '''
+import strictfire
+
+
+class Calculator(object):
+  """A calculator."""
+
+  def add(self, x, y):
+    """Adds x and y."""
+    return x + y
+
+
+strictfire.StrictFire(Calculator(), name='calculator')
+'''
+
+
+def _Run(args, stdin=None):
+  repository = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+  env = dict(os.environ)
+  env['PYTHONPATH'] = os.pathsep.join([repository, env.get('PYTHONPATH', '')])
+  # Run from the repository's parent so that the current directory does not
+  # shadow PYTHONPATH.
+  process = subprocess.Popen([sys.executable, '-c', CLI] + args, env=env,
+                             cwd=os.path.dirname(repository),
+                             stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+  stdout, _ = process.communicate(stdin)
+  return stdout
+
+
+def Processes(commands=200):
+  """Runs commands additions in separate processes and in one batch."""
+  lines = ['add {} {}'.format(index, index) for index in range(commands)]
+
+  start = time.time()
+  for line in lines:
+    _Run(line.split())
+  separate = time.time() - start
+
+  start = time.time()
+  _Run(['--', '--batch', '-', '--batch-format', 'json'],
+       stdin='\n'.join(lines).encode())
+  batch = time.time() - start
+
+  print('{commands} commands'.format(commands=commands))
+  print('  separate processes: {:.3f}s'.format(separate))
+  print('               batch: {:.3f}s ({:.0f}x)'.format(batch,
+                                                         separate / batch))
+
+
+def Map(lines=200):
+  """Adds 1 to lines numbers in separate processes, a batch and a map."""
+  numbers = [str(index) for index in range(lines)]
+  stdin = ''.join(number + '\n' for number in numbers).encode()
+
+  start = time.time()
+  for number in numbers:
+    _Run(['add', '1', number])
+  separate = time.time() - start
+
+  start = time.time()
+  _Run(['--', '--batch', '-'],
+       stdin=''.join('add 1 {}\n'.format(number) for number in numbers)
+       .encode())
+  batch = time.time() - start
+
+  start = time.time()
+  _Run(['add', '1', '--', '--map', 'y'], stdin=stdin)
+  mapped = time.time() - start
+
+  print('{lines} lines'.format(lines=lines))
+  print('  separate processes: {:.3f}s'.format(separate))
+  print('               batch: {:.3f}s ({:.0f}x)'.format(batch, separate / batch))
+  print('                 map: {:.3f}s ({:.0f}x)'.format(mapped,
+                                                         separate / mapped))
+
+
+class Workload(object):
+  """Commands that wait and commands that compute."""
+
+  def wait(self, seconds):
+    time.sleep(seconds)
+    return seconds
+
+  def compute(self, count):
+    return sum(index * index for index in range(count))
+
+
+def _RunBatch(lines, flags):
+  """Returns how long StrictFire takes to run lines as a batch with flags."""
+  stdin = six.StringIO(''.join(line + '\n' for line in lines))
+  start = time.time()
+  with mock.patch.object(sys, 'stdin', stdin):
+    with mock.patch.object(sys, 'stdout', six.StringIO()):
+      core.StrictFire(Workload(), command=['--', '--batch', '-'] + flags)
+  return time.time() - start
+
+
+def Parallel(commands=64, jobs=8):
+  """Runs batches of commands sequentially and with --jobs in both pools."""
+  batches = (
+      ('wait', ['wait 0.01'] * commands),
+      ('compute', ['compute 200000'] * commands),
+  )
+  for label, lines in batches:
+    sequential = _RunBatch(lines, [])
+    print('{label}: {commands} commands'.format(label=label, commands=commands))
+    print('  sequential: {:.3f}s'.format(sequential))
+    for pool in parser.BATCH_POOLS:
+      elapsed = _RunBatch(
+          lines, ['--jobs', str(jobs), '--batch-pool', pool])
+      print('  {pool:>7} x{jobs}: {elapsed:.3f}s ({speedup:.1f}x)'.format(
+          pool=pool, jobs=jobs, elapsed=elapsed,
+          speedup=sequential / elapsed))
+
+
+def main():
+  strictfire.StrictFire(
+      {'processes': Processes, 'jobs': Parallel, 'map': Map},
+      name='batch_benchmark')
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,108 @@
+# Copyright (C) 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks classifying the members of modules as groups, commands or values.
+
+Each module is synthesized with the given number of members: functions,
+classes, ints, and instances of classes with and without a custom __str__.
+Their members are classified the way help screens used to, calling IsGroup,
+IsCommand and IsValue separately without caching HasCustomStr, and with
+value_types.Classify. The help screen for the whole module is timed too.
+
+Usage: python -m benchmarks.classification_benchmark [--sizes=1000,10000]
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import inspect
+import timeit
+import types
+
+import strictfire
+from strictfire import helptext
+from strictfire import inspectutils
+from strictfire import value_types
+
+
+def _MakeClass(index, custom_str):
+  namespace = {'method': lambda self: index}
+  if custom_str:
+    namespace['__str__'] = lambda self: 'instance {}'.format(index)
+  return type('Class{}'.format(index), (object,), namespace)
+
+
+def Module(size, distinct_classes=50):
+  """Returns a module with size members of various kinds."""
+  module = types.ModuleType('synthetic')
+  classes = [_MakeClass(index, index % 2) for index in range(distinct_classes)]
+  for index in range(size):
+    kind = index % 4
+    if kind == 0:
+      member = lambda x, index=index: x + index
+    elif kind == 1:
+      member = classes[index % distinct_classes]
+    elif kind == 2:
+      member = index
+    else:
+      member = classes[index % distinct_classes]()
+    setattr(module, 'member{}'.format(index), member)
+  return module
+
+
+def _UncachedHasCustomStr(component):
+  class_attrs = inspectutils.GetClassAttrsDict(type(component)) or {}
+  str_attr = class_attrs.get('__str__')
+  return bool(str_attr and str_attr.defining_class is not object)
+
+
+def _UncachedIsValue(component):
+  return (isinstance(component, value_types.VALUE_TYPES)
+          or _UncachedHasCustomStr(component))
+
+
+def _SeparatePredicates(members):
+  for _, member in members:
+    # IsGroup(member) checks whether member is a command and a value too.
+    not value_types.IsCommand(member) and not _UncachedIsValue(member)  # pylint: disable=expression-not-assigned
+    value_types.IsCommand(member)
+    _UncachedIsValue(member)
+
+
+def _Classify(members):
+  for _, member in members:
+    value_types.Classify(member)
+
+
+def Benchmark(sizes=(1000, 10000)):
+  """Classifies the members of modules with the given numbers of members."""
+  for size in sizes:
+    module = Module(size)
+    members = inspect.getmembers(module)
+    separate = timeit.timeit(lambda: _SeparatePredicates(members), number=1)  # pylint: disable=cell-var-from-loop
+    classify = timeit.timeit(lambda: _Classify(members), number=1)  # pylint: disable=cell-var-from-loop
+    help_screen = timeit.timeit(lambda: helptext.HelpText(module), number=1)  # pylint: disable=cell-var-from-loop
+    print('{size:>6} members: predicates {separate:.3f}s, '
+          'Classify {classify:.3f}s, help screen {help_screen:.3f}s'.format(
+              size=size, separate=separate, classify=classify,
+              help_screen=help_screen))
+
+
+def main():
+  strictfire.StrictFire(Benchmark, name='classification_benchmark')
+
+
+if __name__ == '__main__':
+  main()
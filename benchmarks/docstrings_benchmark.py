@@ -0,0 +1,120 @@
+# Copyright (C) 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks docstring parsing.
+
+The corpus benchmark parses the docstrings of the standard library modules
+below and of their classes, functions and methods, including inherited ones, in
+the order help screens would encounter them. It is parsed repeatedly, once
+without the cache of docstrings.parse and once with it.
+
+The large benchmark parses single, very large docstrings mixing Google, numpy
+and RST sections, to check that parsing time grows linearly with their length.
+
+Usage: python -m benchmarks.docstrings_benchmark corpus [--rounds=5]
+       python -m benchmarks.docstrings_benchmark large [--args=1000,10000,100000]
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import importlib
+import inspect
+import timeit
+
+import strictfire
+from strictfire import docstrings
+from strictfire import inspectutils
+
+MODULES = ('argparse', 'collections', 'datetime', 'decimal', 'email.message',
+           'json', 'logging', 'os', 'pathlib', 'subprocess', 'textwrap',
+           'threading', 'unittest')
+
+
+def Corpus(modules=MODULES):
+  """Returns the docstrings of modules and their members, with repetitions."""
+  corpus = []
+  for module_name in modules:
+    module = importlib.import_module(module_name)
+    corpus.append(inspect.getdoc(module))
+    for _, member in inspectutils.GetStaticMembers(module):
+      if inspect.isclass(member):
+        corpus.extend(
+            inspect.getdoc(attribute.descriptor
+                           if inspectutils.IsUnevaluatedDescriptor(attribute)
+                           else attribute)
+            for _, attribute in inspectutils.GetStaticMembers(member))
+      corpus.append(inspect.getdoc(member))
+  return [docstring for docstring in corpus if docstring]
+
+
+def LargeDocstring(count):
+  """Returns a docstring documenting count args in each of several styles."""
+  lines = ['Summary of a very large docstring.', '', 'A description.', '',
+           'Args:']
+  for index in range(count):
+    lines.append('  arg{index} (int): Describes arg{index}.'.format(index=index))
+    lines.append('    It continues: on a second line.')
+  lines.extend(['', 'Returns:', '  A value.', '', 'Parameters', '----------'])
+  for index in range(count):
+    lines.append('x{index}, y{index} : int'.format(index=index))
+    lines.append('    Describes x{index} and y{index}.'.format(index=index))
+  for index in range(count):
+    lines.append(':param str z{index}: Describes z{index}.'.format(index=index))
+    lines.append(':type z{index}: str'.format(index=index))
+  return '\n'.join(lines)
+
+
+def Large(args=(1000, 10000, 100000)):
+  """Parses very large docstrings, documenting the given numbers of args."""
+  for count in args:
+    docstring = LargeDocstring(count)
+    elapsed = timeit.timeit(
+        lambda: docstrings._parse(docstring),  # pylint: disable=protected-access,cell-var-from-loop
+        number=1)
+    lines = docstring.count('\n') + 1
+    print('{lines:>8} lines: {elapsed:.3f}s ({rate:.2f}us/line)'.format(
+        lines=lines, elapsed=elapsed, rate=elapsed / lines * 1e6))
+
+
+def Cache(rounds=5):
+  """Parses the corpus rounds times, without and with the cache."""
+  corpus = Corpus()
+  print('corpus: {count} docstrings, {distinct} distinct'.format(
+      count=len(corpus), distinct=len(set(corpus))))
+
+  uncached = timeit.timeit(
+      lambda: [docstrings._parse(d) for d in corpus],  # pylint: disable=protected-access
+      number=rounds)
+  docstrings.cache_clear()
+  cached = timeit.timeit(lambda: [docstrings.parse(d) for d in corpus],
+                         number=rounds)
+  info = docstrings.cache_info()
+  docstrings.cache_clear()
+  bulk = timeit.timeit(lambda: docstrings.parse_many(corpus), number=rounds)
+
+  print('  uncached: {:.3f}s'.format(uncached))
+  print('    cached: {:.3f}s ({:.1%} hits, {} entries)'.format(
+      cached, info.hits / (info.hits + info.misses), info.currsize))
+  print('parse_many: {:.3f}s'.format(bulk))
+
+
+def main():
+  strictfire.StrictFire({'corpus': Cache, 'large': Large},
+                        name='docstrings_benchmark')
+
+
+if __name__ == '__main__':
+  main()
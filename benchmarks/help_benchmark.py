@@ -0,0 +1,92 @@
+# Copyright (C) 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks how soon help screens for large groups start being shown.
+
+Each group is a synthesized module with the given number of documented
+commands. Its help screen is shown through core.Display, the way Fire shows it,
+to an output stream that records when it is first written to and when the
+whole screen has been written. The help cache is bypassed, so each screen is
+rendered from scratch.
+
+Usage: python -m benchmarks.help_benchmark [--sizes=1000,10000]
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import timeit
+import types
+
+import strictfire
+from strictfire import core
+from strictfire import docstrings
+from strictfire import helptext
+
+
+class _TimedOutput(object):
+  """An output stream recording when it is first written to."""
+
+  def __init__(self):
+    self.first_write = None
+
+  def write(self, text):  # pylint: disable=unused-argument
+    if self.first_write is None:
+      self.first_write = timeit.default_timer()
+
+  def flush(self):
+    pass
+
+
+def _MakeCommand(index):
+  def command(count=1):
+    return count * index
+  command.__name__ = 'command{}'.format(index)
+  command.__doc__ = """Runs command {index}.
+
+  Args:
+    count: How many times to run command {index}.
+  """.format(index=index)
+  return command
+
+
+def Group(size):
+  """Returns a module with size documented commands."""
+  module = types.ModuleType('synthetic', 'A synthetic group of commands.')
+  for index in range(size):
+    setattr(module, 'command{}'.format(index), _MakeCommand(index))
+  return module
+
+
+def Benchmark(sizes=(1000, 10000)):
+  """Shows the help screens of groups with the given numbers of commands."""
+  for size in sizes:
+    group = Group(size)
+    docstrings.cache_clear()
+    out = _TimedOutput()
+    start = timeit.default_timer()
+    core.Display([helptext.HelpTextChunks(group)], out=out)
+    end = timeit.default_timer()
+    print('{size:>6} commands: first line after {first:.4f}s, '
+          'whole screen after {whole:.3f}s'.format(
+              size=size, first=out.first_write - start, whole=end - start))
+
+
+def main():
+  strictfire.StrictFire(Benchmark, name='help_benchmark')
+
+
+if __name__ == '__main__':
+  main()
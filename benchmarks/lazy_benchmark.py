@@ -0,0 +1,118 @@
+# Copyright (C) 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks the imports done by a CLI that aggregates many subsystems.
+
+Compares passing Fire a dict of imported subsystem modules against passing a
+LazyGroup naming them. Each configuration runs in a fresh interpreter, which
+reports how many subsystem modules it imported and how long the command took.
+
+Usage: python -m benchmarks.lazy_benchmark [--subsystems=60] [--import-cost=0.02]
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import strictfire
+
+PACKAGE = 'lazy_benchmark_subsystems'
+
+SUBSYSTEM_TEMPLATE = '''
+import time
+
+time.sleep({import_cost})  # Simulates an expensive import.
+
+
+def main():
+  return {index}
+'''
+
+EAGER_TEMPLATE = '''
+import importlib
+import strictfire
+group = {{name: importlib.import_module('{package}.' + name) for name in {names}}}
+'''
+
+LAZY_TEMPLATE = '''
+import strictfire
+group = strictfire.LazyGroup(
+    {{name: '{package}.' + name for name in {names}}})
+'''
+
+RUN_TEMPLATE = '''
+import sys
+import time
+start = time.time()
+{setup}
+strictfire.StrictFire(group, command=['{command}', 'main'])
+elapsed = time.time() - start
+imported = [name for name in sys.modules if name.startswith('{package}.')]
+sys.stderr.write('%d %f\\n' % (len(imported), elapsed))
+'''
+
+
+def _CreateSubsystems(directory, subsystems, import_cost):
+  package_directory = os.path.join(directory, PACKAGE)
+  os.mkdir(package_directory)
+  open(os.path.join(package_directory, '__init__.py'), 'w').close()
+  names = []
+  for index in range(subsystems):
+    name = 'subsystem{index}'.format(index=index)
+    with open(os.path.join(package_directory, name + '.py'), 'w') as f:
+      f.write(SUBSYSTEM_TEMPLATE.format(import_cost=import_cost, index=index))
+    names.append(name)
+  return names
+
+
+def _Run(directory, setup, command):
+  code = RUN_TEMPLATE.format(setup=setup, command=command, package=PACKAGE)
+  env = dict(os.environ)
+  repository = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+  env['PYTHONPATH'] = os.pathsep.join(
+      [directory, repository, env.get('PYTHONPATH', '')])
+  process = subprocess.Popen([sys.executable, '-c', code], env=env,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+  _, stderr = process.communicate()
+  imported, elapsed = stderr.decode().strip().splitlines()[-1].split()
+  return int(imported), float(elapsed)
+
+
+def Benchmark(subsystems=60, import_cost=0.02):
+  """Runs one subsystem's command through an eager dict and a LazyGroup."""
+  directory = tempfile.mkdtemp()
+  try:
+    names = _CreateSubsystems(directory, subsystems, import_cost)
+    for label, template in (('dict', EAGER_TEMPLATE),
+                            ('LazyGroup', LAZY_TEMPLATE)):
+      setup = template.format(package=PACKAGE, names=names)
+      imported, elapsed = _Run(directory, setup, names[0])
+      print('{label:>10}: {imported:3d} subsystems imported, {elapsed:.3f}s'
+            .format(label=label, imported=imported, elapsed=elapsed))
+  finally:
+    shutil.rmtree(directory)
+
+
+def main():
+  strictfire.StrictFire(Benchmark, name='lazy_benchmark')
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,103 @@
+# Copyright (C) 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks running commands through a daemon started with --serve.
+
+A module that takes a while to import, as modules importing large libraries
+do, is run the same number of times with "python -m strictfire module" and
+with "python -m strictfire --connect module" against a daemon serving it. Both
+start a fresh interpreter per command, as a shell loop would.
+
+Usage: python -m benchmarks.serve_benchmark [--commands=20] [--import-time=0.5]
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import strictfire
+
+MODULE = '''
+import time
+time.sleep({import_time!r})
+
+
+def add(x, y):
+  return x + y
+'''
+
+
+def _Command(args, directory):
+  repository = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+  env = dict(os.environ, STRICTFIRE_SERVE_IDLE_TIMEOUT='60')
+  env['PYTHONPATH'] = os.pathsep.join(
+      [repository, directory, env.get('PYTHONPATH', '')])
+  # Run from the repository's parent so that the current directory does not
+  # shadow PYTHONPATH.
+  return dict(args=[sys.executable, '-m', 'strictfire'] + args, env=env,
+              cwd=os.path.dirname(repository), stdout=subprocess.PIPE)
+
+
+def _Time(args, directory, commands):
+  start = time.time()
+  for _ in range(commands):
+    subprocess.check_call(**_Command(args, directory))
+  return time.time() - start
+
+
+def Benchmark(commands=20, import_time=0.5):
+  """Runs commands with and without a daemon, for a module this slow."""
+  directory = tempfile.mkdtemp()
+  address = os.path.join(directory, 'slow.sock')
+  daemon = None
+  try:
+    with open(os.path.join(directory, 'slow_module.py'), 'w') as f:
+      f.write(MODULE.format(import_time=import_time))
+    cold = _Time(['slow_module', 'add', '1', '2'], directory, commands)
+
+    start = time.time()
+    daemon = subprocess.Popen(
+        **_Command(['--serve', 'slow_module', address], directory))
+    daemon.stdout.readline()
+    while not os.path.exists(address):
+      time.sleep(0.01)
+    startup = time.time() - start
+    warm = _Time(['--connect', address, 'add', '1', '2'], directory, commands)
+
+    print('{commands} commands, {import_time}s import'.format(
+        commands=commands, import_time=import_time))
+    print('    cold: {:.3f}s ({:.3f}s per command)'.format(
+        cold, cold / commands))
+    print('  daemon: {:.3f}s ({:.3f}s per command, {:.3f}s to start, {:.0f}x)'
+          .format(warm, warm / commands, startup, cold / warm))
+  finally:
+    if daemon:
+      daemon.terminate()
+      daemon.wait()
+    shutil.rmtree(directory)
+
+
+def main():
+  strictfire.StrictFire(Benchmark, name='serve_benchmark')
+
+
+if __name__ == '__main__':
+  main()
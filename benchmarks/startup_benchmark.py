@@ -0,0 +1,106 @@
+# Copyright (C) 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks how long a CLI takes to show help and usage errors.
+
+Each run starts a fresh interpreter, which shows the help screen or a usage
+error for a small CLI and reports how long that took and whether IPython was
+imported along the way. Runs are repeated with and without
+STRICTFIRE_USE_IPYTHON set, which makes inspectutils.Info use IPython's oinspect
+if IPython is installed.
+
+Usage: python -m benchmarks.startup_benchmark [--runs=5]
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+
+import strictfire
+
+RUN_TEMPLATE = '''
+import sys
+import time
+start = time.time()
+import strictfire
+
+
+class Calculator(object):
+  """A calculator."""
+
+  def add(self, x, y):
+    """Adds x and y."""
+    return x + y
+
+  def multiply(self, x, y):
+    """Multiplies x and y."""
+    return x * y
+
+
+try:
+  strictfire.StrictFire(Calculator(), command={command!r}, name='calculator')
+except strictfire.core.FireExit:
+  pass
+elapsed = time.time() - start
+sys.stderr.write('%d %f\\n' % ('IPython' in sys.modules, elapsed))
+'''
+
+COMMANDS = (
+    ('help', ['--', '--help']),
+    ('usage error', ['add', '1']),
+)
+
+
+def _Run(command, use_ipython):
+  env = dict(os.environ, PAGER='cat')
+  env.pop('STRICTFIRE_USE_IPYTHON', None)
+  if use_ipython:
+    env['STRICTFIRE_USE_IPYTHON'] = '1'
+  repository = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+  env['PYTHONPATH'] = os.pathsep.join([repository, env.get('PYTHONPATH', '')])
+  code = RUN_TEMPLATE.format(command=command)
+  # Run from the repository's parent so that the current directory does not
+  # shadow PYTHONPATH.
+  process = subprocess.Popen([sys.executable, '-c', code], env=env,
+                             cwd=os.path.dirname(repository),
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+  _, stderr = process.communicate()
+  imported, elapsed = stderr.decode().strip().splitlines()[-1].split()
+  return bool(int(imported)), float(elapsed)
+
+
+def Benchmark(runs=5):
+  """Shows help and a usage error in fresh interpreters, runs times each."""
+  for label, command in COMMANDS:
+    for use_ipython in (False, True):
+      results = [_Run(command, use_ipython) for _ in range(runs)]
+      imported = any(result[0] for result in results)
+      median = sorted(result[1] for result in results)[runs // 2]
+      print('{label:>12}, {mode:>14}: {median:.3f}s median, IPython {imported}'
+            .format(label=label,
+                    mode='IPython opt-in' if use_ipython else 'default',
+                    median=median,
+                    imported='imported' if imported else 'not imported'))
+
+
+def main():
+  strictfire.StrictFire(Benchmark, name='startup_benchmark')
+
+
+if __name__ == '__main__':
+  main()
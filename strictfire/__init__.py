@@ -19,6 +19,7 @@ from __future__ import division
 from __future__ import print_function
 
 from strictfire.core import StrictFire
+from strictfire.lazy import LazyGroup
 
-__all__ = ['StrictFire']
+__all__ = ['StrictFire', 'LazyGroup']
 __version__ = '0.4.0'
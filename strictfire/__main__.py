@@ -24,10 +24,14 @@ from __future__ import division
 from __future__ import print_function
 
 import importlib
+import inspect
 import os
+import stat
 import sys
 
 import strictfire
+from strictfire import manifest
+from strictfire import server
 
 cli_string = """usage: python -m strictfire [module] [arg] ..."
 
@@ -40,7 +44,19 @@ and passed a Python module using module notation:
 
 or with a file path:
 
-"python -m strictfire packageA/packageB/module.py" """
+"python -m strictfire packageA/packageB/module.py"
+
+To show help, usage and completions for a module without importing it, first
+build its manifest with:
+
+"python -m strictfire --build-manifest packageA.packageB.module"
+
+To keep a module imported between commands, serve it from a daemon, which
+exits after STRICTFIRE_SERVE_IDLE_TIMEOUT seconds (default 600) without
+commands, and run the commands through it:
+
+"python -m strictfire --serve packageA.packageB.module [socket] &"
+"python -m strictfire --connect packageA.packageB.module|socket [arg] ..." """
 
 
 def import_from_file_path(path):
@@ -127,6 +143,27 @@ def import_module(module_or_filename):
   return import_from_module_name(module_or_filename)  # Assume it's a module.
 
 
+def _ModuleName(module_or_filename):
+  """The name import_module would return, computed without importing."""
+  if os.path.exists(module_or_filename) and module_or_filename.endswith('.py'):
+    return os.path.basename(module_or_filename)
+  return module_or_filename
+
+
+def _Exit(message):
+  """Prints message as an error and exits with a non-zero code."""
+  print('ERROR: {message}'.format(message=message), file=sys.stderr)
+  sys.exit(1)
+
+
+def build_manifest(module_or_filename):
+  """Imports a module and writes its manifest, returning the manifest path."""
+  module, _ = import_module(module_or_filename)
+  path = manifest.DefaultPath(inspect.getsourcefile(module))
+  manifest.Write(module, path)
+  return path
+
+
 def main(args):
   """Entrypoint for fire when invoked as a module with python -m strictfire."""
 
@@ -134,9 +171,77 @@ def main(args):
     print(cli_string)
     sys.exit(1)
 
+  if args[1] == '--build-manifest':
+    if len(args) != 3:
+      print(cli_string)
+      sys.exit(1)
+    print(build_manifest(args[2]))
+    return
+
+  if args[1] == '--serve':
+    if len(args) not in (3, 4):
+      print(cli_string)
+      sys.exit(1)
+    idle_timeout = os.environ.get('STRICTFIRE_SERVE_IDLE_TIMEOUT',
+                                  server.IDLE_TIMEOUT)
+    try:
+      idle_timeout = float(idle_timeout)
+    except ValueError:
+      _Exit('STRICTFIRE_SERVE_IDLE_TIMEOUT must be a number of seconds, not '
+            '{value!r}.'.format(value=idle_timeout))
+    module, module_name = import_module(args[2])
+    try:
+      address = (args[3] if len(args) == 4
+                 else server.DefaultAddress(_ModuleName(args[2])))
+      print(address)
+      sys.stdout.flush()
+      server.Serve(module, module_name, address, idle_timeout=idle_timeout)
+    except (IOError, OSError, NotImplementedError) as e:
+      _Exit(e)
+    return
+
+  if args[1] == '--connect':
+    if len(args) < 3:
+      print(cli_string)
+      sys.exit(1)
+    address = args[2]
+    try:
+      if not (os.path.exists(address)
+              and stat.S_ISSOCK(os.stat(address).st_mode)):
+        address = server.DefaultAddress(_ModuleName(address))
+      code = server.Connect(address, args[3:])
+    except (IOError, OSError, NotImplementedError) as e:
+      _Exit(e)
+    sys.exit(code)
+
   module_or_filename = args[1]
+
+  # Use the module's manifest, if it has an up to date one, to avoid importing
+  # the module for commands that only show help, usage or completions.
+  source = manifest.FindSource(module_or_filename)
+  manifest_path = source and manifest.DefaultPath(source)
+  stale_manifest = False
+  if manifest_path and os.path.exists(manifest_path):
+    module_manifest = manifest.Load(manifest_path)
+    stale_manifest = module_manifest is None
+    if module_manifest is not None:
+      try:
+        manifest.Fire(module_manifest, command=args[2:],
+                      name=_ModuleName(module_or_filename))
+        return
+      except manifest.NeedsImport:
+        pass
+
   module, module_name = import_module(module_or_filename)
 
+  if stale_manifest:
+    # Rebuilding the manifest is best effort, e.g. the directory may be
+    # read-only; the command runs on the imported module either way.
+    try:
+      manifest.Write(module, manifest_path)
+    except (IOError, OSError):
+      pass
+
   strictfire.StrictFire(module, name=module_name, command=args[2:])
 
 
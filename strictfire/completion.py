@@ -21,18 +21,120 @@ from __future__ import print_function
 import collections
 import copy
 import inspect
+import time
 
 from strictfire import inspectutils
+from strictfire import lazy
 import six
 
+# Passing this as the shell to --completion lists the completions for the
+# current component, one per line. Completion scripts use it to complete the
+# subtrees they were not allowed to include.
+DYNAMIC_SHELL = 'words'
 
-def Script(name, component, default_options=None, shell='bash'):
+MAX_NODES = 10000
+MAX_CHILDREN = 1000
+
+
+class CompletionBudget(object):
+  """Limits how much of the member graph a completion script traverses.
+
+  Subtrees that do not fit in the budget are pruned. The pruned commands are
+  recorded in `pruned`, and completion scripts complete them dynamically by
+  invoking the CLI with `--completion words`.
+  """
+
+  def __init__(self, max_nodes=MAX_NODES, max_children=MAX_CHILDREN,
+               time_limit=None):
+    """Constructs a CompletionBudget.
+
+    Args:
+      max_nodes: The maximum number of members to visit in total, or None.
+      max_children: The maximum number of members to include for any single
+          component, or None.
+      time_limit: The maximum number of seconds to spend traversing, or None.
+    """
+    self.max_nodes = max_nodes
+    self.max_children = max_children
+    self.time_limit = time_limit
+    self.nodes = 0
+    # Maps each pruned command (a tuple of tokens) to the number of its members
+    # that were left out, or None if its members were never examined.
+    self.pruned = collections.OrderedDict()
+    self._deadline = None
+
+  def Start(self):
+    self.nodes = 0
+    self.pruned.clear()
+    if self.time_limit is not None:
+      self._deadline = time.time() + self.time_limit
+
+  def Exhausted(self):
+    if self.max_nodes is not None and self.nodes >= self.max_nodes:
+      return True
+    return self._deadline is not None and time.time() > self._deadline
+
+  def Prune(self, command, omitted):
+    """Records that command was pruned.
+
+    Args:
+      command: The pruned command, as a tuple of tokens.
+      omitted: The number of the command's members that were left out, or None
+          if none of its members were examined.
+    """
+    if omitted is None or self.pruned.get(command, 0) is None:
+      self.pruned[command] = None
+    else:
+      self.pruned[command] = self.pruned.get(command, 0) + omitted
+
+
+def Script(name, component, default_options=None, shell='bash', budget=None):
+  """Returns the text of the completion script for a Fire CLI.
+
+  Args:
+    name: The name of the command, as entered at the command line.
+    component: The component at the root of the CLI.
+    default_options: A dict of options that can be used with any command.
+    shell: The shell to produce the script for, either 'bash' or 'fish'.
+    budget: A CompletionBudget limiting the traversal of the member graph. The
+        default budget is used if None. After the call, budget.pruned reports
+        which commands were pruned.
+  Returns:
+    A string which is the completion script.
+  """
+  if budget is None:
+    budget = CompletionBudget()
+  budget.Start()
+  commands = list(_Commands(component, budget=budget))
   if shell == 'fish':
-    return _FishScript(name, _Commands(component), default_options)
-  return _BashScript(name, _Commands(component), default_options)
+    return _FishScript(name, commands, default_options, pruned=budget.pruned)
+  return _BashScript(name, commands, default_options, pruned=budget.pruned)
+
+
+def _DynamicCommand(name, command):
+  """The shell command listing the completions of a pruned command."""
+  return ' '.join(
+      [name] + [six.moves.shlex_quote(token) for token in command]
+      + ['--', '--completion', DYNAMIC_SHELL])
+
+
+def _PrunedComment(name, pruned):
+  """A comment reporting the commands pruned from a completion script."""
+  if not pruned:
+    return ''
+  lines = ['# The following commands were truncated and are completed '
+           'dynamically:']
+  for command, omitted in pruned.items():
+    if omitted is None:
+      detail = 'not loaded'
+    else:
+      detail = '{omitted} omitted'.format(omitted=omitted)
+    lines.append('#   {command} ({detail})'.format(
+        command=' '.join((name,) + command), detail=detail))
+  return '\n'.join(lines) + '\n'
 
 
-def _BashScript(name, commands, default_options=None):
+def _BashScript(name, commands, default_options=None, pruned=None):
   """Returns a Bash script registering a completion function for the commands.
 
   Args:
@@ -42,11 +144,14 @@ def _BashScript(name, commands, default_options=None):
         that command.
     default_options: A dict of options that can be used with any command. Use
         this if there are flags that can always be appended to a command.
+    pruned: A dict whose keys are the commands that were truncated, as tuples
+        of tokens. These are completed by invoking the command itself.
   Returns:
     A string which is the Bash script. Source the bash script to enable tab
     completion in Bash.
   """
   default_options = default_options or set()
+  pruned = pruned or {}
   global_options, options_map, subcommands_map = _GetMaps(
       name, commands, default_options
   )
@@ -54,7 +159,7 @@ def _BashScript(name, commands, default_options=None):
   bash_completion_template = """# bash completion support for {name}
 # DO NOT EDIT.
 # This script is autogenerated by strictfire/completion.py.
-
+{pruned_comment}
 _complete-{identifier}()
 {{
   local cur prev opts lastcommand
@@ -149,19 +254,32 @@ complete -F _complete-{identifier} {command}
   opts_assignment_main_command_template = """
       opts="{options} ${{GLOBAL_OPTIONS}}" """
 
+  opts_assignment_dynamic_template = """
+      opts="$({dynamic_command} 2>/dev/null) ${{GLOBAL_OPTIONS}}" """
+
   def _GetOptsAssignmentTemplate(command):
     if command == name:
       return opts_assignment_main_command_template
     else:
       return opts_assignment_subcommand_template
 
+  dynamic_commands = {
+      (command[-1] if command else name): _DynamicCommand(name, command)
+      for command in pruned
+  }
+
   lines = []
-  for command in set(subcommands_map.keys()).union(set(options_map.keys())):
-    opts_assignment = _GetOptsAssignmentTemplate(command).format(
-        options=' '.join(
-            sorted(options_map[command].union(subcommands_map[command]))
-        ),
-    )
+  for command in set(subcommands_map.keys()).union(
+      set(options_map.keys()), set(dynamic_commands.keys())):
+    if command in dynamic_commands:
+      opts_assignment = opts_assignment_dynamic_template.format(
+          dynamic_command=dynamic_commands[command])
+    else:
+      opts_assignment = _GetOptsAssignmentTemplate(command).format(
+          options=' '.join(
+              sorted(options_map[command].union(subcommands_map[command]))
+          ),
+      )
     lines.append(
         lastcommand_check_template.format(
             command=command,
@@ -176,6 +294,7 @@ complete -F _complete-{identifier} {command}
   return (
       bash_completion_template.format(
           name=name,
+          pruned_comment=_PrunedComment(name, pruned),
           command=name,
           checks=checks,
           default_options=' '.join(default_options),
@@ -185,7 +304,7 @@ complete -F _complete-{identifier} {command}
   )
 
 
-def _FishScript(name, commands, default_options=None):
+def _FishScript(name, commands, default_options=None, pruned=None):
   """Returns a Fish script registering a completion function for the commands.
 
   Args:
@@ -195,16 +314,21 @@ def _FishScript(name, commands, default_options=None):
         that command.
     default_options: A dict of options that can be used with any command. Use
         this if there are flags that can always be appended to a command.
+    pruned: A dict whose keys are the commands that were truncated, as tuples
+        of tokens. These are completed by invoking the command itself.
   Returns:
     A string which is the Fish script. Source the fish script to enable tab
     completion in Fish.
   """
   default_options = default_options or set()
+  pruned = pruned or {}
   global_options, options_map, subcommands_map = _GetMaps(
       name, commands, default_options
   )
 
-  fish_source = """function __fish_using_command
+  fish_source = _PrunedComment(name, pruned).replace('{', '{{').replace(
+      '}', '}}')
+  fish_source += """function __fish_using_command
     set cmd (commandline -opc)
     for i in (seq (count $cmd) 1)
         switch $cmd[$i]
@@ -255,8 +379,26 @@ end
                    "'__fish_using_command {command};{prev_global_check} and "
                    "__option_entered_check --{option}' -l {option}\n")
 
+  dynamic_template = ("complete -c {name} -n '__fish_using_command "
+                      "{command}' -f -a '({dynamic_command} 2>/dev/null)'\n")
+
+  dynamic_commands = {
+      (command[-1] if command else name): _DynamicCommand(name, command)
+      for command in pruned
+  }
+
   prev_global_check = ' and __is_prev_global;'
-  for command in set(subcommands_map.keys()).union(set(options_map.keys())):
+  for command in set(subcommands_map.keys()).union(
+      set(options_map.keys()), set(dynamic_commands.keys())):
+    if command in dynamic_commands:
+      fish_source += dynamic_template.format(
+          name=name,
+          command=command,
+          dynamic_command=dynamic_commands[command].replace(
+              '{', '{{').replace('}', '}}').replace("'", "\\'"),
+      )
+      continue
+
     for subcommand in subcommands_map[command]:
       fish_source += subcommand_template.format(
           name=name,
@@ -344,12 +486,16 @@ def MemberVisible(component, name, member, class_attrs=None, verbose=False):
   return True  # Default to including the member
 
 
-def VisibleMembers(component, class_attrs=None, verbose=False):
+def VisibleMembers(component, class_attrs=None, verbose=False, static=False):
   """Returns a list of the members of the given component.
 
   If verbose is True, then members starting with _ (normally ignored) are
   included.
 
+  If static is True, members are enumerated without evaluating properties or
+  other descriptors (see inspectutils.GetStaticMembers). Unevaluated
+  descriptors are returned as is.
+
   Args:
     component: The component whose members to list.
     class_attrs: (optional) If component is a class, you may provide this as:
@@ -359,11 +505,16 @@ def VisibleMembers(component, class_attrs=None, verbose=False):
       non-instantiated classes, but if you wish them to be shown (e.g. for
       completion scripts) then pass in a different class_attr for them.
     verbose: Whether to include private members.
+    static: Whether to enumerate members without evaluating descriptors.
   Returns:
     A list of tuples (member_name, member) of all members of the component.
   """
   if isinstance(component, dict):
     members = component.items()
+  elif isinstance(component, lazy.LazyGroup):
+    members = component.Members()
+  elif static:
+    members = inspectutils.GetStaticMembers(component)
   else:
     members = inspect.getmembers(component)
 
@@ -392,7 +543,7 @@ def _CompletionsFromArgs(fn_args):
   return completions
 
 
-def Completions(component, verbose=False):
+def Completions(component, verbose=False, max_children=None):
   """Gives possible Fire command completions for the component.
 
   A completion is a string that can be appended to a command to continue that
@@ -401,15 +552,19 @@ def Completions(component, verbose=False):
   Args:
     component: The component whose completions to list.
     verbose: Whether to include all completions, even private members.
+    max_children: If not None, at most this many completions are returned.
   Returns:
     A list of completions for a command that would so far return the component.
   """
   if inspect.isroutine(component) or inspect.isclass(component):
     spec = inspectutils.GetFullArgSpec(component)
-    return _CompletionsFromArgs(spec.args + spec.kwonlyargs)
+    return _CompletionsFromArgs(spec.args + spec.kwonlyargs)[:max_children]
 
   if isinstance(component, (tuple, list)):
-    return [str(index) for index in range(len(component))]
+    num_indexes = len(component)
+    if max_children is not None:
+      num_indexes = min(num_indexes, max_children)
+    return [str(index) for index in range(num_indexes)]
 
   if inspect.isgenerator(component):
     # TODO(dbieber): There are currently no commands available for generators.
@@ -417,8 +572,9 @@ def Completions(component, verbose=False):
 
   return [
       _FormatForCommand(member_name)
-      for member_name, _ in VisibleMembers(component, verbose=verbose)
-  ]
+      for member_name, _ in VisibleMembers(component, verbose=verbose,
+                                           static=True)
+  ][:max_children]
 
 
 def _FormatForCommand(token):
@@ -443,7 +599,7 @@ def _FormatForCommand(token):
   return token.replace('_', '-')
 
 
-def _Commands(component, depth=3):
+def _Commands(component, depth=3, budget=None, command=()):
   """Yields tuples representing commands.
 
   To use the command from Python, insert '.' between each element of the tuple.
@@ -453,6 +609,9 @@ def _Commands(component, depth=3):
   Args:
     component: The component considered to be the root of the yielded commands.
     depth: The maximum depth with which to traverse the member DAG for commands.
+    budget: An optional CompletionBudget. Members that do not fit in the budget
+        are skipped, and the commands they belong to are recorded as pruned.
+    command: The tuple of tokens leading to component, used to report pruning.
   Yields:
     Tuples, each tuple representing one possible command for this CLI.
     Only traverses the member DAG up to a depth of depth.
@@ -467,15 +626,37 @@ def _Commands(component, depth=3):
     return
 
   # By setting class_attrs={} we don't hide methods in completion.
-  for member_name, member in VisibleMembers(component, class_attrs={},
-                                            verbose=False):
+  members = VisibleMembers(component, class_attrs={}, verbose=False,
+                           static=True)
+  if budget is not None and budget.max_children is not None:
+    if len(members) > budget.max_children:
+      budget.Prune(command, len(members) - budget.max_children)
+      members = members[:budget.max_children]
+
+  for index, (member_name, member) in enumerate(members):
+    if budget is not None:
+      if budget.Exhausted():
+        budget.Prune(command, len(members) - index)
+        return
+      budget.nodes += 1
+
     # TODO(dbieber): Also skip components we've already seen.
     member_name = _FormatForCommand(member_name)
 
     yield (member_name,)
 
-    for command in _Commands(member, depth - 1):
-      yield (member_name,) + command
+    if inspectutils.IsUnevaluatedDescriptor(member):
+      continue  # Don't descend into members we have not evaluated.
+
+    if isinstance(member, lazy.LazyTarget):
+      # Don't import the member; its subcommands are completed dynamically.
+      if budget is not None:
+        budget.Prune(command + (member_name,), None)
+      continue
+
+    for subcommand in _Commands(member, depth - 1, budget,
+                                command + (member_name,)):
+      yield (member_name,) + subcommand
 
 
 def _IsOption(arg):
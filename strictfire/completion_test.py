@@ -22,6 +22,8 @@ from strictfire import completion
 from strictfire import test_components as tc
 from strictfire import testutils
 
+import six
+
 
 class TabCompletionTest(testutils.BaseTestCase):
 
@@ -114,6 +116,41 @@ class TabCompletionTest(testutils.BaseTestCase):
     self.assertIn('level3', script)
     self.assertNotIn('level4', script)  # The default depth is 3.
 
+  def testScriptMaxChildren(self):
+    component = {'key{}'.format(i): {'inner': i} for i in range(100)}
+    budget = completion.CompletionBudget(max_children=10)
+    script = completion.Script('big', component, budget=budget)
+    self.assertEqual(dict(budget.pruned), {(): 90})
+    self.assertIn('key0', script)
+    self.assertNotIn('key99', script)
+    self.assertIn('big (90 omitted)', script)
+    self.assertIn('big -- --completion words', script)
+
+  def testScriptMaxNodes(self):
+    component = {'level1': {'key{}'.format(i): None for i in range(20)}}
+    budget = completion.CompletionBudget(max_nodes=6)
+    script = completion.Script('deep', component, budget=budget)
+    self.assertEqual(dict(budget.pruned), {('level1',): 15})
+    self.assertIn('deep level1 -- --completion words', script)
+
+  def testScriptTimeLimit(self):
+    component = {'key{}'.format(i): i for i in range(20)}
+    budget = completion.CompletionBudget(time_limit=-1)
+    script = completion.Script('slow', component, budget=budget)
+    self.assertEqual(dict(budget.pruned), {(): 20})
+    self.assertNotIn('key0', script)
+
+  def testFishScriptMaxChildren(self):
+    component = {'key{}'.format(i): {'inner': i} for i in range(100)}
+    budget = completion.CompletionBudget(max_children=10)
+    script = completion.Script('big', component, shell='fish', budget=budget)
+    self.assertIn("-a '(big -- --completion words 2>/dev/null)'", script)
+    self.assertNotIn('key99', script)
+
+  def testListCompletionsMaxChildren(self):
+    completions = completion.Completions(list(range(10**6)), max_children=3)
+    self.assertEqual(completions, ['0', '1', '2'])
+
   def testFnScript(self):
     script = completion.Script('identity', tc.identity)
     self.assertIn('--arg1', script)
@@ -183,6 +220,25 @@ class TabCompletionTest(testutils.BaseTestCase):
     self.assertIn('double', completions)
     self.assertIn('triple', completions)
 
+  def testObjectCompletionsDoNotEvaluateProperties(self):
+    # Evaluating InvalidProperty.prop raises an error.
+    completions = completion.Completions(tc.InvalidProperty())
+    self.assertIn('double', completions)
+    self.assertIn('prop', completions)
+
+  def testObjectScriptDoesNotEvaluateProperties(self):
+    script = completion.Script('invalid', tc.InvalidProperty())
+    self.assertIn('prop', script)
+    self.assertNotIn('fget', script)
+
+  @testutils.skipIf(six.PY2, 'lru_cache is Python 3 only.')
+  def testScriptDescendsIntoLruCacheFunctions(self):
+    component = {'decorated': tc.py3.lru_cache_decorated,  # pytype: disable=module-attr
+                 'method': tc.py3.LruCacheDecoratedMethod()}  # pytype: disable=module-attr
+    script = completion.Script('cached', component)
+    self.assertIn('--arg1', script)
+    self.assertIn('lru-cache-in-class', script)
+
   def testMethodCompletions(self):
     completions = completion.Completions(tc.NoDefaults().double)
     self.assertNotIn('--self', completions)
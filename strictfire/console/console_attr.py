@@ -91,8 +91,8 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import unicode_literals
 
-import os
-import sys
+import collections
+import re
 import unicodedata
 
 # from strictfire.console import properties
@@ -103,6 +103,17 @@ from strictfire.console import text
 import six
 
 
+# The number of strings whose display widths each ConsoleAttr caches.
+DISPLAY_WIDTH_CACHE_SIZE = 1024
+
+_NON_ASCII_PATTERN = re.compile('[^\x00-\x7f]')
+
+# The display widths of the characters in the Basic Multilingual Plane, filled
+# in as each character is first measured. _UNKNOWN_WIDTH marks the others.
+_UNKNOWN_WIDTH = 0xff
+_bmp_display_widths = bytearray([_UNKNOWN_WIDTH]) * 0x10000
+
+
 # TODO: Unify this logic with console.style.mappings
 class BoxLineCharacters(object):
   """Box/line drawing characters.
@@ -247,7 +258,8 @@ class ConsoleAttr(object):
   _BULLETS_WINDOWS = ('■', '≡', '∞', 'Φ', '·')  # cp437 compatible unicode
   _BULLETS_ASCII = ('o', '*', '+', '-')
 
-  def __init__(self, encoding=None, suppress_output=False):
+  def __init__(self, encoding=None, suppress_output=False,
+               display_width_cache_size=None):
     """Constructor.
 
     Args:
@@ -257,6 +269,8 @@ class ConsoleAttr(object):
         win -- Windows code page 437.
       suppress_output: True to create a ConsoleAttr that doesn't want to output
         anything.
+      display_width_cache_size: The number of strings whose display widths are
+        cached, DISPLAY_WIDTH_CACHE_SIZE if None.
     """
     # Normalize the encoding name.
     if not encoding:
@@ -264,7 +278,8 @@ class ConsoleAttr(object):
     elif encoding == 'win':
       encoding = 'cp437'
     self._encoding = encoding or 'ascii'
-    self._term = '' if suppress_output else os.getenv('TERM', '').lower()
+    self._term = (
+        '' if suppress_output else console_attr_os.GetTerminalSnapshot().term)
 
     # ANSI "standard" attributes.
     if self.SupportsAnsi():
@@ -299,10 +314,15 @@ class ConsoleAttr(object):
 
     # OS specific attributes.
     self._get_raw_key = [console_attr_os.GetRawKeyFunction()]
-    self._term_size = (
-        (0, 0) if suppress_output else console_attr_os.GetTermSize())
+    # None for the size of the terminal when it is asked for, which is kept
+    # up to date as the terminal is resized.
+    self._term_size = (0, 0) if suppress_output else None
 
-    self._display_width_cache = {}
+    # The least recently used display widths are evicted first.
+    self._display_width_cache = collections.OrderedDict()
+    if display_width_cache_size is None:
+      display_width_cache_size = DISPLAY_WIDTH_CACHE_SIZE
+    self._display_width_cache_size = display_width_cache_size
 
   def _GetConsoleEncoding(self):
     """Gets the encoding as declared by the stdout stream.
@@ -310,15 +330,7 @@ class ConsoleAttr(object):
     Returns:
       str, The encoding name or None if it could not be determined.
     """
-    console_encoding = getattr(sys.stdout, 'encoding', None)
-    if not console_encoding:
-      return None
-    console_encoding = console_encoding.lower()
-    if 'utf-8' in console_encoding:
-      return 'utf8'
-    elif 'cp437' in console_encoding:
-      return 'cp437'
-    return None
+    return console_attr_os.GetTerminalSnapshot().encoding
 
   def Colorize(self, string, color, justify=None):
     """Generates a colorized string, optionally justified.
@@ -469,7 +481,7 @@ class ConsoleAttr(object):
     Returns:
       (x, y): A tuple of the terminal x and y dimensions.
     """
-    return self._term_size
+    return self._term_size or console_attr_os.GetTerminalSnapshot().size
 
   def DisplayWidth(self, buf):
     """Returns the display width of buf, handling unicode and ANSI controls.
@@ -484,15 +496,23 @@ class ConsoleAttr(object):
       # Handle non-string objects like Colorizer().
       return len(buf)
 
-    cached = self._display_width_cache.get(buf, None)
+    if ((not self._csi or self._csi not in buf)
+        and not _NON_ASCII_PATTERN.search(buf)):
+      # Every ASCII character but the newline has a display width of 1.
+      if '\n' not in buf:
+        return len(buf)
+      return max(len(line) for line in buf.split('\n'))
+
+    cached = self._display_width_cache.pop(buf, None)
     if cached is not None:
+      self._display_width_cache[buf] = cached
       return cached
 
     width = 0
     max_width = 0
     i = 0
     while i < len(buf):
-      if self._csi and buf[i:].startswith(self._csi):
+      if self._csi and buf.startswith(self._csi, i):
         i += self.GetControlSequenceLen(buf[i:])
       elif buf[i] == '\n':
         # A newline incidates the start of a new line.
@@ -505,7 +525,10 @@ class ConsoleAttr(object):
         i += 1
     max_width = max(width, max_width)
 
-    self._display_width_cache[buf] = max_width
+    if self._display_width_cache_size > 0:
+      self._display_width_cache[buf] = max_width
+      if len(self._display_width_cache) > self._display_width_cache_size:
+        self._display_width_cache.popitem(last=False)
     return max_width
 
   def SplitIntoNormalAndControl(self, buf):
@@ -696,6 +719,18 @@ def GetCharacterDisplayWidth(char):
     # Non-unicode chars have width 1. Don't use this function on control chars.
     return 1
 
+  code = ord(char)
+  if code < len(_bmp_display_widths):
+    width = _bmp_display_widths[code]
+    if width == _UNKNOWN_WIDTH:
+      width = _ComputeCharacterDisplayWidth(char)
+      _bmp_display_widths[code] = width
+    return width
+  return _ComputeCharacterDisplayWidth(char)
+
+
+def _ComputeCharacterDisplayWidth(char):
+  """Returns GetCharacterDisplayWidth(char) for a unicode char, uncached."""
   # Normalize to avoid special cases.
   char = unicodedata.normalize('NFC', char)
 
@@ -23,9 +23,142 @@ from __future__ import division
 from __future__ import unicode_literals
 
 import os
+import signal
 import sys
 
 from strictfire.console import encoding
+from strictfire.console import files
+
+
+class TerminalSnapshot(object):
+  """The capabilities of the terminal that an output stream is attached to.
+
+  Attributes:
+    stream: The output stream the snapshot was taken for.
+    is_tty: True if the stream is a terminal. The other attributes are
+      defaults if it is not, and the terminal is not probed.
+    size: The terminal (x, y) dimensions in characters.
+    encoding: 'utf8' or 'cp437' as declared by the stream, or None.
+    term: The lowercase TERM environment variable value, which with the
+      encoding determines whether ANSI control sequences are supported.
+    pager: The path of the default pager that handles ANSI control sequences,
+      or None if there is none.
+  """
+
+  def __init__(self, stream, is_tty, size, encoding_name, term, pager):
+    self.stream = stream
+    self.is_tty = is_tty
+    self.size = size
+    self.encoding = encoding_name
+    self.term = term
+    self.pager = pager
+
+
+# The snapshot of the terminal attached to sys.stdout, taken at most once per
+# process and stream. It is dropped when the terminal is resized.
+_terminal_snapshot = None
+
+
+def GetTerminalSnapshot():
+  """Returns the capabilities of the terminal attached to sys.stdout.
+
+  The terminal is probed on the first call, and again after sys.stdout is
+  replaced or the terminal is resized. Probing a terminal installs a SIGWINCH
+  handler for the whole process, see _WatchTerminalSize.
+
+  Returns:
+    A TerminalSnapshot.
+  """
+  snapshot = _terminal_snapshot
+  if snapshot is None or snapshot.stream is not sys.stdout:
+    snapshot = _TakeTerminalSnapshot(sys.stdout)
+  return snapshot
+
+
+def ResetTerminalSnapshot():
+  """Drops the terminal snapshot, so that the next call probes again."""
+  global _terminal_snapshot
+  _terminal_snapshot = None
+
+
+def _TakeTerminalSnapshot(stream):
+  """Probes the terminal attached to stream and remembers the result."""
+  global _terminal_snapshot
+  try:
+    is_tty = stream.isatty()
+  except (AttributeError, ValueError):
+    # The stream is closed or is not a file.
+    is_tty = False
+  if is_tty:
+    size = GetTermSize()
+    # Only look for a pager when output can be paged.
+    pager = None
+    for name in ('less', 'pager'):
+      pager = files.FindExecutableOnPath(name)
+      if pager:
+        break
+    _WatchTerminalSize()
+  else:
+    try:
+      size = _GetTermSizeEnvironment()
+    except (KeyError, ValueError):
+      size = (80, 24)
+    pager = None
+  _terminal_snapshot = TerminalSnapshot(
+      stream, is_tty, size, _GetStreamEncoding(stream),
+      os.getenv('TERM', '').lower(), pager)
+  return _terminal_snapshot
+
+
+def _GetStreamEncoding(stream):
+  """Gets the encoding as declared by stream.
+
+  Args:
+    stream: The output stream.
+
+  Returns:
+    str, The encoding name or None if it could not be determined.
+  """
+  stream_encoding = getattr(stream, 'encoding', None)
+  if not stream_encoding:
+    return None
+  stream_encoding = stream_encoding.lower()
+  if 'utf-8' in stream_encoding:
+    return 'utf8'
+  elif 'cp437' in stream_encoding:
+    return 'cp437'
+  return None
+
+
+# True once the SIGWINCH handler that drops the snapshot is installed.
+_watching_terminal_size = False
+
+
+def _WatchTerminalSize():
+  """Drops the terminal snapshot whenever the terminal is resized.
+
+  This installs a SIGWINCH handler for the whole process, once, and leaves it
+  installed. It calls the handler it replaced, if that is a Python callable,
+  after dropping the snapshot. A handler installed later in its place should
+  call it in turn, or call ResetTerminalSnapshot, for resizes to be noticed.
+  """
+  global _watching_terminal_size
+  if _watching_terminal_size or not hasattr(signal, 'SIGWINCH'):
+    return
+  previous_handler = signal.getsignal(signal.SIGWINCH)
+
+  def _HandleResize(signum, frame):
+    ResetTerminalSnapshot()
+    if callable(previous_handler):
+      previous_handler(signum, frame)
+
+  try:
+    signal.signal(signal.SIGWINCH, _HandleResize)
+  except ValueError:
+    # Signal handlers can only be set from the main thread. The snapshot is
+    # kept until it is reset then.
+    return
+  _watching_terminal_size = True
 
 
 def GetTermSize():
@@ -39,7 +172,8 @@ def GetTermSize():
   """
   xy = None
   # Believe the first helper that doesn't bail.
-  for get_terminal_size in (_GetTermSizePosix,
+  for get_terminal_size in (_GetTermSizeOs,
+                            _GetTermSizePosix,
                             _GetTermSizeWindows,
                             _GetTermSizeEnvironment,
                             _GetTermSizeTput):
@@ -52,6 +186,18 @@ def GetTermSize():
   return xy or (80, 24)
 
 
+def _GetTermSizeOs():
+  """Returns the terminal x and y dimensions from os.get_terminal_size()."""
+  for fd in (1, 0, 2):
+    try:
+      columns, lines = os.get_terminal_size(fd)
+    except (AttributeError, OSError, ValueError):
+      continue
+    if columns and lines:
+      return (columns, lines)
+  return None
+
+
 def _GetTermSizePosix():
   """Returns the Posix terminal x and y dimensions."""
   # pylint: disable=g-import-not-at-top
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*- #
+# Copyright 2015 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the console_attr_os module."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+
+import signal
+
+from strictfire import testutils
+from strictfire.console import console_attr_os
+
+import mock
+
+
+class TerminalSnapshotTest(testutils.BaseTestCase):
+
+  def setUp(self):
+    super(TerminalSnapshotTest, self).setUp()
+    console_attr_os.ResetTerminalSnapshot()
+
+  def tearDown(self):
+    console_attr_os.ResetTerminalSnapshot()
+    super(TerminalSnapshotTest, self).tearDown()
+
+  def testSnapshotIsKeptUntilReset(self):
+    snapshot = console_attr_os.GetTerminalSnapshot()
+    self.assertIs(console_attr_os.GetTerminalSnapshot(), snapshot)
+    console_attr_os.ResetTerminalSnapshot()
+    self.assertIsNot(console_attr_os.GetTerminalSnapshot(), snapshot)
+
+  @testutils.skipIf(not hasattr(signal, 'SIGWINCH'), 'Requires SIGWINCH.')
+  def testResizeDropsSnapshotAndChainsHandler(self):
+    calls = []
+
+    def Handler(signum, unused_frame):
+      calls.append(signum)
+
+    original_handler = signal.signal(signal.SIGWINCH, Handler)
+    try:
+      with mock.patch.object(console_attr_os, '_watching_terminal_size',
+                             False):
+        console_attr_os._WatchTerminalSize()  # pylint: disable=protected-access
+        handle_resize = signal.getsignal(signal.SIGWINCH)
+        self.assertIsNot(handle_resize, Handler)
+        snapshot = console_attr_os.GetTerminalSnapshot()
+        handle_resize(signal.SIGWINCH, None)
+        self.assertIsNot(console_attr_os.GetTerminalSnapshot(), snapshot)
+        self.assertEqual(calls, [signal.SIGWINCH])
+    finally:
+      signal.signal(signal.SIGWINCH, original_handler)
+
+  @testutils.skipIf(not hasattr(signal, 'SIGWINCH'), 'Requires SIGWINCH.')
+  def testResizeWithDefaultHandler(self):
+    original_handler = signal.signal(signal.SIGWINCH, signal.SIG_DFL)
+    try:
+      with mock.patch.object(console_attr_os, '_watching_terminal_size',
+                             False):
+        console_attr_os._WatchTerminalSize()  # pylint: disable=protected-access
+        snapshot = console_attr_os.GetTerminalSnapshot()
+        signal.getsignal(signal.SIGWINCH)(signal.SIGWINCH, None)
+        self.assertIsNot(console_attr_os.GetTerminalSnapshot(), snapshot)
+    finally:
+      signal.signal(signal.SIGWINCH, original_handler)
+
+
+if __name__ == '__main__':
+  testutils.main()
@@ -19,15 +19,19 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import errno
 import os
+import shlex
 import signal
 import subprocess
 import sys
 
 from strictfire.console import console_attr
+from strictfire.console import console_attr_os
 from strictfire.console import console_pager
 from strictfire.console import encoding
 from strictfire.console import files
+import six
 
 
 def IsInteractive(output=False, error=False, heuristic=False):
@@ -73,42 +77,119 @@ def More(contents, out, prompt=None, check_pager=True):
   """Run a user specified pager or fall back to the internal pager.
 
   Args:
-    contents: The entire contents of the text lines to page.
+    contents: The entire contents of the text lines to page, as a string or as
+      an iterable of strings that concatenated are the contents. An iterable is
+      consumed as the text is written out, so that the first screen can be
+      shown before the rest of the text is ready.
     out: The output stream.
     prompt: The page break prompt.
     check_pager: Checks the PAGER env var and uses it if True.
   """
+  if isinstance(contents, six.string_types):
+    chunks = [contents]
+  else:
+    chunks = contents
   if not IsInteractive(output=True):
-    out.write(contents)
+    for chunk in chunks:
+      out.write(chunk)
+      out.flush()
     return
   if check_pager:
     pager = encoding.GetEncodedValue(os.environ, 'PAGER', None)
     if pager == '-':
       # Use the fallback Pager.
-      pager = None
-    elif not pager:
-      # Search for a pager that handles ANSI escapes.
-      for command in ('less', 'pager'):
-        if files.FindExecutableOnPath(command):
-          pager = command
-          break
-    if pager:
+      command = None
+    elif pager:
+      command = _PagerCommand(pager)
+    else:
+      # The pager that handles ANSI escapes found when the terminal was probed.
+      pager = console_attr_os.GetTerminalSnapshot().pager
+      command = [pager] if pager else None
+    if command:
       # If the pager is less(1) then instruct it to display raw ANSI escape
       # sequences to enable colors and font embellishments.
-      less_orig = encoding.GetEncodedValue(os.environ, 'LESS', None)
-      less = '-R' + (less_orig or '')
-      encoding.SetEncodedValue(os.environ, 'LESS', less)
-      # Ignore SIGINT while the pager is running.
-      # We don't want to terminate the parent while the child is still alive.
-      signal.signal(signal.SIGINT, signal.SIG_IGN)
-      p = subprocess.Popen(pager, stdin=subprocess.PIPE, shell=True)
-      enc = console_attr.GetConsoleAttr().GetEncoding()
-      p.communicate(input=contents.encode(enc))
-      p.wait()
-      # Start using default signal handling for SIGINT again.
-      signal.signal(signal.SIGINT, signal.SIG_DFL)
-      if less_orig is None:
-        encoding.SetEncodedValue(os.environ, 'LESS', None)
+      env = dict(os.environ)
+      less = '-R' + (encoding.GetEncodedValue(os.environ, 'LESS', None) or '')
+      encoding.SetEncodedValue(env, 'LESS', less)
+      _WriteToPager(command, chunks, env)
       return
   # Fall back to the internal pager.
-  console_pager.Pager(contents, out, prompt).Run()
+  console_pager.Pager(chunks, out, prompt).Run()
+
+
+def _PagerCommand(pager):
+  """Returns the arguments to run the PAGER command line with, without a shell.
+
+  Args:
+    pager: The PAGER command line, split into arguments as a shell would, but
+      without expansions.
+
+  Returns:
+    The list of arguments, with the executable resolved on the PATH, or None if
+    the pager cannot be found.
+  """
+  try:
+    command = shlex.split(pager, posix=os.name != 'nt')
+  except ValueError:
+    return None
+  if not command:
+    return None
+  if not os.path.dirname(command[0]):
+    executable = files.FindExecutableOnPath(command[0], allow_extensions=True)
+    if not executable:
+      return None
+    command[0] = executable
+  return command
+
+
+# Stands for the SIGINT handler _WriteToPager did not replace.
+_NOT_INSTALLED = object()
+
+
+def _WriteToPager(command, chunks, env):
+  """Writes the chunks to the stdin of a pager process as they are produced.
+
+  Returns once the pager exits. If it exits before all of the chunks are
+  written, e.g. because the user quit, no more chunks are produced.
+
+  Args:
+    command: The arguments to run the pager with.
+    chunks: An iterable of strings.
+    env: The environment to run the pager in.
+  """
+  enc = console_attr.GetConsoleAttr().GetEncoding()
+  # Ignore SIGINT while the pager is running.
+  # We don't want to terminate the parent while the child is still alive.
+  try:
+    previous_handler = signal.signal(signal.SIGINT, signal.SIG_IGN)
+  except ValueError:
+    # Signal handlers can only be set from the main thread.
+    previous_handler = _NOT_INSTALLED
+  else:
+    if previous_handler is None:
+      # The previous handler was not installed from Python, and cannot be
+      # reinstalled, so the default one is instead of leaving SIGINT ignored.
+      previous_handler = signal.SIG_DFL
+  try:
+    p = subprocess.Popen(command, stdin=subprocess.PIPE, env=env)
+    try:
+      # The pager shows the first screen as soon as it is written.
+      for chunk in chunks:
+        p.stdin.write(chunk.encode(enc))
+        p.stdin.flush()
+    except (IOError, OSError) as e:
+      # The user quit the pager before all of the contents were written. On
+      # Windows, writing to a closed pipe raises EINVAL.
+      if e.errno not in (errno.EPIPE, errno.EINVAL):
+        raise
+    finally:
+      try:
+        p.stdin.close()
+      except (IOError, OSError):
+        pass
+      if hasattr(chunks, 'close'):
+        chunks.close()
+      p.wait()
+  finally:
+    if previous_handler is not _NOT_INSTALLED:
+      signal.signal(signal.SIGINT, previous_handler)
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*- #
+# Copyright 2015 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the console_io module."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import errno
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+
+from strictfire import testutils
+from strictfire.console import console_io
+
+import mock
+
+
+def _Handler(unused_signum, unused_frame):
+  pass
+
+
+class WriteToPagerTest(testutils.BaseTestCase):
+
+  def setUp(self):
+    super(WriteToPagerTest, self).setUp()
+    self.directory = tempfile.mkdtemp()
+    self.closed = []
+    self.previous_handler = signal.signal(signal.SIGINT, _Handler)
+
+  def tearDown(self):
+    signal.signal(signal.SIGINT, self.previous_handler)
+    shutil.rmtree(self.directory)
+    super(WriteToPagerTest, self).tearDown()
+
+  def _Chunks(self, chunks):
+    try:
+      for chunk in chunks:
+        yield chunk
+    finally:
+      self.closed.append(True)
+
+  def _Pager(self, script):
+    return [sys.executable, '-c', script]
+
+  def testWritesChunks(self):
+    path = os.path.join(self.directory, 'paged')
+    command = self._Pager(
+        'import sys; open(sys.argv[1], "wb").write(sys.stdin.buffer.read()'
+        ' if hasattr(sys.stdin, "buffer") else sys.stdin.read())')
+    console_io._WriteToPager(  # pylint: disable=protected-access
+        command + [path], self._Chunks(['one\n', 'two\n']), dict(os.environ))
+    with open(path) as f:
+      self.assertEqual(f.read(), 'one\ntwo\n')
+    self.assertEqual(self.closed, [True])
+    self.assertIs(signal.getsignal(signal.SIGINT), _Handler)
+
+  def testPagerExitsEarly(self):
+    # The pager quits after one byte, while the chunks never end.
+    command = self._Pager('import sys; sys.stdin.read(1)')
+    chunks = self._Chunks(iter(lambda: 'x' * 65536, None))
+    console_io._WriteToPager(command, chunks, dict(os.environ))  # pylint: disable=protected-access
+    self.assertEqual(self.closed, [True])
+    self.assertIs(signal.getsignal(signal.SIGINT), _Handler)
+
+  def testClosedPipeErrors(self):
+    for code in (errno.EPIPE, errno.EINVAL):
+      process = mock.Mock()
+      process.stdin.write.side_effect = IOError(code, os.strerror(code))
+      with mock.patch.object(subprocess, 'Popen', return_value=process):
+        console_io._WriteToPager(  # pylint: disable=protected-access
+            ['pager'], self._Chunks(['text']), {})
+      process.wait.assert_called_once_with()
+    self.assertEqual(self.closed, [True, True])
+
+    process = mock.Mock()
+    process.stdin.write.side_effect = IOError(errno.EIO, os.strerror(errno.EIO))
+    with mock.patch.object(subprocess, 'Popen', return_value=process):
+      with self.assertRaises(IOError):
+        console_io._WriteToPager(  # pylint: disable=protected-access
+            ['pager'], self._Chunks(['text']), {})
+    process.wait.assert_called_once_with()
+    self.assertIs(signal.getsignal(signal.SIGINT), _Handler)
+
+  def testRestoresHandlerNotInstalledFromPython(self):
+    process = mock.Mock()
+    with mock.patch.object(subprocess, 'Popen', return_value=process):
+      with mock.patch.object(signal, 'signal', return_value=None) as install:
+        console_io._WriteToPager(['pager'], [], {})  # pylint: disable=protected-access
+    self.assertEqual(install.call_args_list,
+                     [mock.call(signal.SIGINT, signal.SIG_IGN),
+                      mock.call(signal.SIGINT, signal.SIG_DFL)])
+
+  def testOutsideMainThread(self):
+    process = mock.Mock()
+    with mock.patch.object(subprocess, 'Popen', return_value=process):
+      with mock.patch.object(signal, 'signal',
+                             side_effect=ValueError) as install:
+        console_io._WriteToPager(['pager'], [], {})  # pylint: disable=protected-access
+    install.assert_called_once_with(signal.SIGINT, signal.SIG_IGN)
+    process.wait.assert_called_once_with()
+
+
+if __name__ == '__main__':
+  testutils.main()
@@ -19,17 +19,27 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import unicode_literals
 
+import array
+import bisect
+import collections
 import re
 import sys
+import tempfile
 
 from strictfire.console import console_attr
+import six
+
+# The number of display lines the pager keeps in memory. Once there are more,
+# display lines are spooled to a temporary file and read back as needed.
+WINDOW_SIZE = 4096
 
 
 class Pager(object):
   """A simple console text pager.
 
-  This pager requires the entire contents to be available. The contents are
-  written one page of lines at a time. The prompt is written after each page of
+  The contents can be a string or an iterable of strings, which is consumed
+  only as far as the pages shown require. The contents are written one page of
+  lines at a time. The prompt is written after each page of
   lines. A one character response is expected. See HELP_TEXT below for more
   info.
 
@@ -41,10 +51,12 @@ class Pager(object):
   Attributes:
     _attr: The current ConsoleAttr handle.
     _clear: A string that clears the prompt when written to _out.
-    _contents: The entire contents of the text lines to page.
     _height: The terminal height in characters.
+    _lines: The _DisplayLines of the contents.
     _out: The output stream, log.out (effectively) if None.
     _prompt: The page break prompt.
+    _prompt_more: The page break prompt, for when the length of the contents is
+      not known yet.
     _search_direction: The search direction command, n:forward, N:reverse.
     _search_pattern: The current forward/reverse search compiled RE.
     _width: The termonal width in characters.
@@ -92,11 +104,11 @@ class Pager(object):
     """Constructor.
 
     Args:
-      contents: The entire contents of the text lines to page.
+      contents: The entire contents of the text lines to page, as a string or as
+        an iterable of strings that concatenated are the contents.
       out: The output stream, log.out (effectively) if None.
       prompt: The page break prompt, a defalt prompt is used if None..
     """
-    self._contents = contents
     self._out = out or sys.stdout
     self._search_pattern = None
     self._search_direction = None
@@ -108,18 +120,22 @@ class Pager(object):
     self._width, self._height = self._attr.GetTermSize()
 
     # Initialize the prompt and the prompt clear string.
-    if not prompt:
+    if prompt:
+      prompt_more = prompt.format(percent='?')
+    else:
       prompt = '{bold}--({{percent}}%)--{normal}'.format(
           bold=self._attr.GetFontCode(bold=True),
           normal=self._attr.GetFontCode())
+      prompt_more = '{bold}--(more)--{normal}'.format(
+          bold=self._attr.GetFontCode(bold=True),
+          normal=self._attr.GetFontCode())
     self._clear = '\r{0}\r'.format(' ' * (self._attr.DisplayWidth(prompt) - 6))
     self._prompt = prompt
+    self._prompt_more = prompt_more
 
-    # Initialize a list of lines with long lines split into separate display
-    # lines.
-    self._lines = []
-    for line in contents.splitlines():
-      self._lines += self._attr.SplitLine(line, self._width)
+    # Long lines are split into separate display lines as pages need them.
+    self._lines = _DisplayLines(contents, self._attr, self._width,
+                                head_size=self._height)
 
   def _Write(self, s):
     """Mockable helper that writes s to self._out."""
@@ -166,11 +182,18 @@ class Pager(object):
     self._attr.GetRawKey()
     self._Write('\n')
 
+  def _Prompt(self, nxt):
+    """Returns the prompt for a page ending at display line nxt."""
+    if not self._lines.complete:
+      return self._prompt_more
+    return self._prompt.format(percent=100 * nxt // self._lines.Total())
+
   def Run(self):
     """Run the pager."""
+    lines = self._lines
     # No paging if the contents are small enough.
-    if len(self._lines) <= self._height:
-      self._Write(self._contents)
+    if lines.Available(self._height + 1) <= self._height:
+      self._Write(lines.Head())
       return
 
     # We will not always reset previous values.
@@ -180,22 +203,21 @@ class Pager(object):
 
     # Loop over all the pages.
     pos = 0
-    while pos < len(self._lines):
+    while lines.Available(pos + 1) > pos:
       # Write a page of lines.
-      nxt = pos + self._height
-      if nxt > len(self._lines):
-        nxt = len(self._lines)
+      nxt = lines.Available(pos + self._height)
+      if nxt < pos + self._height:
         pos = nxt - self._height
       # Checks if the starting position is in between the current printed lines
       # so we don't need to reprint all the lines.
       if self.prev_pos < pos < self.prev_nxt:
         # we start where the previous page ended.
-        self._Write('\n'.join(self._lines[self.prev_nxt:nxt]) + '\n')
+        self._Write('\n'.join(lines.Slice(self.prev_nxt, nxt)) + '\n')
       elif pos != self.prev_pos and nxt != self.prev_nxt:
-        self._Write('\n'.join(self._lines[pos:nxt]) + '\n')
+        self._Write('\n'.join(lines.Slice(pos, nxt)) + '\n')
 
       # Handle the prompt response.
-      percent = self._prompt.format(percent=100 * nxt // len(self._lines))
+      percent = self._Prompt(nxt)
       digits = ''
       while True:
         # We want to reset prev values if we just exited out of the while loop
@@ -237,23 +259,24 @@ class Pager(object):
             nxt = 0
         elif c in ('<PAGE-DOWN>', '<RIGHT-ARROW>', 'f', '\x06', ' '):
           # Next page.
-          if nxt >= len(self._lines):
+          if nxt >= lines.Available(nxt + 1):
             continue
           nxt = pos + self._height
-          if nxt >= len(self._lines):
+          if nxt >= lines.Available(nxt + 1):
             nxt = pos
         elif c in ('<HOME>', 'g'):
           # First page.
           nxt = count - 1
-          if nxt > len(self._lines) - self._height:
-            nxt = len(self._lines) - self._height
+          last = lines.Available(nxt + self._height) - self._height
+          if nxt > last:
+            nxt = last
           if nxt < 0:
             nxt = 0
         elif c in ('<END>', 'G'):
           # Last page.
-          nxt = len(self._lines) - count
-          if nxt > len(self._lines) - self._height:
-            nxt = len(self._lines) - self._height
+          nxt = lines.Total() - count
+          if nxt > lines.Total() - self._height:
+            nxt = lines.Total() - self._height
           if nxt < 0:
             nxt = 0
         elif c == 'h':
@@ -264,10 +287,10 @@ class Pager(object):
           break
         elif c in ('<DOWN-ARROW>', 'j', '+', '\n', '\r'):
           # Next line.
-          if nxt >= len(self._lines):
+          if nxt >= lines.Available(nxt + 1):
             continue
           nxt = pos + 1
-          if nxt >= len(self._lines):
+          if nxt >= lines.Available(nxt + 1):
             nxt = pos
         elif c in ('<UP-ARROW>', 'k', '-'):
           # Previous line.
@@ -278,16 +301,11 @@ class Pager(object):
           # Next pattern match search.
           if not self._search_pattern:
             continue
-          nxt = pos
-          i = pos
-          direction = 1 if c == self._search_direction else -1
-          while True:
-            i += direction
-            if i < 0 or i >= len(self._lines):
-              break
-            if self._search_pattern.search(self._lines[i]):
-              nxt = i
-              break
+          if c == self._search_direction:
+            match = lines.NextMatch(self._search_pattern, pos)
+          else:
+            match = lines.PreviousMatch(self._search_pattern, pos)
+          nxt = pos if match is None else match
         else:
           # Silently ignore everything else.
           continue
@@ -297,3 +315,208 @@ class Pager(object):
           reset_prev_values = True
           break
       pos = nxt
+
+
+class _DisplayLines(object):
+  """The display lines of the pager contents, split as pages need them.
+
+  Lines are read from the contents and split into display lines no wider than
+  the terminal only when a page needs them, so the first page is shown without
+  reading the rest of the contents. At most window_size display lines are kept
+  in memory. Once there are more, display lines are also spooled to a
+  temporary file, and read back from it using an index of their offsets.
+
+  The display lines matching the current search pattern are indexed too, as
+  lines are split or as searches need them, so that repeated searches find the
+  next or previous match by bisecting the index.
+
+  Attributes:
+    complete: Whether all of the contents have been read.
+  """
+
+  def __init__(self, contents, attr, width, head_size,
+               window_size=WINDOW_SIZE):
+    """Constructor.
+
+    Args:
+      contents: The contents, as a string or an iterable of strings.
+      attr: The ConsoleAttr to split lines with.
+      width: The terminal width in characters.
+      head_size: Head returns the contents, unsplit, if they have at most this
+        many lines.
+      window_size: The number of display lines to keep in memory.
+    """
+    self.complete = False
+    self._source = _SourceLines(contents)
+    self._attr = attr
+    self._width = width
+    self._head = []
+    self._head_size = head_size
+    self._window = collections.OrderedDict()
+    self._window_size = window_size
+    self._count = 0
+    self._offsets = array.array(str('L'))
+    self._spool = None
+    self._spool_size = 0
+    self._matches = None
+
+  def Available(self, count):
+    """Returns count, or the number of display lines if there are fewer."""
+    while self._count < count and not self.complete:
+      self._ReadSourceLine()
+    return min(count, self._count)
+
+  def Total(self):
+    """Returns the number of display lines, reading all of the contents."""
+    while not self.complete:
+      self._ReadSourceLine()
+    return self._count
+
+  def Head(self):
+    """Returns the contents as is, if they have at most head_size lines."""
+    return ''.join(self._head)
+
+  def Get(self, index):
+    """Returns the index-th display line, which must be available."""
+    line = self._Read(index)
+    self._Remember(index, line)
+    return line
+
+  def NextMatch(self, pattern, index):
+    """Returns the first display line after index matching pattern, or None."""
+    matches = self._MatchIndex(pattern)
+    while True:
+      position = bisect.bisect_right(matches.indexes, index)
+      if position < len(matches.indexes):
+        return matches.indexes[position]
+      if not self._Scan(matches):
+        return None
+
+  def PreviousMatch(self, pattern, index):
+    """Returns the last display line before index matching pattern, or None."""
+    matches = self._MatchIndex(pattern)
+    while matches.scanned < index and self._Scan(matches):
+      pass
+    position = bisect.bisect_left(matches.indexes, index)
+    return matches.indexes[position - 1] if position else None
+
+  def Slice(self, start, stop):
+    """Returns the available display lines from start up to stop."""
+    return [self.Get(index) for index in range(start, self.Available(stop))]
+
+  def _Read(self, index):
+    if index in self._window:
+      return self._window[index]
+    self._spool.seek(self._offsets[index])
+    return self._spool.readline()[:-1].decode('utf-8')
+
+  def _MatchIndex(self, pattern):
+    if self._matches is None or self._matches.pattern is not pattern:
+      self._matches = _MatchIndex(pattern)
+    return self._matches
+
+  def _Scan(self, matches):
+    """Indexes the next display line for matches, returning False at the end."""
+    index = matches.scanned
+    if self.Available(index + 1) <= index:
+      return False
+    # Splitting the line may have indexed it already.
+    if matches.scanned == index:
+      matches.Add(index, self._Text(self._Read(index)))
+    return True
+
+  def _Text(self, line):
+    """Returns line without its control sequences, for searching."""
+    return ''.join(normal for normal, _
+                   in self._attr.SplitIntoNormalAndControl(line))
+
+  def _ReadSourceLine(self):
+    try:
+      line = next(self._source)
+    except StopIteration:
+      self.complete = True
+      return
+    if self._head is not None:
+      self._head.append(line)
+      if len(self._head) > self._head_size:
+        self._head = None
+    for display_line in self._attr.SplitLine((line.splitlines() or [''])[0],
+                                             self._width):
+      self._Append(display_line)
+
+  def _Append(self, line):
+    index = self._count
+    self._count += 1
+    if self._spool is None and self._count > self._window_size:
+      # Every display line so far is still in the window.
+      self._spool = tempfile.TemporaryFile()
+      for spooled_index in range(index):
+        self._Spool(self._window[spooled_index])
+    if self._spool is not None:
+      self._Spool(line)
+    if self._matches is not None and self._matches.scanned == index:
+      self._matches.Add(index, self._Text(line))
+    self._Remember(index, line)
+
+  def _Spool(self, line):
+    data = line.encode('utf-8') + b'\n'
+    self._offsets.append(self._spool_size)
+    self._spool.seek(self._spool_size)
+    self._spool.write(data)
+    self._spool_size += len(data)
+
+  def _Remember(self, index, line):
+    # Reinserted, the line becomes the most recently used.
+    self._window.pop(index, None)
+    self._window[index] = line
+    if len(self._window) > self._window_size:
+      self._window.popitem(last=False)
+
+
+class _MatchIndex(object):
+  """The display lines matching a search pattern, among the first scanned."""
+
+  def __init__(self, pattern):
+    self.pattern = pattern
+    self.indexes = array.array(str('L'))
+    self.scanned = 0
+
+  def Add(self, index, text):
+    """Indexes the index-th display line, the next to scan, given its text."""
+    self.scanned = index + 1
+    if self.pattern.search(text):
+      self.indexes.append(index)
+
+
+def _SourceLines(contents):
+  """Yields the lines of contents, with their line endings.
+
+  Args:
+    contents: A string, or an iterable of strings that concatenated are the
+      contents. Line endings may be split across the strings.
+  Yields:
+    The lines of contents, as str.splitlines(True) would split them.
+  """
+  if isinstance(contents, six.string_types):
+    contents = [contents]
+  # The start of a line that may continue in the next chunks, joined only once
+  # a chunk ends it, so that a long line is not copied for each of its chunks.
+  pending = []
+  for chunk in contents:
+    if not chunk:
+      continue
+    if chunk.splitlines() == [chunk] and not (
+        pending and pending[-1].endswith('\r')):
+      pending.append(chunk)
+      continue
+    lines = (''.join(pending) + chunk).splitlines(True)
+    pending = []
+    if lines and (lines[-1].splitlines() == [lines[-1]]
+                  or lines[-1].endswith('\r')):
+      # The last line may continue, or its \r\n ending may be split, in the
+      # next chunk.
+      pending.append(lines.pop())
+    for line in lines:
+      yield line
+  if pending:
+    yield ''.join(pending)
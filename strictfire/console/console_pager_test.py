@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*- #
+# Copyright 2015 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the console_pager module."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+
+import re
+
+from strictfire import testutils
+from strictfire.console import console_attr
+from strictfire.console import console_pager
+
+import mock
+import six
+
+
+class PagerTest(testutils.BaseTestCase):
+
+  # The contents, keys and output of a session with the pager as it was before
+  # it read and split its contents lazily.
+  CONTENTS = ''.join('line {} {}\n'.format(index, 'word ' * (index % 7))
+                     for index in range(30))
+  KEYS = ['f', 'j', 'k', '/', '2', '5', '\n', 'G', 'b', 'g', 'n', '?', '1',
+          '\n', 'q']
+  OUTPUT = (
+      'line 0 \n'
+      'line 1 word \n'
+      'line 2 word word \n'
+      'line 3 word word wor\n'
+      'd \n'
+      '--MORE--\r  \rline 4 word word wor\n'
+      'd word \n'
+      'line 5 word word wor\n'
+      'd word word \n'
+      'line 6 word word wor\n'
+      '--MORE--\r  \rd word word word \n'
+      '--MORE--\r  \rline 4 word word wor\n'
+      'd word \n'
+      'line 5 word word wor\n'
+      'd word word \n'
+      'line 6 word word wor\n'
+      '--MORE--\r  \r/25\r  \rline 25 word word wo\n'
+      'rd word \n'
+      'line 26 word word wo\n'
+      'rd word word \n'
+      'line 27 word word wo\n'
+      '--MORE--\r  \rrd word word word \n'
+      'line 28 \n'
+      'line 29 word \n'
+      '--MORE--\r  \rline 24 word word wo\n'
+      'rd \n'
+      'line 25 word word wo\n'
+      'rd word \n'
+      'line 26 word word wo\n'
+      '--MORE--\r  \rline 0 \n'
+      'line 1 word \n'
+      'line 2 word word \n'
+      'line 3 word word wor\n'
+      'd \n'
+      '--MORE--\r  \rline 25 word word wo\n'
+      'rd word \n'
+      'line 26 word word wo\n'
+      'rd word word \n'
+      'line 27 word word wo\n'
+      '--MORE--\r  \r?1\r \rline 21 \n'
+      'line 22 word \n'
+      'line 23 word word \n'
+      'line 24 word word wo\n'
+      'rd \n'
+      '--MORE--\r  \r'
+  )
+
+  def _Run(self, contents, keys):
+    out = six.StringIO()
+    with mock.patch.object(console_attr.ConsoleAttr, 'GetTermSize',
+                           return_value=(20, 6)):
+      with mock.patch.object(console_attr.ConsoleAttr, 'GetRawKey',
+                             side_effect=keys):
+        console_pager.Pager(contents, out, prompt='--MORE--').Run()
+    return out.getvalue()
+
+  def testOutputIsUnchanged(self):
+    self.assertEqual(self._Run(self.CONTENTS, self.KEYS), self.OUTPUT)
+
+  def testChunkedContents(self):
+    chunks = (self.CONTENTS[start:start + 7]
+              for start in range(0, len(self.CONTENTS), 7))
+    self.assertEqual(self._Run(chunks, self.KEYS), self.OUTPUT)
+
+  def testReadsOnlyTheFirstPage(self):
+    read = []
+
+    def Contents():
+      for index in range(100000):
+        read.append(index)
+        yield 'line {}\n'.format(index)
+
+    self.assertEqual(self._Run(Contents(), ['q']),
+                     ''.join('line {}\n'.format(index) for index in range(5))
+                     + '--MORE--\r  \r')
+    self.assertLess(len(read), 10)
+
+
+class DisplayLinesTest(testutils.BaseTestCase):
+
+  def setUp(self):
+    super(DisplayLinesTest, self).setUp()
+    self.lines = ['line {}'.format(index) for index in range(20)]
+    self.lines[2] += ' match'
+    self.lines[15] += ' match'
+    self.display_lines = console_pager._DisplayLines(  # pylint: disable=protected-access
+        ''.join(line + '\n' for line in self.lines),
+        console_attr.GetConsoleAttr(), width=80, head_size=4, window_size=4)
+
+  def testGetAndSlicePastWindow(self):
+    self.assertEqual(self.display_lines.Total(), 20)
+    self.assertEqual(self.display_lines.Slice(0, 20), self.lines)
+    self.assertEqual(self.display_lines.Get(3), self.lines[3])
+    self.assertEqual(self.display_lines.Slice(18, 30), self.lines[18:])
+
+  def testWindowKeepsRecentlyUsedLines(self):
+    self.display_lines.Total()
+    for index in (3, 17, 4):
+      self.display_lines.Get(index)
+    window = self.display_lines._window  # pylint: disable=protected-access
+    self.assertEqual(list(window), [19, 3, 17, 4])
+
+  def testMatchesAcrossSpooledLines(self):
+    pattern = re.compile('match')
+    self.assertEqual(self.display_lines.NextMatch(pattern, 0), 2)
+    self.assertEqual(self.display_lines.NextMatch(pattern, 2), 15)
+    self.assertIsNone(self.display_lines.NextMatch(pattern, 15))
+    self.assertEqual(self.display_lines.PreviousMatch(pattern, 19), 15)
+    self.assertEqual(self.display_lines.PreviousMatch(pattern, 15), 2)
+    self.assertIsNone(self.display_lines.PreviousMatch(pattern, 2))
+
+
+class SourceLinesTest(testutils.BaseTestCase):
+
+  def testLinesSplitAcrossChunks(self):
+    chunks = ['a', 'b', 'c\r', '\nd', '', 'e\rf', 'g']
+    self.assertEqual(list(console_pager._SourceLines(chunks)),  # pylint: disable=protected-access
+                     ['abc\r\n', 'de\r', 'fg'])
+
+  def testLongLineInManyChunks(self):
+    chunks = ['x'] * 10000 + ['\n', 'y']
+    self.assertEqual(list(console_pager._SourceLines(chunks)),  # pylint: disable=protected-access
+                     ['x' * 10000 + '\n', 'y'])
+
+
+if __name__ == '__main__':
+  testutils.main()
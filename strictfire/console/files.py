@@ -32,13 +32,44 @@ def _GetSystemPath():
   return encoding_util.GetEncodedValue(os.environ, 'PATH')
 
 
-def _FindExecutableOnPath(executable, path, pathext):
+# FindExecutableOnPath results by (executable, path, pathext), shared by the
+# whole process. Use ClearExecutableCache() after the PATH contents change.
+_executable_cache = {}
+
+# The normalized file names in PATH directories by directory, for
+# FindExecutableOnPath(..., snapshot_directories=True).
+_directory_listings = {}
+
+
+def ClearExecutableCache():
+  """Forgets the executables and directory listings found on the PATH."""
+  _executable_cache.clear()
+  _directory_listings.clear()
+
+
+def _ListDirectory(directory):
+  """Returns the normalized names of the files in directory, remembered."""
+  listing = _directory_listings.get(directory)
+  if listing is None:
+    try:
+      names = os.listdir(directory or os.curdir)
+    except (IOError, OSError):
+      names = []
+    listing = frozenset(os.path.normcase(name) for name in names)
+    _directory_listings[directory] = listing
+  return listing
+
+
+def _FindExecutableOnPath(executable, path, pathext,
+                          snapshot_directories=False):
   """Internal function to a find an executable.
 
   Args:
     executable: The name of the executable to find.
     path: A list of directories to search separated by 'os.pathsep'.
     pathext: An iterable of file name extensions to use.
+    snapshot_directories: Only check for files that are in a listing of each
+      directory, taken once, rather than checking every candidate path.
 
   Returns:
     str, the path to a file on `path` with name `executable` + `p` for
@@ -58,6 +89,9 @@ def _FindExecutableOnPath(executable, path, pathext):
     for directory in path.split(os.pathsep):
       # Windows can have paths quoted.
       directory = directory.strip('"')
+      if (snapshot_directories and os.path.normcase(executable + ext)
+          not in _ListDirectory(directory)):
+        continue
       full = os.path.normpath(os.path.join(directory, executable) + ext)
       # On Windows os.access(full, os.X_OK) is always True.
       if os.path.isfile(full) and os.access(full, os.X_OK):
@@ -73,11 +107,15 @@ def _PlatformExecutableExtensions(platform):
 
 
 def FindExecutableOnPath(executable, path=None, pathext=None,
-                         allow_extensions=False):
+                         allow_extensions=False, snapshot_directories=False):
   """Searches for `executable` in the directories listed in `path` or $PATH.
 
   Executable must not contain a directory or an extension.
 
+  Results are cached for the process by executable, path and extensions. A
+  cached path is only returned while it is still an executable file, and a
+  cached miss is kept until ClearExecutableCache() is called.
+
   Args:
     executable: The name of the executable to find.
     path: A list of directories to search separated by 'os.pathsep'.  If None
@@ -86,6 +124,9 @@ def FindExecutableOnPath(executable, path=None, pathext=None,
       platform specific extensions are used.
     allow_extensions: A boolean flag indicating whether extensions in the
       executable are allowed.
+    snapshot_directories: Only check for files that are in a listing of each
+      directory, taken once per process. This saves a stat call per directory
+      and extension when the PATH has many, or slow, directories.
 
   Returns:
     The path of 'executable' (possibly with a platform-specific extension) if
@@ -111,6 +152,19 @@ def FindExecutableOnPath(executable, path=None, pathext=None,
   effective_pathext = (pathext if pathext is not None
                        else _PlatformExecutableExtensions(
                            platforms.OperatingSystem.Current()))
-
-  return _FindExecutableOnPath(executable, effective_path,
-                               effective_pathext)
+  if isinstance(effective_pathext, six.string_types):
+    # Let _FindExecutableOnPath reject it.
+    key = None
+  else:
+    effective_pathext = tuple(effective_pathext)
+    key = (executable, effective_path, effective_pathext)
+
+  if key in _executable_cache:
+    full = _executable_cache[key]
+    if full is None or (os.path.isfile(full) and os.access(full, os.X_OK)):
+      return full
+  full = _FindExecutableOnPath(executable, effective_path, effective_pathext,
+                               snapshot_directories=snapshot_directories)
+  if key is not None:
+    _executable_cache[key] = full
+  return full
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*- #
+# Copyright 2015 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the files module."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+
+from strictfire import testutils
+from strictfire.console import files
+
+
+@testutils.skipIf(os.name == 'nt', 'Relies on the executable bit.')
+class FindExecutableOnPathTest(testutils.BaseTestCase):
+
+  def setUp(self):
+    super(FindExecutableOnPathTest, self).setUp()
+    files.ClearExecutableCache()
+    self.root = tempfile.mkdtemp()
+    self.directories = [os.path.join(self.root, name) for name in ('a', 'b')]
+    for directory in self.directories:
+      os.mkdir(directory)
+    self.path = os.pathsep.join(self.directories)
+
+  def tearDown(self):
+    files.ClearExecutableCache()
+    shutil.rmtree(self.root)
+    super(FindExecutableOnPathTest, self).tearDown()
+
+  def _Create(self, directory, name, mode=0o755):
+    full = os.path.join(directory, name)
+    open(full, 'w').close()
+    os.chmod(full, mode)
+    return full
+
+  def _Find(self, executable, **kwargs):
+    """Returns what FindExecutableOnPath finds, checking it is uncached too."""
+    found = files.FindExecutableOnPath(executable, path=self.path,
+                                       pathext=('', '.sh'), **kwargs)
+    self.assertEqual(
+        found,
+        files._FindExecutableOnPath(  # pylint: disable=protected-access
+            executable, self.path, ('', '.sh')))
+    return found
+
+  def testFindsLikeUncachedLookup(self):
+    self._Create(self.directories[0], 'tool.sh')
+    preferred = self._Create(self.directories[1], 'tool')
+    self._Create(self.directories[0], 'plain', mode=0o644)
+    for snapshot_directories in (False, True):
+      self.assertEqual(
+          self._Find('tool', snapshot_directories=snapshot_directories),
+          preferred)
+      self.assertIsNone(
+          self._Find('plain', snapshot_directories=snapshot_directories))
+      self.assertIsNone(
+          self._Find('missing', snapshot_directories=snapshot_directories))
+
+  def testCachedPathIsCheckedAgain(self):
+    first = self._Create(self.directories[0], 'tool')
+    self.assertEqual(self._Find('tool'), first)
+    os.chmod(first, 0o644)
+    second = self._Create(self.directories[1], 'tool')
+    self.assertEqual(self._Find('tool'), second)
+    os.remove(second)
+    self.assertIsNone(self._Find('tool'))
+
+  def testCachedMissIsKeptUntilCleared(self):
+    self.assertIsNone(self._Find('tool'))
+    created = self._Create(self.directories[0], 'tool')
+    self.assertIsNone(files.FindExecutableOnPath('tool', path=self.path,
+                                                 pathext=('', '.sh')))
+    files.ClearExecutableCache()
+    self.assertEqual(self._Find('tool'), created)
+
+  def testInvalidArguments(self):
+    with self.assertRaises(ValueError):
+      files.FindExecutableOnPath('tool.sh', path=self.path)
+    with self.assertRaises(ValueError):
+      files.FindExecutableOnPath(os.path.join('bin', 'tool'), path=self.path)
+    with self.assertRaises(ValueError):
+      files.FindExecutableOnPath('tool', path=self.path, pathext='.sh')
+
+
+if __name__ == '__main__':
+  testutils.main()
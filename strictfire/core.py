@@ -42,9 +42,20 @@ example, to get help for a command you might run: `command -- --help`.
 The available flags for all Fire CLIs are:
   -v --verbose: Include private members in help and usage information.
   -h --help: Provide help and usage information for the command.
+  --help-all DIRECTORY: Write help for the command and all of its subcommands to
+    DIRECTORY, one file per command.
+  --help-format FORMAT: The format for --help-all: markdown, man or json.
+  --batch FILE: Run each line of FILE, or of stdin if FILE is -, as a command.
+  --batch-format FORMAT: The output of --batch: text, or json for JSON Lines.
+  --map ARGNAME: Call the command once per line of stdin, passing the line as
+    its argument ARGNAME.
+  -j --jobs N: Run N commands of the --batch, or lines of the --map, at a time.
+  --batch-pool POOL: Run the --jobs in a pool of threads, or of processes.
+  --chunk-size N: Hand the --jobs N commands or lines at a time.
   -i --interactive: Drop into a Python REPL after running the command.
   --completion: Write the Bash completion script for the tool to stdout.
   --completion fish: Write the Fish completion script for the tool to stdout.
+  --completion words: List the completions for the current command to stdout.
   --separator SEPARATOR: Use SEPARATOR in place of the default separator, '-'.
   --trace: Get the Fire Trace for the command.
 """
@@ -53,6 +64,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import copy
 import inspect
 import json
 import os
@@ -60,14 +72,19 @@ import pipes
 import re
 import shlex
 import sys
+import threading
+import time
 import types
+import weakref
 
 from strictfire import completion
 from strictfire import decorators
 from strictfire import formatting
+from strictfire import helpcache
 from strictfire import helptext
 from strictfire import inspectutils
 from strictfire import interact
+from strictfire import lazy
 from strictfire import parser
 from strictfire import trace
 from strictfire import value_types
@@ -77,6 +94,21 @@ import six
 if six.PY34:
   import asyncio  # pylint: disable=import-error,g-import-not-at-top  # pytype: disable=import-error
 
+# Awaitables are only run on a uvloop event loop if this is set, as uvloop
+# behaves differently from asyncio in places. It defaults to whether the
+# STRICTFIRE_USE_UVLOOP environment variable is set.
+USE_UVLOOP = bool(os.environ.get('STRICTFIRE_USE_UVLOOP'))
+
+# What the jobs _RunInPool runs with --jobs share: their state, such as the
+# component, and the streams that keep their output. Worker processes are
+# forked once it is set, so they inherit the component rather than have it
+# pickled.
+_batch = None
+
+# The _ParsePlan of each argspec, so that it is worked out once for each of the
+# functions and classes that inspectutils.GetFullArgSpec caches argspecs for.
+_parse_plans = weakref.WeakKeyDictionary()
+
 
 def StrictFire(component=None, command=None, name=None):
   """This function, Fire, is the main entrypoint for Python Fire.
@@ -125,8 +157,7 @@ def StrictFire(component=None, command=None, name=None):
 
   args, flag_args = parser.SeparateFlagArgs(args)
 
-  argparser = parser.CreateParser()
-  parsed_flag_args, unused_args = argparser.parse_known_args(flag_args)
+  parsed_flag_args, unused_args = parser.ParseFlagArgs(flag_args)
 
   context = {}
   if parsed_flag_args.interactive or component is None:
@@ -138,15 +169,49 @@ def StrictFire(component=None, command=None, name=None):
     context.update(caller_globals)
     context.update(caller_locals)
 
-  component_trace = _Fire(component, args, parsed_flag_args, context, name, strict=True)
+  # Every awaitable of the command, including the async iterable it may
+  # result in, runs on this one event loop.
+  loop = _EventLoop()
+  try:
+    if parsed_flag_args.batch is not None:
+      return _RunBatch(component, args, parsed_flag_args, context, name, loop)
+    if parsed_flag_args.map is not None:
+      return _RunMap(component, args, parsed_flag_args, context, name, loop)
+    component_trace = _Fire(component, args, parsed_flag_args, context, name,
+                            strict=True, loop=loop)
+    return _HandleTrace(component_trace, parsed_flag_args, loop)
+  finally:
+    loop.Close()
+
 
+def _HandleTrace(component_trace, parsed_flag_args, loop, print_result=True):
+  """Shows what the flags ask for and the result of a command that has run.
+
+  Args:
+    component_trace: The FireTrace of the command.
+    parsed_flag_args: The values of the Fire flags the command was run with.
+    loop: The _EventLoop the command ran on.
+    print_result: Whether to print the result of a successful command.
+  Returns:
+    The result of the command.
+  Raises:
+    FireExit: With code 2 if the command failed, and with code 0 if the flags
+        asked for something other than the result, such as help.
+  """
   if component_trace.HasError():
     _DisplayError(component_trace)
     raise FireExit(2, component_trace)
+  if parsed_flag_args.help_all is not None:
+    paths = helptext.ExportTree(
+        component_trace.GetResult(), parsed_flag_args.help_all,
+        fmt=parsed_flag_args.help_format, trace=component_trace,
+        verbose=component_trace.verbose)
+    print('\n'.join(paths))
+    raise FireExit(0, component_trace)
   if component_trace.show_trace and component_trace.show_help:
     output = ['Fire trace:\n{trace}\n'.format(trace=component_trace)]
     result = component_trace.GetResult()
-    help_text = helptext.HelpText(
+    help_text = helpcache.HelpTextChunks(
         result, trace=component_trace, verbose=component_trace.verbose)
     output.append(help_text)
     Display(output, out=sys.stderr)
@@ -157,21 +222,513 @@ def StrictFire(component=None, command=None, name=None):
     raise FireExit(0, component_trace)
   if component_trace.show_help:
     result = component_trace.GetResult()
-    help_text = helptext.HelpText(
+    help_text = helpcache.HelpTextChunks(
         result, trace=component_trace, verbose=component_trace.verbose)
     output = [help_text]
     Display(output, out=sys.stderr)
     raise FireExit(0, component_trace)
 
   # The command succeeded normally; print the result.
-  _PrintResult(component_trace, verbose=component_trace.verbose)
+  if print_result:
+    _PrintResult(component_trace, verbose=component_trace.verbose, loop=loop)
   result = component_trace.GetResult()
   return result
 
 
+def _RunBatch(component, args, parsed_flag_args, context, name, loop):
+  """Runs each command of the --batch file against the same component.
+
+  Each line of the file is the args of one command, which follow args. Blank
+  lines and lines starting with '#' are skipped. A command that fails is
+  reported like a single command would be, and the batch continues with the
+  next one. With --batch-format json, a JSON object with the command, its
+  status, exit code, result or error and duration is printed for each command
+  instead of its result.
+
+  With --jobs N, N commands run at a time in a pool of threads, or of forked
+  processes with --batch-pool process. The output of each command is held back
+  until the commands before it are done, so that it is in the same order as
+  without --jobs.
+
+  Args:
+    component: The target component for Fire.
+    args: The args that precede the args of each command.
+    parsed_flag_args: The values of the Fire flags, which apply to every
+        command.
+    context: A dict with the local and global variables available at the call
+        to Fire.
+    name: The name of the command.
+    loop: The _EventLoop to run the commands on, if they are run one at a time.
+  Returns:
+    A list with the result of each command, None for commands that failed. With
+    --batch-pool process, results that cannot be pickled are None as well.
+  Raises:
+    FireExit: With code 2 if the batch file cannot be opened, or once every
+        command has run, with the largest exit code of the commands if any
+        failed.
+  """
+  as_json = parsed_flag_args.batch_format == 'json'
+  if parsed_flag_args.batch == '-':
+    lines = sys.stdin
+  else:
+    try:
+      lines = open(parsed_flag_args.batch)
+    except (IOError, OSError) as e:
+      component_trace = trace.FireTrace(
+          component, name=name, separator=parsed_flag_args.separator,
+          verbose=parsed_flag_args.verbose)
+      component_trace.AddError(
+          FireError('Could not open batch file:', str(e)), list(args))
+      _DisplayError(component_trace)
+      raise FireExit(2, component_trace)
+
+  results = []
+  exit_code = 0
+  failed_trace = None
+  try:
+    commands = (line.strip() for line in lines)
+    commands = (command for command in commands
+                if command and not command.startswith('#'))
+    if parsed_flag_args.jobs > 1:
+      outcomes = _RunInPool(
+          _RunBatchJob, _RunBatchJobInProcess, commands, parsed_flag_args,
+          (component, args, parsed_flag_args, context, name, as_json))
+    else:
+      outcomes = (
+          _RunBatchCommand(component, args, command, parsed_flag_args,
+                           context, name, loop, as_json) + (None, None)
+          for command in commands)
+    try:
+      for (code, result, error, component_trace, record, output,
+           errors) in outcomes:
+        if output:
+          sys.stdout.write(output)
+        if errors:
+          sys.stderr.write(errors)
+        if record is not None:
+          print(record)
+        sys.stdout.flush()
+        if code > exit_code:
+          if component_trace is None:
+            # The command ran in another process.
+            component_trace = trace.FireTrace(
+                component, name=name, separator=parsed_flag_args.separator,
+                verbose=parsed_flag_args.verbose)
+            component_trace.AddError(FireError(error), list(args))
+          exit_code, failed_trace = code, component_trace
+        results.append(result)
+    finally:
+      if hasattr(outcomes, 'close'):
+        outcomes.close()
+  finally:
+    if lines is not sys.stdin:
+      lines.close()
+
+  if exit_code:
+    raise FireExit(exit_code, failed_trace)
+  return results
+
+
+def _RunBatchCommand(component, args, command, parsed_flag_args, context, name,
+                     loop, as_json):
+  """Runs one command of a batch, see _RunBatch.
+
+  Returns:
+    A tuple of the exit code of the command, its result, its error message or
+    None, its FireTrace, and its JSON Lines record if as_json or else None.
+  """
+  start = time.time()
+  try:
+    command_args = shlex.split(command)
+  except ValueError as e:
+    # The command's quotes are unbalanced.
+    component_trace = trace.FireTrace(
+        component, name=name, separator=parsed_flag_args.separator,
+        verbose=parsed_flag_args.verbose)
+    component_trace.AddError(
+        FireError('Could not split command:', str(e)), list(args))
+  else:
+    component_trace = _Fire(component, list(args) + command_args,
+                            parsed_flag_args, context, name, strict=True,
+                            loop=loop)
+  code = 0
+  result = None
+  error = None
+  try:
+    result = _HandleTrace(component_trace, parsed_flag_args, loop,
+                          print_result=not as_json)
+  except FireExit as e:
+    code = e.code
+    if code and component_trace.HasError():
+      error = component_trace.elements[-1].ErrorAsStr()
+  if not as_json:
+    return code, result, error, component_trace, None
+
+  if inspectutils.IsAsyncIterable(result):
+    result = list(loop.Iterate(result))
+  record = {
+      'command': command,
+      'status': 'error' if code else 'ok',
+      'exit_code': code,
+      'seconds': round(time.time() - start, 6),
+  }
+  if code:
+    record['error'] = error
+  else:
+    record['result'] = result
+  try:
+    text = json.dumps(record, ensure_ascii=False, default=_JsonDefault)
+  except ValueError:  # The result has circular references.
+    record['result'] = _OneLineResult(result)
+    text = json.dumps(record, ensure_ascii=False)
+  return code, result, error, component_trace, text
+
+
+def _RunMap(component, args, parsed_flag_args, context, name, loop):
+  """Calls the command's final routine or class once per line of stdin.
+
+  The command is resolved once, up to its final call, which is then made for
+  each line with the args left for it and the line as the argument named by
+  --map, as if it were passed as --ARGNAME=LINE. Blank lines are skipped. The
+  result of each call is printed as it is produced, and not kept, so that input
+  of any size is streamed. A line that cannot be used to call the routine is
+  reported with its number and the map continues with the next one.
+
+  With --jobs N, N lines are handled at a time in a pool of threads, or of
+  forked processes with --batch-pool process, and their output is printed in
+  the order of the lines.
+
+  Args:
+    component: The target component for Fire.
+    args: The args of the command.
+    parsed_flag_args: The values of the Fire flags.
+    context: A dict with the local and global variables available at the call
+        to Fire.
+    name: The name of the command.
+    loop: The _EventLoop to run the calls on, if they are made one at a time.
+  Returns:
+    The result of the command, if flags such as --help kept it from calling its
+    final routine for each line.
+  Raises:
+    FireExit: With code 2 if the command cannot be resolved or does not end at
+        a routine or class, or once every line is handled if any failed.
+  """
+  component_trace = _Fire(component, args, parsed_flag_args, context, name,
+                          strict=True, loop=loop)
+  if (component_trace.map_args is None and not component_trace.HasError()
+      and _MapsLines(parsed_flag_args) and not component_trace.show_help):
+    component_trace.AddError(
+        FireError('--map requires a command that ends at a routine or class:',
+                  component_trace.GetCommand()),
+        [])
+  if component_trace.map_args is None or component_trace.HasError():
+    return _HandleTrace(component_trace, parsed_flag_args, loop)
+  try:
+    plan = _MapPlan(component_trace, parsed_flag_args.map)
+  except FireError as error:
+    component_trace.AddError(error, component_trace.map_args)
+    return _HandleTrace(component_trace, parsed_flag_args, loop)
+
+  lines = ((index, line.strip()) for index, line in enumerate(sys.stdin, 1))
+  lines = ((index, line) for index, line in lines if line)
+  if parsed_flag_args.jobs > 1:
+    outcomes = _RunInPool(_RunMapJob, _RunMapJobInProcess, lines,
+                          parsed_flag_args, plan)
+  else:
+    outcomes = (plan.Call(index, line, loop) + (None, None)
+                for index, line in lines)
+
+  count = 0
+  failed = 0
+  failed_trace = None
+  try:
+    for code, error, line_trace, output, errors in outcomes:
+      if output:
+        sys.stdout.write(output)
+      if errors:
+        sys.stderr.write(errors)
+      count += 1
+      if code:
+        failed += 1
+        if failed_trace is None:
+          if line_trace is None:
+            # The line was handled in another process.
+            line_trace = plan.Trace()
+            line_trace.AddError(FireError(error), plan.args)
+          failed_trace = line_trace
+  finally:
+    if hasattr(outcomes, 'close'):
+      outcomes.close()
+    sys.stdout.flush()
+
+  if failed:
+    print(formatting.Error('ERROR: ')
+          + '{failed} of {count} lines failed.'.format(failed=failed,
+                                                       count=count),
+          file=sys.stderr)
+    raise FireExit(2, failed_trace)
+  return None
+
+
+def _MapsLines(parsed_flag_args):
+  """Returns whether the command's final call is made for each line of stdin.
+
+  Flags such as --help show what the command is rather than run it, so --map
+  does nothing with them.
+  """
+  return parsed_flag_args.map is not None and not (
+      parsed_flag_args.help or parsed_flag_args.interactive
+      or parsed_flag_args.trace or parsed_flag_args.completion is not None
+      or parsed_flag_args.help_all is not None)
+
+
+class _MapPlan(object):
+  """How _RunMap calls the final routine or class of a command for each line."""
+
+  def __init__(self, component_trace, arg_name):
+    """Resolves how to call the result of component_trace with --arg_name.
+
+    Args:
+      component_trace: The FireTrace of the command, up to its final call.
+      arg_name: The name of the argument to pass each line as.
+    Raises:
+      FireError: If the routine or class has no argument named arg_name.
+    """
+    self.trace = component_trace
+    self.target = component_trace.GetResult()
+    self.args = component_trace.map_args
+    self.treatment = 'class' if inspect.isclass(self.target) else 'routine'
+    self.parse = _MakeParseFn(self.target,
+                              decorators.GetMetadata(self.target))
+    spec = inspectutils.GetFullArgSpec(self.target)
+    keyword = arg_name.replace('-', '_')
+    if keyword not in spec.args + spec.kwonlyargs and not spec.varkw:
+      raise FireError('The --map argument is not an argument of {target}:'
+                      .format(target=self.target.__name__), arg_name)
+    self.flag = '--{keyword}='.format(keyword=keyword)
+
+  def Trace(self):
+    """Returns a copy of the trace of the command up to its final call."""
+    line_trace = copy.copy(self.trace)
+    line_trace.elements = list(self.trace.elements)
+    return line_trace
+
+  def Call(self, index, line, loop):
+    """Calls the target with line, printing the result or the error.
+
+    Args:
+      index: The line number of line, counting from 1.
+      line: The line of stdin to pass as the --map argument.
+      loop: The _EventLoop to await the result on.
+    Returns:
+      A tuple of the exit code of the call, its error message or None, and its
+      FireTrace.
+    """
+    line_trace = self.Trace()
+    args = self.args + [self.flag + line]
+    try:
+      _CallAndUpdateTrace(self.target, args, line_trace,
+                          treatment=self.treatment,
+                          target=self.target.__name__, strict=True, loop=loop,
+                          parse=self.parse)
+    except FireError as error:
+      line_trace.AddError(error, args)
+      error = line_trace.elements[-1].ErrorAsStr()
+      print(formatting.Error('ERROR: ')
+            + 'Line {index}: {error}'.format(index=index, error=error),
+            file=sys.stderr)
+      return 2, error, line_trace
+    _PrintResult(line_trace, verbose=line_trace.verbose, loop=loop)
+    return 0, None, line_trace
+
+
+def _RunMapJob(item):
+  """Calls the target of the _batch's _MapPlan with a numbered line."""
+  (plan, _, _), (index, line) = _batch, item
+  return _RunCaptured(lambda loop: plan.Call(index, line, loop))
+
+
+def _RunMapJobInProcess(item):
+  """Calls the target like _RunMapJob, returning only what can be pickled."""
+  code, error, _, output, errors = _RunMapJob(item)
+  return code, error, None, output, errors
+
+
+def _RunInPool(job, process_job, items, parsed_flag_args, state):
+  """Yields the outcomes of running job on items in a pool of workers, in order.
+
+  Jobs get state from _batch, and run with _RunCaptured. While the pool runs,
+  sys.stdout and sys.stderr are replaced with streams that keep what each job
+  writes, which is part of its outcome.
+
+  Items are read from items only as far ahead of the outcomes yielded as the
+  workers can use, so that items and outcomes of any number are streamed.
+
+  Args:
+    job: The function to run on each item in a pool of threads.
+    process_job: The function to run on each item in a pool of processes. Its
+        outcomes must be picklable.
+    items: The items to run job on.
+    parsed_flag_args: The values of the Fire flags, with the size and kind of
+        the pool and how many items each worker takes at a time.
+    state: What the jobs need besides their item.
+  """
+  # Imported here, as few commands run in a pool.
+  import multiprocessing  # pylint: disable=g-import-not-at-top,import-outside-toplevel
+  import multiprocessing.pool  # pylint: disable=g-import-not-at-top,import-outside-toplevel
+
+  global _batch
+  stdout = _CapturedOutput(sys.stdout)
+  stderr = _CapturedOutput(sys.stderr)
+  _batch = (state, stdout, stderr)
+  sys.stdout, sys.stderr = stdout, stderr
+  try:
+    if parsed_flag_args.batch_pool == 'process' and hasattr(os, 'fork'):
+      pool_context = (
+          multiprocessing.get_context('fork')
+          if hasattr(multiprocessing, 'get_context') else multiprocessing)
+      pool = pool_context.Pool(parsed_flag_args.jobs)
+      job = process_job
+    else:
+      pool = multiprocessing.pool.ThreadPool(parsed_flag_args.jobs)
+    # Pool.imap reads items as fast as it can, so they are let through only as
+    # the outcomes of those before them are yielded.
+    in_flight = threading.Semaphore(
+        2 * parsed_flag_args.jobs * parsed_flag_args.chunk_size)
+    stopped = threading.Event()
+
+    def Bounded():
+      for item in items:
+        in_flight.acquire()
+        if stopped.is_set():
+          return
+        yield item
+
+    try:
+      for outcome in pool.imap(job, Bounded(), parsed_flag_args.chunk_size):
+        in_flight.release()
+        yield outcome
+      pool.close()
+    finally:
+      # Lets the pool's task handler out of Bounded, which terminate waits for.
+      stopped.set()
+      in_flight.release()
+      # Stops the workers at once if a job raised an exception.
+      pool.terminate()
+      pool.join()
+  finally:
+    sys.stdout, sys.stderr = stdout.stream, stderr.stream
+    _batch = None
+
+
+def _RunCaptured(run):
+  """Returns the outcome of run(loop), a tuple, followed by what run wrote.
+
+  run is given an _EventLoop of its own. It must run in a job of _RunInPool.
+  """
+  _, stdout, stderr = _batch
+  stdout.Capture()
+  stderr.Capture()
+  loop = _EventLoop()
+  try:
+    outcome = run(loop)
+  finally:
+    loop.Close()
+    output = stdout.Release()
+    errors = stderr.Release()
+  return outcome + (output, errors)
+
+
+def _RunBatchJob(command):
+  """Runs command of the _batch on its own event loop, keeping its output."""
+  (component, args, parsed_flag_args, context, name, as_json), _, _ = _batch
+  return _RunCaptured(
+      lambda loop: _RunBatchCommand(component, args, command, parsed_flag_args,
+                                    context, name, loop, as_json))
+
+
+def _RunBatchJobInProcess(command):
+  """Runs command like _RunBatchJob, returning only what can be pickled."""
+  import pickle  # pylint: disable=g-import-not-at-top,import-outside-toplevel
+
+  code, result, error, _, record, output, errors = _RunBatchJob(command)
+  try:
+    pickle.dumps(result)
+  except Exception:  # pylint: disable=broad-except
+    result = None
+  return code, result, error, None, record, output, errors
+
+
+class _CapturedOutput(object):
+  """Stands in for an output stream while the commands of a batch run.
+
+  What a worker writes while it runs a command is kept for that command. What
+  other threads write goes to the stream.
+  """
+
+  def __init__(self, stream):
+    self.stream = stream
+    self._local = threading.local()
+
+  def Capture(self):
+    """Starts keeping what the current thread writes."""
+    self._local.buffer = six.StringIO()
+
+  def Release(self):
+    """Stops keeping what the current thread writes, and returns it."""
+    buffer = self._local.buffer
+    self._local.buffer = None
+    return buffer.getvalue()
+
+  def write(self, text):  # pylint: disable=invalid-name
+    buffer = getattr(self._local, 'buffer', None)
+    if buffer is None:
+      return self.stream.write(text)
+    return buffer.write(text)
+
+  def flush(self):  # pylint: disable=invalid-name
+    if getattr(self._local, 'buffer', None) is None:
+      self.stream.flush()
+
+  def isatty(self):  # pylint: disable=invalid-name
+    # What is kept is not shown on a terminal, so it should not be paged.
+    return (getattr(self._local, 'buffer', None) is None
+            and self.stream.isatty())
+
+  def __getattr__(self, name):
+    return getattr(self.stream, name)
+
+
+def _JsonDefault(obj):
+  """Returns a value json can serialize in place of obj."""
+  if isinstance(obj, (set, frozenset, types.GeneratorType)):
+    return list(obj)
+  return _OneLineResult(obj)
+
+
 def Display(lines, out):
-  text = '\n'.join(lines) + '\n'
-  console_io.More(text, out=out)
+  """Shows lines on out, through a pager if out is interactive.
+
+  Args:
+    lines: The lines to show. Each is a string or, for text rendered
+      incrementally such as help screens, an iterable of strings that
+      concatenated are the line. These are only consumed as they are shown.
+    out: The output stream.
+  """
+  console_io.More(_DisplayChunks(lines), out=out)
+
+
+def _DisplayChunks(lines):
+  """Yields the text of Display's lines, separated by newlines, in chunks."""
+  for index, line in enumerate(lines):
+    if index:
+      yield '\n'
+    if isinstance(line, six.string_types):
+      yield line
+    else:
+      for chunk in line:
+        yield chunk
+  yield '\n'
 
 
 def CompletionScript(name, component, shell):
@@ -208,6 +765,52 @@ class FireExit(SystemExit):  # pylint: disable=g-bad-exception-name
     self.trace = component_trace
 
 
+class _EventLoop(object):
+  """The event loop that awaitables are run on for the duration of a command.
+
+  The loop is only created when the first awaitable is run, using uvloop if
+  USE_UVLOOP is set. It is the running loop while awaitables run on it, but is
+  never made the current event loop, so the current event loop is left as it
+  was.
+  """
+
+  def __init__(self):
+    self._loop = None
+
+  def _GetLoop(self):
+    if self._loop is None:
+      if USE_UVLOOP:
+        import uvloop  # pylint: disable=import-error,g-import-not-at-top,import-outside-toplevel  # pytype: disable=import-error
+        self._loop = uvloop.new_event_loop()
+      else:
+        self._loop = asyncio.new_event_loop()
+    return self._loop
+
+  def Run(self, awaitable):
+    """Runs awaitable to completion and returns its result."""
+    return self._GetLoop().run_until_complete(awaitable)
+
+  def Iterate(self, async_iterable):
+    """Yields the items of async_iterable as they are produced."""
+    iterator = async_iterable.__aiter__()
+    while True:
+      try:
+        yield self.Run(iterator.__anext__())
+      except StopAsyncIteration:  # pylint: disable=undefined-variable
+        return
+
+  def Close(self):
+    """Finalizes any unfinished async generators and closes the loop."""
+    if self._loop is None:
+      return
+    try:
+      if hasattr(self._loop, 'shutdown_asyncgens'):
+        self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+    finally:
+      self._loop.close()
+      self._loop = None
+
+
 def _IsHelpShortcut(component_trace, remaining_args):
   """Determines if the user is trying to access help without '--' separator.
 
@@ -230,7 +833,7 @@ def _IsHelpShortcut(component_trace, remaining_args):
         _, remaining_kwargs, _ = _ParseKeywordArgs(remaining_args, fn_spec)
         show_help = target in remaining_kwargs
       else:
-        members = dict(inspect.getmembers(component))
+        members = dict(inspectutils.GetStaticMembers(component))
         show_help = target not in members
 
   if show_help:
@@ -241,8 +844,15 @@ def _IsHelpShortcut(component_trace, remaining_args):
   return show_help
 
 
-def _PrintResult(component_trace, verbose=False):
-  """Prints the result of the Fire call to stdout in a human readable way."""
+def _PrintResult(component_trace, verbose=False, loop=None):
+  """Prints the result of the Fire call to stdout in a human readable way.
+
+  Args:
+    component_trace: The FireTrace of the command, with its result.
+    verbose: Whether to include private members in help screens.
+    loop: The _EventLoop to iterate an async iterable result on, streaming its
+      items as they are produced.
+  """
   # TODO(dbieber): Design human readable deserializable serialization method
   # and move serialization to its own module.
   result = component_trace.GetResult()
@@ -256,6 +866,9 @@ def _PrintResult(component_trace, verbose=False):
   if isinstance(result, (list, set, frozenset, types.GeneratorType)):
     for i in result:
       print(_OneLineResult(i))
+  elif inspectutils.IsAsyncIterable(result) and loop is not None:
+    for i in loop.Iterate(result):
+      print(_OneLineResult(i))
   elif inspect.isgeneratorfunction(result):
     raise NotImplementedError
   elif isinstance(result, dict) and value_types.IsSimpleGroup(result):
@@ -266,7 +879,7 @@ def _PrintResult(component_trace, verbose=False):
     if result is not None:
       print(result)
   else:
-    help_text = helptext.HelpText(
+    help_text = helpcache.HelpTextChunks(
         result, trace=component_trace, verbose=verbose)
     output = [help_text]
     Display(output, out=sys.stdout)
@@ -286,15 +899,15 @@ def _DisplayError(component_trace):
     command = '{cmd} -- --help'.format(cmd=component_trace.GetCommand())
     print('INFO: Showing help with the command {cmd}.\n'.format(
         cmd=pipes.quote(command)), file=sys.stderr)
-    help_text = helptext.HelpText(result, trace=component_trace,
-                                  verbose=component_trace.verbose)
+    help_text = helpcache.HelpTextChunks(result, trace=component_trace,
+                                        verbose=component_trace.verbose)
     output.append(help_text)
     Display(output, out=sys.stderr)
   else:
     print(formatting.Error('ERROR: ')
           + component_trace.elements[-1].ErrorAsStr(),
           file=sys.stderr)
-    error_text = helptext.UsageText(result, trace=component_trace,
+    error_text = helpcache.UsageText(result, trace=component_trace,
                                     verbose=component_trace.verbose)
     print(error_text, file=sys.stderr)
 
@@ -356,7 +969,8 @@ def _OneLineResult(result):
     return str(result).replace('\n', ' ')
 
 
-def _Fire(component, args, parsed_flag_args, context, name=None, strict=True):
+def _Fire(component, args, parsed_flag_args, context, name=None, strict=True,
+          loop=None):
   """Execute a Fire command on a target component using the args supplied.
 
   Arguments that come after a final isolated '--' are treated as Flags, eg for
@@ -400,6 +1014,8 @@ def _Fire(component, args, parsed_flag_args, context, name=None, strict=True):
         to Fire.
     name: Optional. The name of the command. Used in interactive mode and in
         the tab completion script.
+    strict: Whether to raise an error for arguments a call does not accept.
+    loop: Optional. The _EventLoop to run the awaitables that calls return on.
   Returns:
     FireTrace of components starting with component, tracing Fire's execution
         path as it consumes args.
@@ -413,6 +1029,8 @@ def _Fire(component, args, parsed_flag_args, context, name=None, strict=True):
   show_completion = parsed_flag_args.completion
   show_help = parsed_flag_args.help
   show_trace = parsed_flag_args.trace
+  export_help = parsed_flag_args.help_all is not None
+  map_lines = _MapsLines(parsed_flag_args)
 
   # component can be a module, class, routine, object, etc.
   if component is None:
@@ -430,7 +1048,8 @@ def _Fire(component, args, parsed_flag_args, context, name=None, strict=True):
     initial_args = remaining_args
 
     if not remaining_args and (show_help or interactive or show_trace
-                               or show_completion is not None):
+                               or show_completion is not None
+                               or export_help):
       # Don't initialize the final class or call the final function unless
       # there's a separator after it, and instead process the current component.
       break
@@ -439,6 +1058,14 @@ def _Fire(component, args, parsed_flag_args, context, name=None, strict=True):
       remaining_args = []
       break
 
+    if (map_lines and separator not in remaining_args
+        and (inspect.isclass(component) or inspect.isroutine(component))):
+      # With --map, the final class or routine is called for each line of stdin
+      # instead, with the remaining args.
+      component_trace.map_args = remaining_args
+      remaining_args = []
+      break
+
     saved_args = []
     used_separator = False
     if separator in remaining_args:
@@ -455,7 +1082,8 @@ def _Fire(component, args, parsed_flag_args, context, name=None, strict=True):
     is_callable = inspect.isclass(component) or inspect.isroutine(component)
     is_callable_object = callable(component) and not is_callable
     is_sequence = isinstance(component, (list, tuple))
-    is_map = isinstance(component, dict) or inspectutils.IsNamedTuple(component)
+    is_map = (isinstance(component, (dict, lazy.LazyGroup))
+              or inspectutils.IsNamedTuple(component))
 
     if not handled and is_callable:
       # The component is a class or a routine; we'll try to initialize it or
@@ -469,7 +1097,8 @@ def _Fire(component, args, parsed_flag_args, context, name=None, strict=True):
             component_trace,
             treatment='class' if is_class else 'routine',
             target=component.__name__,
-            strict=strict)
+            strict=strict,
+            loop=loop)
         handled = True
       except FireError as error:
         candidate_errors.append((error, initial_args))
@@ -517,9 +1146,11 @@ def _Fire(component, args, parsed_flag_args, context, name=None, strict=True):
         # The target isn't present in the dict as a string key, but maybe it is
         # a key as another type.
         # TODO(dbieber): Consider alternatives for accessing non-string keys.
-        for key, value in component_dict.items():
+        # Only the matching value is looked up, so a LazyGroup imports nothing
+        # else.
+        for key in component_dict:
           if target == str(key):
-            component = value
+            component = component_dict[key]
             handled = True
             break
 
@@ -559,7 +1190,8 @@ def _Fire(component, args, parsed_flag_args, context, name=None, strict=True):
             remaining_args,
             component_trace,
             treatment='callable',
-            strict=strict)
+            strict=strict,
+            loop=loop)
         handled = True
       except FireError as error:
         candidate_errors.append((error, initial_args))
@@ -593,7 +1225,12 @@ def _Fire(component, args, parsed_flag_args, context, name=None, strict=True):
         initial_args)
     return component_trace
 
-  if show_completion is not None:
+  if show_completion == completion.DYNAMIC_SHELL:
+    # List the completions for the current component only. Completion scripts
+    # use this for the subtrees they had to prune.
+    script = '\n'.join(completion.Completions(component, verbose=verbose))
+    component_trace.AddCompletionScript(script)
+  elif show_completion is not None:
     if name is None:
       raise ValueError('Cannot make completion script without command name')
     script = CompletionScript(name, initial_component, shell=show_completion)
@@ -649,7 +1286,7 @@ def _GetMember(component, args):
 
 
 def _CallAndUpdateTrace(component, args, component_trace, treatment='class',
-                        target=None, strict=True):
+                        target=None, strict=True, loop=None, parse=None):
   """Call the component by consuming args from args, and update the FireTrace.
 
   The component could be a class, a routine, or a callable object. This function
@@ -663,6 +1300,11 @@ def _CallAndUpdateTrace(component, args, component_trace, treatment='class',
         as a class, a routine, or a callable.
     target: Target in FireTrace element, default is None. If the value is None,
         the component itself will be used as target.
+    strict: Whether to raise an error for arguments the call does not accept.
+    loop: The _EventLoop to await the result on if it is awaitable. If None, an
+        event loop is made for just this call.
+    parse: The parse function for the call, see _MakeParseFn. If None, it is
+        made for this call.
   Returns:
     component: The object that is the result of the callable call.
     remaining_args: The remaining args that haven't been consumed yet.
@@ -672,7 +1314,8 @@ def _CallAndUpdateTrace(component, args, component_trace, treatment='class',
   filename, lineno = inspectutils.GetFileAndLine(component)
   metadata = decorators.GetMetadata(component)
   fn = component.__call__ if treatment == 'callable' else component
-  parse = _MakeParseFn(fn, metadata)
+  if parse is None:
+    parse = _MakeParseFn(fn, metadata)
   (varargs, kwargs), consumed_args, remaining_args, capacity = parse(args)
 
   # In strict mode, raise an error if unknown arguments are present
@@ -681,12 +1324,17 @@ def _CallAndUpdateTrace(component, args, component_trace, treatment='class',
           raise FireError("Unknown argument{}: {}".format(
               "s" if len(remaining_args) > 1 else "", remaining_args))
 
-  # Call the function.
-  if inspectutils.IsCoroutineFunction(fn):
-    loop = asyncio.get_event_loop()
-    component = loop.run_until_complete(fn(*varargs, **kwargs))
-  else:
-    component = fn(*varargs, **kwargs)
+  # Call the function, and await its result if it is e.g. a coroutine.
+  component = fn(*varargs, **kwargs)
+  if inspectutils.IsAwaitable(component):
+    if loop is None:
+      call_loop = _EventLoop()
+      try:
+        component = call_loop.Run(component)
+      finally:
+        call_loop.Close()
+    else:
+      component = loop.Run(component)
 
   if treatment == 'class':
     action = trace.INSTANTIATED_CLASS
@@ -714,11 +1362,7 @@ def _MakeParseFn(fn, metadata):
     the leftover args from the arguments to the parse function.
   """
   fn_spec = inspectutils.GetFullArgSpec(fn)
-
-  # Note: num_required_args is the number of positional arguments without
-  # default values. All of these arguments are required.
-  num_required_args = len(fn_spec.args) - len(fn_spec.defaults)
-  required_kwonly = set(fn_spec.kwonlyargs) - set(fn_spec.kwonlydefaults)
+  plan = _GetParsePlan(fn_spec)
 
   def _ParseFn(args):
     """Parses the list of `args` into (varargs, kwargs), remaining_args."""
@@ -726,18 +1370,18 @@ def _MakeParseFn(fn, metadata):
 
     # Note: _ParseArgs modifies kwargs.
     parsed_args, kwargs, remaining_args, capacity = _ParseArgs(
-        fn_spec.args, fn_spec.defaults, num_required_args, kwargs,
+        fn_spec.args, fn_spec.defaults, plan.num_required_args, kwargs,
         remaining_args, metadata)
 
     if fn_spec.varargs or fn_spec.varkw:
       # If we're allowed *varargs or **kwargs, there's always capacity.
       capacity = True
 
-    extra_kw = set(kwargs) - set(fn_spec.kwonlyargs)
+    extra_kw = set(kwargs) - plan.kwonlyargs
     if fn_spec.varkw is None and extra_kw:
       raise FireError('Unexpected kwargs present:', extra_kw)
 
-    missing_kwonly = set(required_kwonly) - set(kwargs)
+    missing_kwonly = plan.required_kwonly - set(kwargs)
     if missing_kwonly:
       raise FireError('Missing required flags:', missing_kwonly)
 
@@ -759,6 +1403,41 @@ def _MakeParseFn(fn, metadata):
   return _ParseFn
 
 
+class _ParsePlan(object):
+  """What parsing the arguments of a function needs from its argspec.
+
+  It does not refer to the argspec, so that it does not keep the argspec alive
+  as a value in _parse_plans.
+
+  Attributes:
+    num_required_args: The number of positional arguments without default
+        values. All of these arguments are required.
+    kwonlyargs: The names of the keyword only arguments.
+    required_kwonly: The names of the keyword only arguments without defaults.
+    arg_names: The names of all the arguments that can be given as flags.
+    shortcuts: The names of the arguments that can be given as flags, in order,
+        by their first letter, which is the single-character flag for them.
+  """
+
+  def __init__(self, fn_spec):
+    self.num_required_args = len(fn_spec.args) - len(fn_spec.defaults)
+    self.kwonlyargs = frozenset(fn_spec.kwonlyargs)
+    self.required_kwonly = self.kwonlyargs - frozenset(fn_spec.kwonlydefaults)
+    fn_args = fn_spec.args + fn_spec.kwonlyargs
+    self.arg_names = frozenset(fn_args)
+    self.shortcuts = {}
+    for arg in fn_args:
+      self.shortcuts.setdefault(arg[0], []).append(arg)
+
+
+def _GetParsePlan(fn_spec):
+  """Returns the _ParsePlan for fn_spec, an inspectutils.FullArgSpec."""
+  plan = _parse_plans.get(fn_spec)
+  if plan is None:
+    plan = _parse_plans[fn_spec] = _ParsePlan(fn_spec)
+  return plan
+
+
 def _ParseArgs(fn_args, fn_defaults, num_required_args, kwargs,
                remaining_args, metadata):
   """Parses the positional and named arguments from the available supplied args.
@@ -846,11 +1525,13 @@ def _ParseKeywordArgs(args, fn_spec):
   remaining_kwargs = []
   remaining_args = []
   fn_keywords = fn_spec.varkw
-  fn_args = fn_spec.args + fn_spec.kwonlyargs
 
   if not args:
     return kwargs, remaining_kwargs, remaining_args
 
+  plan = _GetParsePlan(fn_spec)
+  fn_args = plan.arg_names
+
   skip_argument = False
 
   for index, argument in enumerate(args):
@@ -888,7 +1569,7 @@ def _ParseKeywordArgs(args, fn_spec):
         keyword = key
       elif len(key) == 1:
         # This may be a shortcut flag.
-        matching_fn_args = [arg for arg in fn_args if arg[0] == key]
+        matching_fn_args = plan.shortcuts.get(key, [])
         if len(matching_fn_args) == 1:
           keyword = matching_fn_args[0]
         elif len(matching_fn_args) > 1:
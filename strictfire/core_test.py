@@ -18,7 +18,14 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import os
+import shutil
+import sys
+import tempfile
+import time
+
 from strictfire import core
+from strictfire import parser
 from strictfire import test_components as tc
 from strictfire import testutils
 from strictfire import trace
@@ -95,6 +102,156 @@ class CoreTest(testutils.BaseTestCase):
     with self.assertRaisesFireExit(0, 'INFO:.*SYNOPSIS.*echo'):
       core.StrictFire(tc.TypedProperties, command=['echo', '--help'])
 
+  def testHelpAll(self):
+    directory = tempfile.mkdtemp()
+    try:
+      with self.assertRaisesFireExit(0):
+        with self.assertOutputMatches(stdout='cli-double.1', stderr=None):
+          core.StrictFire(tc.WithDefaults(), name='cli', command=[
+              '--', '--help-all', directory, '--help-format', 'man'])
+      self.assertEqual(sorted(os.listdir(directory)),
+                       ['cli-double.1', 'cli-text.1', 'cli-triple.1', 'cli.1'])
+    finally:
+      shutil.rmtree(directory)
+
+  def testBatch(self):
+    directory = tempfile.mkdtemp()
+    try:
+      path = os.path.join(directory, 'commands')
+      with open(path, 'w') as f:
+        f.write('double 2\n\n# A comment.\ndouble --unknown 1\ntriple 3\n')
+      with self.assertRaisesFireExit(2):
+        with self.assertOutputMatches(stdout='^4\n9\n$',
+                                      stderr='ERROR:.*unknown'):
+          core.StrictFire(tc.WithDefaults(), command=['--', '--batch', path])
+    finally:
+      shutil.rmtree(directory)
+
+  def testBatchJsonFromStdin(self):
+    commands = six.StringIO('double 2\ndouble "2\n')
+    with mock.patch.object(sys, 'stdin', commands):
+      with self.assertRaisesFireExit(2):
+        with self.assertOutputMatches(
+            stdout=('{"command": "double 2", "status": "ok", "exit_code": 0, '
+                    '"seconds": .*, "result": 4}\n'
+                    '{"command": "double \\\\"2", "status": "error", '
+                    '"exit_code": 2, "seconds": .*, '
+                    '"error": "Could not split command: No closing '
+                    'quotation"}\n$'),
+            stderr=None):
+          core.StrictFire(tc.WithDefaults(), command=[
+              '--', '--batch', '-', '--batch-format', 'json'])
+
+  def testBatchMissingFile(self):
+    directory = tempfile.mkdtemp()
+    try:
+      path = os.path.join(directory, 'missing')
+      with self.assertRaisesFireExit(2, 'ERROR: Could not open batch file:'):
+        core.StrictFire(tc.WithDefaults(), command=['--', '--batch', path])
+    finally:
+      shutil.rmtree(directory)
+
+  def testBatchReturnsResults(self):
+    commands = six.StringIO('double 2\ntriple 2\n')
+    with mock.patch.object(sys, 'stdin', commands):
+      with self.assertOutputMatches(stdout='^4\n6\n$', stderr=None):
+        results = core.StrictFire(tc.WithDefaults(),
+                                  command=['--', '--batch', '-'])
+    self.assertEqual(results, [4, 6])
+
+  def testBatchJobsKeepOrder(self):
+    commands = ''.join('double {}\n'.format(count) for count in range(20))
+    expected = ''.join('{}\n'.format(2 * count) for count in range(20))
+    for pool in parser.BATCH_POOLS:
+      with mock.patch.object(sys, 'stdin', six.StringIO(commands)):
+        with self.assertOutputMatches(stdout='^{}$'.format(expected),
+                                      stderr=None):
+          core.StrictFire(tc.WithDefaults(), command=[
+              '--', '--batch', '-', '--jobs', '4', '--batch-pool', pool])
+
+  def testBatchJobsReportErrorsInOrder(self):
+    commands = six.StringIO('double 1\ndouble --unknown 1\ntriple 1\n')
+    stdout = sys.stdout
+    with mock.patch.object(sys, 'stdin', commands):
+      with self.assertRaisesFireExit(2):
+        with self.assertOutputMatches(stdout='^2\n3\n$',
+                                      stderr='ERROR:.*unknown'):
+          core.StrictFire(
+              tc.WithDefaults(), command=['--', '--batch', '-', '--jobs', '2'])
+    self.assertIs(sys.stdout, stdout)
+
+  def testMap(self):
+    lines = six.StringIO('1\n\n2\n')
+    with mock.patch.object(sys, 'stdin', lines):
+      with self.assertOutputMatches(stdout='^4\n6\n$', stderr=None):
+        result = core.StrictFire(tc.MixedDefaults(), command=[
+            'sum', '--alpha', '2', '--', '--map', 'beta'])
+    self.assertIsNone(result)
+
+  def testMapCallsOnlyForLines(self):
+    calls = []
+    component = {'record': lambda value: calls.append(value)}
+    with mock.patch.object(sys, 'stdin', six.StringIO('')):
+      core.StrictFire(component, command=['record', '--', '--map', 'value'])
+    self.assertEqual(calls, [])
+
+  def testMapReportsFailedLines(self):
+    lines = six.StringIO('1\n2\n')
+    with mock.patch.object(sys, 'stdin', lines):
+      with self.assertRaisesFireExit(2):
+        with self.assertOutputMatches(
+            stdout='^$',
+            stderr=('ERROR: Line 1: .*required argument: alpha\n'
+                    'ERROR: Line 2: .*\nERROR: 2 of 2 lines failed.')):
+          core.StrictFire(tc.MixedDefaults(),
+                          command=['identity', '--', '--map', 'beta'])
+
+  def testMapUnknownArgument(self):
+    with self.assertRaisesFireExit(2, 'ERROR: The --map argument.*: gamma'):
+      core.StrictFire(tc.MixedDefaults(),
+                      command=['sum', '--', '--map', 'gamma'])
+
+  def testMapJobsKeepOrder(self):
+    lines = ''.join('{}\n'.format(count) for count in range(20))
+    expected = ''.join('{}\n'.format(2 * count) for count in range(20))
+    for pool in parser.BATCH_POOLS:
+      with mock.patch.object(sys, 'stdin', six.StringIO(lines)):
+        with self.assertOutputMatches(stdout='^{}$'.format(expected),
+                                      stderr=None):
+          core.StrictFire(tc.WithDefaults(), command=[
+              'double', '--', '--map', 'count', '--jobs', '4', '--batch-pool',
+              pool, '--chunk-size', '3'])
+
+  def testMapRequiresRoutine(self):
+    with mock.patch.object(sys, 'stdin', six.StringIO('1\n')):
+      with self.assertRaisesFireExit(
+          2, 'ERROR: --map requires a command that ends at a routine'):
+        core.StrictFire({'count': 3}, command=['count', '--', '--map', 'x'])
+
+  def testRunInPoolBoundsItemsInFlight(self):
+    read = []
+
+    def Items():
+      for item in range(100):
+        read.append(item)
+        yield item
+
+    parsed_flag_args = parser.FlagArgs(batch_pool='thread', jobs=2,
+                                       chunk_size=3)
+    outcomes = core._RunInPool(  # pylint: disable=protected-access
+        lambda item: item, None, Items(), parsed_flag_args, None)
+    self.assertEqual(next(outcomes), 0)
+    time.sleep(0.1)
+    self.assertLess(len(read), 20)
+    self.assertEqual(list(outcomes), list(range(1, 100)))
+
+    read[:] = []
+    outcomes = core._RunInPool(  # pylint: disable=protected-access
+        lambda item: item, None, Items(), parsed_flag_args, None)
+    self.assertEqual(next(outcomes), 0)
+    outcomes.close()
+    self.assertLess(len(read), 100)
+
   def testHelpOnErrorInConstructor(self):
     with self.assertRaisesFireExit(0, 'SYNOPSIS.*VALUE'):
       core.StrictFire(tc.ErrorInConstructor, command=['--', '--help'])
@@ -206,6 +363,30 @@ class CoreTest(testutils.BaseTestCase):
         core.StrictFire(tc.py3.lru_cache_decorated,  # pytype: disable=module-attr
                   command=['foo']), 'foo')
 
+  def testParsePlanIsWorkedOutOnce(self):
+    def Add(alpha, beta=2):
+      return alpha + beta
+    with mock.patch.object(core, '_ParsePlan', wraps=core._ParsePlan) as plan:  # pylint: disable=protected-access
+      self.assertEqual(core.StrictFire(Add, command=['1', '-b', '3']), 4)
+      self.assertEqual(core.StrictFire(Add, command=['--alpha', '5']), 7)
+    self.assertEqual(plan.call_count, 1)
+
+  @testutils.skipIf(six.PY2, 'Asyncio not available in Python 2.')
+  def testUvloopIsOnlyUsedIfAskedFor(self):
+    import asyncio  # pylint: disable=import-error,g-import-not-at-top  # pytype: disable=import-error
+    uvloop = mock.Mock(spec=['new_event_loop'])
+    uvloop.new_event_loop.side_effect = asyncio.new_event_loop
+    with mock.patch.dict(sys.modules, {'uvloop': uvloop}):
+      self.assertEqual(
+          core.StrictFire(tc.py3.WithAsyncio(),  # pytype: disable=module-attr
+                          command=['triple', '--count', '2']), 6)
+      self.assertFalse(uvloop.new_event_loop.called)
+      with mock.patch.object(core, 'USE_UVLOOP', True):
+        self.assertEqual(
+            core.StrictFire(tc.py3.WithAsyncio(),  # pytype: disable=module-attr
+                            command=['triple', '--count', '2']), 6)
+      self.assertTrue(uvloop.new_event_loop.called)
+
 
 if __name__ == '__main__':
   testutils.main()
@@ -40,12 +40,20 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
+import itertools
+import math
+
 from strictfire import formatting
 import six
+from six.moves import reprlib
 
 TWO_DOUBLE_QUOTES = '""'
 STRING_DESC_PREFIX = 'The string '
 
+# The maximum length of the string forms returned by GetStringForm.
+MAX_STRING_FORM_LENGTH = 200
+
 
 def NeedsCustomDescription(component):
   """Whether the component should use a custom description and summary.
@@ -149,3 +157,91 @@ def GetDescription(obj, available_space, line_length):
     return CUSTOM_DESC_SUM_FN_DICT.get(obj_type_name)[1](obj, available_space,
                                                          line_length)
   return None
+
+
+class _BoundedRepr(reprlib.Repr):
+  """A reprlib.Repr whose cost does not grow with the size of the object.
+
+  reprlib.Repr already limits how many elements of each container it shows, but
+  it sorts dicts and sets before picking the elements to show, and it converts
+  ints to decimal in full. This subclass shows the first elements in iteration
+  order instead, and describes huge ints by their number of digits.
+  """
+
+  def __init__(self):
+    reprlib.Repr.__init__(self)
+    self.maxlevel = 3
+    self.maxtuple = 10
+    self.maxlist = 10
+    self.maxarray = 10
+    self.maxdict = 10
+    self.maxset = 10
+    self.maxfrozenset = 10
+    self.maxdeque = 10
+    self.maxstring = 80
+    self.maxlong = 80
+    self.maxother = 80
+
+  def repr_dict(self, x, level):
+    if not x:
+      return '{}'
+    if level <= 0:
+      return '{...}'
+    pieces = []
+    for key in itertools.islice(x, self.maxdict):
+      pieces.append('{key}: {value}'.format(key=self.repr1(key, level - 1),
+                                            value=self.repr1(x[key], level - 1)))
+    if len(x) > self.maxdict:
+      pieces.append('...')
+    return '{%s}' % ', '.join(pieces)
+
+  def repr_set(self, x, level):
+    if not x:
+      return 'set()'
+    return self._repr_iterable(x, level, '{', '}', self.maxset)
+
+  def repr_frozenset(self, x, level):
+    if not x:
+      return 'frozenset()'
+    return self._repr_iterable(x, level, 'frozenset({', '})', self.maxfrozenset)
+
+  def repr_int(self, x, level):
+    # Converting an int to decimal takes time quadratic in its number of digits.
+    digits = int(abs(x).bit_length() * math.log10(2)) + 1
+    if digits > self.maxlong:
+      return '<int with about {digits} digits>'.format(digits=digits)
+    return reprlib.Repr.repr_int(self, x, level)
+
+
+_bounded_repr = _BoundedRepr()
+
+# The types whose string forms GetStringForm computes with _bounded_repr. Only
+# exact builtin types are included, since subclasses may customize __str__.
+_BOUNDED_REPR_TYPES = frozenset(
+    [dict, list, tuple, set, frozenset, collections.deque]
+    + list(six.integer_types))
+
+
+def GetStringForm(obj, max_length=MAX_STRING_FORM_LENGTH):
+  """Returns str(obj), truncated with ellipsis to at most max_length characters.
+
+  For strings, bytes, ints and the builtin containers, the string form is
+  computed in time and memory that do not depend on the size of obj: only the
+  first elements of containers, up to a few levels deep, are included. Other
+  objects are converted with str, so their cost depends on their __str__.
+
+  Args:
+    obj: The object to get the string form of.
+    max_length: The maximum length of the string form.
+
+  Returns:
+    A string form of obj, no longer than max_length.
+  """
+  type_ = type(obj)
+  if type_ in six.string_types or type_ in (six.text_type, six.binary_type):
+    text = str(obj[:max_length + 1])
+  elif type_ in _BOUNDED_REPR_TYPES:
+    text = _bounded_repr.repr(obj)
+  else:
+    text = str(obj)
+  return formatting.EllipsisTruncate(text, max_length, max_length)
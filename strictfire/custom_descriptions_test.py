@@ -68,6 +68,29 @@ class CustomDescriptionTest(testutils.BaseTestCase):
         obj=component, available_space=10, line_length=LINE_LENGTH)
     self.assertEqual(description, 'The string "Lorem ipsum dolor sit amet"')
 
+  def test_string_form_short(self):
+    for component in (1, 'Test', [1, 'a'], {'key': (1, 2)}, set()):
+      self.assertEqual(custom_descriptions.GetStringForm(component),
+                       str(component))
+
+  def test_string_form_truncated(self):
+    string_form = custom_descriptions.GetStringForm('x' * 1000, max_length=20)
+    self.assertEqual(string_form, 'x' * 17 + '...')
+
+  def test_string_form_containers_show_first_elements(self):
+    self.assertEqual(custom_descriptions.GetStringForm(list(range(10 ** 6))),
+                     '[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, ...]')
+    self.assertEqual(
+        custom_descriptions.GetStringForm(dict.fromkeys(range(20), 'v')),
+        "{0: 'v', 1: 'v', 2: 'v', 3: 'v', 4: 'v', 5: 'v', 6: 'v', 7: 'v', "
+        "8: 'v', 9: 'v', ...}")
+    self.assertEqual(custom_descriptions.GetStringForm([[[[[1]]]]]),
+                     '[[[[...]]]]')
+
+  def test_string_form_huge_int(self):
+    self.assertEqual(custom_descriptions.GetStringForm(10 ** 5000),
+                     '<int with about 5001 digits>')
+
 
 if __name__ == '__main__':
   testutils.main()
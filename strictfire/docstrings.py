@@ -57,6 +57,7 @@ import collections
 import enum
 import re
 import textwrap
+import threading
 
 
 class DocstringInfo(
@@ -110,6 +111,12 @@ class Formats(enum.Enum):
   RST = 2
 
 
+# The number of distinct docstrings whose parses are kept by parse.
+CACHE_SIZE = 4096
+
+CacheInfo = collections.namedtuple(
+    'CacheInfo', ('hits', 'misses', 'maxsize', 'currsize'))
+
 SECTION_TITLES = {
     Sections.ARGS: ('argument', 'arg', 'parameter', 'param', 'key'),
     Sections.RETURNS: ('return',),
@@ -118,6 +125,53 @@ SECTION_TITLES = {
     Sections.TYPE: ('type',),  # rst-only
 }
 
+# Maps each lowercase section title to its section.
+_SECTIONS_BY_TITLE = {
+    title: section
+    for section, titles in SECTION_TITLES.items() for title in titles
+}
+
+# An arg name is a letter or underscore followed by zero or more letters,
+# numbers, or underscores.
+_ARG_NAME_PATTERN = re.compile(r'^[a-zA-Z_]\w*$')
+
+
+class _LineFacts(
+    collections.namedtuple(
+        '_LineFacts',
+        ('line', 'stripped', 'indentation', 'is_hyphens', 'google_section',
+         'rst_section'))):
+  """Facts about a line of a docstring, which are computed once per line.
+
+  google_section and rst_section are the sections the line would start if it
+  were a Google-style section header or an RST directive, respectively.
+  """
+
+# Stands in for the line before the first line and after the last line.
+_NO_LINE = _LineFacts(None, None, None, False, None, None)
+
+
+class _LineInfo(object):
+  """Information about the current line and the lines around it.
+
+  remaining and remaining_raw hold the part of the line that is left to consume
+  once a section header has been removed from it.
+  """
+
+  __slots__ = ('line', 'stripped', 'indentation', 'google_section',
+               'rst_section', 'remaining', 'remaining_raw', 'next', 'previous')
+
+  def __init__(self, facts, next_facts, previous_facts):
+    self.line = facts.line
+    self.stripped = facts.stripped
+    self.indentation = facts.indentation
+    self.google_section = facts.google_section
+    self.rst_section = facts.rst_section
+    self.remaining = facts.stripped
+    self.remaining_raw = facts.line
+    self.next = next_facts
+    self.previous = previous_facts
+
 
 def parse(docstring):
   """Returns DocstringInfo about the given docstring.
@@ -150,6 +204,10 @@ def parse(docstring):
   causes this to crash or run unacceptably slowly, please consider submitting
   a pull request.
 
+  Results are cached by the text of the docstring, since the same docstrings
+  are parsed repeatedly while rendering help. The returned DocstringInfo is
+  immutable and may be shared between callers.
+
   Args:
     docstring: The docstring to parse.
 
@@ -158,9 +216,83 @@ def parse(docstring):
   """
   if docstring is None:
     return DocstringInfo()
+  return _cache.get(docstring)
 
-  lines = docstring.strip().split('\n')
-  lines_len = len(lines)
+
+def parse_many(docstrings):
+  """Returns a list of DocstringInfos, one for each of the given docstrings.
+
+  Each distinct docstring is parsed at most once, which makes this suitable for
+  listing the members of a group, whose docstrings are often shared.
+
+  Args:
+    docstrings: An iterable of docstrings; each may be None.
+  Returns:
+    A list with the DocstringInfo for each docstring, in order.
+  """
+  infos = {}
+  results = []
+  for docstring in docstrings:
+    if docstring not in infos:
+      infos[docstring] = parse(docstring)
+    results.append(infos[docstring])
+  return results
+
+
+def cache_info():
+  """Returns the CacheInfo (hits, misses, maxsize, currsize) of parse."""
+  return _cache.info()
+
+
+def cache_clear():
+  """Clears the cache of parse and resets its counters."""
+  _cache.clear()
+
+
+class _ParseCache(object):
+  """A thread-safe LRU cache of DocstringInfos, keyed by docstring text."""
+
+  def __init__(self, maxsize):
+    self.maxsize = maxsize
+    self._lock = threading.Lock()
+    self._infos = collections.OrderedDict()
+    self._hits = 0
+    self._misses = 0
+
+  def get(self, docstring):
+    with self._lock:
+      info = self._infos.pop(docstring, None)
+      if info is not None:
+        self._hits += 1
+        self._infos[docstring] = info
+        return info
+    info = _parse(docstring)
+    with self._lock:
+      self._misses += 1
+      self._infos[docstring] = info
+      while len(self._infos) > self.maxsize:
+        self._infos.popitem(last=False)
+    return info
+
+  def info(self):
+    with self._lock:
+      return CacheInfo(self._hits, self._misses, self.maxsize,
+                       len(self._infos))
+
+  def clear(self):
+    with self._lock:
+      self._infos.clear()
+      self._hits = 0
+      self._misses = 0
+
+
+_cache = _ParseCache(CACHE_SIZE)
+
+
+def _parse(docstring):
+  """Parses a docstring that is not None. See parse."""
+  line_facts = _create_line_facts(docstring.strip().split('\n'))
+  lines_len = len(line_facts)
   state = Namespace()  # TODO(dbieber): Switch to an explicit class.
 
   # Variables in state include:
@@ -173,16 +305,16 @@ def parse(docstring):
   state.description.lines = []
   state.args = []
   state.kwargs = []
+  state.args_by_name = {}
   state.current_arg = None
   state.returns.lines = []
   state.yields.lines = []
   state.raises.lines = []
 
-  for index, line in enumerate(lines):
-    has_next = index + 1 < lines_len
-    previous_line = lines[index - 1] if index > 0 else None
-    next_line = lines[index + 1] if has_next else None
-    line_info = _create_line_info(line, next_line, previous_line)
+  for index, facts in enumerate(line_facts):
+    next_facts = line_facts[index + 1] if index + 1 < lines_len else _NO_LINE
+    previous_facts = line_facts[index - 1] if index > 0 else _NO_LINE
+    line_info = _LineInfo(facts, next_facts, previous_facts)
     _consume_line(line_info, state)
 
   summary = ' '.join(state.summary.lines) if state.summary.lines else None
@@ -205,7 +337,7 @@ def parse(docstring):
   return DocstringInfo(
       summary=summary,
       description=description,
-      args=args or None,
+      args=tuple(args) or None,
       returns=returns,
       raises=raises,
       yields=yields,
@@ -289,13 +421,13 @@ def _get_or_create_arg_by_name(state, name, is_kwarg=False):
   Returns:
     The new Arg.
   """
-  for arg in state.args + state.kwargs:
-    if arg.name == name:
-      return arg
+  if name in state.args_by_name:
+    return state.args_by_name[name]
   arg = Namespace()  # TODO(dbieber): Switch to an explicit class.
   arg.name = name
   arg.type.lines = []
   arg.description.lines = []
+  state.args_by_name[name] = arg
   if is_kwarg:
     state.kwargs.append(arg)
   else:
@@ -315,12 +447,7 @@ def _is_arg_name(name):
   Returns:
     True if name looks like an arg name, False otherwise.
   """
-  name = name.strip()
-  # arg_pattern is a letter or underscore followed by
-  # zero or more letters, numbers, or underscores.
-  arg_pattern = r'^[a-zA-Z_]\w*$'
-  re.match(arg_pattern, name)
-  return re.match(arg_pattern, name) is not None
+  return _ARG_NAME_PATTERN.match(name.strip()) is not None
 
 
 def _as_arg_name_and_type(text):
@@ -439,7 +566,7 @@ def _consume_line(line_info, state):
 
   if state.section.new and state.section.format == Formats.RST:
     # The current line starts with an RST directive, e.g. ":param arg:".
-    directive = _get_directive(line_info)
+    directive = _get_directive(line_info.stripped)
     directive_tokens = directive.split()  # pytype: disable=attribute-error
     if state.section.title == Sections.ARGS:
       name = directive_tokens[-1]
@@ -511,27 +638,21 @@ def _consume_line(line_info, state):
       pass
 
 
-def _create_line_info(line, next_line, previous_line):
-  """Returns information about the current line and surrounding lines."""
-  line_info = Namespace()  # TODO(dbieber): Switch to an explicit class.
-  line_info.line = line
-  line_info.stripped = line.strip()
-  line_info.remaining_raw = line_info.line
-  line_info.remaining = line_info.stripped
-  line_info.indentation = len(line) - len(line.lstrip())
-  # TODO(dbieber): If next_line is blank, use the next non-blank line.
-  line_info.next.line = next_line
-  next_line_exists = next_line is not None
-  line_info.next.stripped = next_line.strip() if next_line_exists else None
-  line_info.next.indentation = (
-      len(next_line) - len(next_line.lstrip()) if next_line_exists else None)
-  line_info.previous.line = previous_line
-  previous_line_exists = previous_line is not None
-  line_info.previous.indentation = (
-      len(previous_line) -
-      len(previous_line.lstrip()) if previous_line_exists else None)
-  # Note: This counts all whitespace equally.
-  return line_info
+def _create_line_facts(lines):
+  """Returns the _LineFacts for each of the lines, computed in a single pass."""
+  line_facts = []
+  for line in lines:
+    stripped = line.strip()
+    line_facts.append(_LineFacts(
+        line=line,
+        stripped=stripped,
+        # Note: This counts all whitespace equally.
+        indentation=len(line) - len(line.lstrip()),
+        is_hyphens=bool(_line_is_hyphens(stripped)),
+        google_section=_google_section(stripped),
+        rst_section=_rst_section(stripped),
+    ))
+  return line_facts
 
 
 def _update_section_state(line_info, state):
@@ -545,16 +666,15 @@ def _update_section_state(line_info, state):
   """
   section_updated = False
 
-  google_section_permitted = _google_section_permitted(line_info, state)
-  google_section = google_section_permitted and _google_section(line_info)
-  if google_section:
+  google_section = line_info.google_section
+  if google_section and _google_section_permitted(line_info, state):
     state.section.format = Formats.GOOGLE
     state.section.title = google_section
     line_info.remaining = _get_after_google_header(line_info)
     line_info.remaining_raw = line_info.remaining
     section_updated = True
 
-  rst_section = _rst_section(line_info)
+  rst_section = line_info.rst_section
   if rst_section:
     state.section.format = Formats.RST
     state.section.title = rst_section
@@ -605,41 +725,6 @@ def _google_section_permitted(line_info, state):
           or line_info.indentation < state.section.line1_indentation)
 
 
-def _matches_section_title(title, section_title):
-  """Returns whether title is a match for a specific section_title.
-
-  Example:
-    _matches_section_title('Yields', 'yield') == True
-
-  Args:
-    title: The title to check for matching.
-    section_title: A specific known section title to check against.
-  """
-  title = title.lower()
-  section_title = section_title.lower()
-  return section_title in (title, title[:-1])  # Supports plurals / some typos.
-
-
-def _matches_section(title, section):
-  """Returns whether title is a match any known title for a specific section.
-
-  Example:
-    _matches_section_title('Yields', Sections.YIELDS) == True
-    _matches_section_title('param', Sections.Args) == True
-
-  Args:
-    title: The title to check for matching.
-    section: A specific section to check all possible titles for.
-  Returns:
-    True or False, indicating whether title is a match for the specified
-    section.
-  """
-  for section_title in SECTION_TITLES[section]:
-    if _matches_section_title(title, section_title):
-      return True
-  return False
-
-
 def _section_from_possible_title(possible_title):
   """Returns a section matched by the possible title, or None if none match.
 
@@ -648,14 +733,13 @@ def _section_from_possible_title(possible_title):
   Returns:
     A Section type if one matches, or None if no section type matches.
   """
-  for section in SECTION_TITLES:
-    if _matches_section(possible_title, section):
-      return section
-  return None
+  title = possible_title.lower()
+  # Plurals and some typos, e.g. "Argss", match too.
+  return _SECTIONS_BY_TITLE.get(title) or _SECTIONS_BY_TITLE.get(title[:-1])
 
 
-def _google_section(line_info):
-  """Checks whether the current line is the start of a new Google-style section.
+def _google_section(text):
+  """Checks whether a line is the start of a new Google-style section.
 
   This docstring is a Google-style docstring. Google-style sections look like
   this:
@@ -664,12 +748,12 @@ def _google_section(line_info):
       section body goes here
 
   Args:
-    line_info: Information about the current line.
+    text: The stripped text of the line.
   Returns:
     A Section type if one matches, or None if no section type matches.
   """
-  colon_index = line_info.remaining.find(':')
-  possible_title = line_info.remaining[:colon_index]
+  colon_index = text.find(':')
+  possible_title = text[:colon_index]
   return _section_from_possible_title(possible_title)
 
 
@@ -679,20 +763,20 @@ def _get_after_google_header(line_info):
   return line_info.remaining[colon_index + 1:]
 
 
-def _get_directive(line_info):
+def _get_directive(text):
   """Gets a directive from the start of the line.
 
   If the line is ":param str foo: Description of foo", then
-  _get_directive(line_info) returns "param str foo".
+  _get_directive(text) returns "param str foo".
 
   Args:
-    line_info: Information about the current line.
+    text: The stripped text of the line.
   Returns:
     The contents of a directive, or None if the line doesn't start with a
     directive.
   """
-  if line_info.stripped.startswith(':'):
-    return line_info.stripped.split(':', 2)[1]
+  if text.startswith(':'):
+    return text.split(':', 2)[1]
   else:
     return None
 
@@ -706,18 +790,18 @@ def _get_after_directive(line_info):
     return ''
 
 
-def _rst_section(line_info):
-  """Checks whether the current line is the start of a new RST-style section.
+def _rst_section(text):
+  """Checks whether a line is the start of a new RST-style section.
 
   RST uses directives to specify information. An RST directive, which we refer
   to as a section here, are surrounded with colons. For example, :param name:.
 
   Args:
-    line_info: Information about the current line.
+    text: The stripped text of the line.
   Returns:
     A Section type if one matches, or None if no section type matches.
   """
-  directive = _get_directive(line_info)
+  directive = _get_directive(text)
   if directive:
     possible_title = directive.split()[0]
     return _section_from_possible_title(possible_title)
@@ -744,8 +828,7 @@ def _numpy_section(line_info):
   Returns:
     A Section type if one matches, or None if no section type matches.
   """
-  next_line_is_hyphens = _line_is_hyphens(line_info.next.stripped)
-  if next_line_is_hyphens:
+  if line_info.next.is_hyphens:
     possible_title = line_info.remaining
     return _section_from_possible_title(possible_title)
   else:
@@ -96,10 +96,10 @@ class DocstringsTest(testutils.BaseTestCase):
     docstring_info = docstrings.parse(docstring)
     expected_docstring_info = DocstringInfo(
         summary='One line description.',
-        args=[
+        args=(
             ArgInfo(name='arg1', description='arg1_description'),
             ArgInfo(name='arg2', description='arg2_description'),
-        ]
+        )
     )
     self.assertEqual(expected_docstring_info, docstring_info)
 
@@ -110,9 +110,9 @@ class DocstringsTest(testutils.BaseTestCase):
     """
     docstring_info = docstrings.parse(docstring)
     expected_docstring_info = DocstringInfo(
-        args=[
+        args=(
             ArgInfo(name='args', description='arg_description'),
-        ]
+        )
     )
     self.assertEqual(expected_docstring_info, docstring_info)
 
@@ -134,12 +134,12 @@ class DocstringsTest(testutils.BaseTestCase):
         summary='Docstring summary.',
         description='This is a longer description of the docstring. It spans '
         'multiple lines, as\nis allowed.',
-        args=[
+        args=(
             ArgInfo(name='param1', type='int',
                     description='The first parameter.'),
             ArgInfo(name='param2', type='str',
                     description='The second parameter.'),
-        ],
+        ),
         returns='bool: The return value. True for success, False otherwise.'
     )
     self.assertEqual(expected_docstring_info, docstring_info)
@@ -160,13 +160,13 @@ class DocstringsTest(testutils.BaseTestCase):
         summary='Docstring summary.',
         description='This is a longer description of the docstring. It spans '
         'multiple lines, as\nis allowed.',
-        args=[
+        args=(
             ArgInfo(name='param1', type='int',
                     description='The first parameter.'),
             ArgInfo(name='param2', type='str',
                     description='The second parameter. This has a lot of text, '
                                 'enough to cover two lines.'),
-        ],
+        ),
     )
     self.assertEqual(expected_docstring_info, docstring_info)
 
@@ -188,12 +188,12 @@ class DocstringsTest(testutils.BaseTestCase):
         summary='Docstring summary.',
         description='This is a longer description of the docstring. It spans '
         'across multiple\nlines.',
-        args=[
+        args=(
             ArgInfo(name='arg1', type='str',
                     description='Description of arg1.'),
             ArgInfo(name='arg2', type='bool',
                     description='Description of arg2.'),
-        ],
+        ),
         returns='int -- description of the return value.',
         raises='AttributeError, KeyError',
     )
@@ -222,12 +222,12 @@ class DocstringsTest(testutils.BaseTestCase):
         summary='Docstring summary.',
         description='This is a longer description of the docstring. It spans '
         'across multiple\nlines.',
-        args=[
+        args=(
             ArgInfo(name='param1', type='int',
                     description='The first parameter.'),
             ArgInfo(name='param2', type='str',
                     description='The second parameter.'),
-        ],
+        ),
         # TODO(dbieber): Support return type.
         returns='bool True if successful, False otherwise.',
     )
@@ -252,13 +252,13 @@ class DocstringsTest(testutils.BaseTestCase):
         summary='Docstring summary.',
         description='This is a longer description of the docstring. It spans '
         'across multiple\nlines.',
-        args=[
+        args=(
             ArgInfo(name='param1', type='int',
                     description='The first parameter.'),
             ArgInfo(name='param2', type='str',
                     description='The second parameter. This has a lot of text, '
                                 'enough to cover two lines.'),
-        ],
+        ),
     )
     self.assertEqual(expected_docstring_info, docstring_info)
 
@@ -326,13 +326,13 @@ class DocstringsTest(testutils.BaseTestCase):
     expected_docstring_info = DocstringInfo(
         summary='Greets name.',
         description=None,
-        args=[
+        args=(
             ArgInfo(name='name', type='str',
                     description='name, default : World'),
             ArgInfo(name='arg2', type='int',
                     description='arg2, default:None'),
             ArgInfo(name='arg3', type='bool', description=None),
-        ]
+        )
     )
     self.assertEqual(expected_docstring_info, docstring_info)
 
@@ -349,17 +349,41 @@ class DocstringsTest(testutils.BaseTestCase):
     docstring_info = docstrings.parse(docstring)
     expected_docstring_info = DocstringInfo(
         summary='Docstring summary.',
-        args=[
+        args=(
             ArgInfo(name='arg1', type='str',
                     description='Description of arg1.'),
             KwargInfo(name='arg2', type='bool',
                       description='Description of arg2.'),
             KwargInfo(name='arg3', type='str',
                       description='Description of arg3.'),
-        ],
+        ),
     )
     self.assertEqual(expected_docstring_info, docstring_info)
 
+  def test_parse_is_cached(self):
+    docstring = """Cached summary.
+
+    Args:
+      arg1: Description of arg1.
+    """
+    docstrings.cache_clear()
+    docstring_info = docstrings.parse(docstring)
+    self.assertIs(docstrings.parse(docstring), docstring_info)
+    self.assertIsInstance(docstring_info.args, tuple)
+    cache_info = docstrings.cache_info()
+    self.assertEqual((cache_info.hits, cache_info.misses, cache_info.currsize),
+                     (1, 1, 1))
+
+  def test_parse_many(self):
+    docstrings.cache_clear()
+    docstring_infos = docstrings.parse_many(
+        ['First summary.', None, 'Second summary.', 'First summary.'])
+    self.assertEqual(
+        [info.summary for info in docstring_infos],
+        ['First summary.', None, 'Second summary.', 'First summary.'])
+    self.assertIs(docstring_infos[0], docstring_infos[3])
+    self.assertEqual(docstrings.cache_info().misses, 2)
+
 
 if __name__ == '__main__':
   testutils.main()
@@ -581,6 +581,13 @@ class FireTest(testutils.BaseTestCase):
     self.assertIn('actCLI', completion_script)
     self.assertIn('multiply', completion_script)
 
+  def testTabCompletionWords(self):
+    actions = {'math': {'multiply': lambda a, b: a * b, 'pi': 3.14}}
+    with self.assertOutputMatches(stdout='multiply\npi\n', stderr=None):
+      words = strictfire.StrictFire(
+          actions, command=['math', '--', '--completion', 'words'])
+    self.assertEqual(words, 'multiply\npi')
+
   def testBasicSeparator(self):
     # '-' is the default separator.
     self.assertEqual(
@@ -726,6 +733,41 @@ class FireTest(testutils.BaseTestCase):
     self.assertEqual(strictfire.StrictFire(tc.py3.WithAsyncio,
                                command=['double', '--count', '10']), 20)
 
+  @testutils.skipIf(six.PY2, 'Asyncio not available in Python 2.')
+  def testFireAwaitsReturnedAwaitables(self):
+    self.assertEqual(
+        strictfire.StrictFire(tc.py3.WithAsyncio(),
+                              command=['triple', '--count', '2']), 6)
+    self.assertEqual(
+        strictfire.StrictFire(tc.py3.WithAsyncio(),
+                              command=['deferred-triple', '--count', '3']), 9)
+
+  @testutils.skipIf(six.PY2, 'Asyncio not available in Python 2.')
+  def testFireUsesOneEventLoop(self):
+    self.assertEqual(
+        strictfire.StrictFire(
+            tc.py3.WithAsyncio(),
+            command=['chain', '-', 'chain', '-', 'loop-count']), 1)
+
+  @testutils.skipIf(six.PY2, 'Asyncio not available in Python 2.')
+  def testFireStreamsAsyncIterables(self):
+    with self.assertOutputMatches(stdout='3\n2\n1\n', stderr=None):
+      strictfire.StrictFire(tc.py3.WithAsyncio(), command=['countdown'])
+
+  @testutils.skipIf(six.PY2, 'Asyncio not available in Python 2.')
+  def testFireLeavesCurrentEventLoop(self):
+    import asyncio  # pylint: disable=import-error,g-import-not-at-top  # pytype: disable=import-error
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+      self.assertEqual(
+          strictfire.StrictFire(tc.py3.WithAsyncio(),
+                                command=['triple', '--count', '2']), 6)
+      self.assertIs(asyncio.get_event_loop_policy().get_event_loop(), loop)
+    finally:
+      asyncio.set_event_loop(None)
+      loop.close()
+
 
 if __name__ == '__main__':
   testutils.main()
@@ -0,0 +1,309 @@
+# Copyright (C) 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Caches rendered help and usage screens.
+
+Rendering a help screen inspects the component and every one of its members,
+and parses all of their docstrings. The screens Fire shows for a given command
+only change when the code behind it does, so they are cached under a key made
+of:
+
+  - the fully qualified name of the component,
+  - a fingerprint of the source files that define it and its members,
+  - the names of its members, and the reprs of its argument defaults, which
+    can differ between runs of unchanged code, e.g. when read from the
+    environment,
+  - whether verbose mode is on,
+  - the line length, terminal width and text formatting in effect, and
+  - the command so far, as recorded in the Fire trace.
+
+Only components that their qualified name identifies are cached: modules, and
+classes and routines that can be looked up by their name. Other components,
+such as objects, dicts and lambdas, are rendered every time.
+
+Screens are always cached in memory. To also cache them on disk, so that they
+are reused across invocations of a CLI, set the STRICTFIRE_HELP_CACHE_DIR
+environment variable to a directory.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+import hashlib
+import inspect
+import io
+import os
+import sys
+import tempfile
+
+from strictfire import formatting
+from strictfire import helptext
+from strictfire import inspectutils
+from strictfire.console import console_attr_os
+
+CACHE_DIR_ENV = 'STRICTFIRE_HELP_CACHE_DIR'
+
+# The number of screens kept in memory.
+MAX_ENTRIES = 128
+
+
+class HelpCache(object):
+  """A cache of rendered help and usage screens."""
+
+  def __init__(self, directory=None, max_entries=MAX_ENTRIES):
+    """Constructs a HelpCache.
+
+    Args:
+      directory: The directory to store screens in, or None to only keep them
+        in memory.
+      max_entries: The number of screens to keep in memory.
+    """
+    self.directory = directory
+    self.max_entries = max_entries
+    self.hits = 0
+    self.misses = 0
+    self._entries = collections.OrderedDict()
+
+  def HelpText(self, component, trace=None, verbose=False):
+    """Returns helptext.HelpText(component, trace, verbose), from the cache."""
+    return self._Get(helptext.HelpText, 'help', component, trace, verbose)
+
+  def HelpTextChunks(self, component, trace=None, verbose=False):
+    """Yields helptext.HelpTextChunks(component, trace, verbose).
+
+    A cached help screen is yielded in a single chunk. Otherwise the chunks are
+    yielded as they are rendered, and the help screen is cached once they all
+    have been.
+
+    Args:
+      component: The component to construct the help string for.
+      trace: The Fire trace of the command so far.
+      verbose: Whether to include private members in the help screen.
+    Yields:
+      The help screen in chunks.
+    """
+    key = _Key('help', component, trace, verbose)
+    text = None if key is None else self._Lookup(key)
+    if text is not None:
+      yield text
+      return
+
+    chunks = []
+    for chunk in helptext.HelpTextChunks(component, trace=trace,
+                                         verbose=verbose):
+      chunks.append(chunk)
+      yield chunk
+    if key is not None:
+      self._Store(key, ''.join(chunks))
+
+  def UsageText(self, component, trace=None, verbose=False):
+    """Returns helptext.UsageText(component, trace, verbose), from the cache."""
+    return self._Get(helptext.UsageText, 'usage', component, trace, verbose)
+
+  def Clear(self):
+    """Removes all screens from memory. Screens on disk are kept."""
+    self._entries.clear()
+
+  def _Get(self, render, kind, component, trace, verbose):
+    key = _Key(kind, component, trace, verbose)
+    if key is None:
+      return render(component, trace=trace, verbose=verbose)
+
+    text = self._Lookup(key)
+    if text is None:
+      text = render(component, trace=trace, verbose=verbose)
+      self._Store(key, text)
+    return text
+
+  def _Lookup(self, key):
+    """Returns the screen cached under key, or None, counting hits and misses."""
+    text = self._entries.pop(key, None)
+    if text is None and self.directory:
+      text = self._Read(key)
+    if text is None:
+      self.misses += 1
+      return None
+    self.hits += 1
+    self._Remember(key, text)
+    return text
+
+  def _Store(self, key, text):
+    if self.directory:
+      self._Write(key, text)
+    self._Remember(key, text)
+
+  def _Remember(self, key, text):
+    self._entries[key] = text
+    while len(self._entries) > self.max_entries:
+      self._entries.popitem(last=False)
+
+  def _Path(self, key):
+    return os.path.join(self.directory, key + '.txt')
+
+  def _Read(self, key):
+    try:
+      with io.open(self._Path(key), encoding='utf-8') as f:
+        return f.read()
+    except (IOError, OSError, UnicodeDecodeError):
+      return None
+
+  def _Write(self, key, text):
+    # The disk cache is best effort; failing to write to it is not an error.
+    try:
+      if not os.path.isdir(self.directory):
+        os.makedirs(self.directory)
+      descriptor, temporary_path = tempfile.mkstemp(dir=self.directory)
+      with io.open(descriptor, 'w', encoding='utf-8') as f:
+        f.write(text)
+      os.rename(temporary_path, self._Path(key))
+    except (IOError, OSError):
+      pass
+
+
+_cache = HelpCache(directory=os.environ.get(CACHE_DIR_ENV) or None)
+
+
+def HelpText(component, trace=None, verbose=False):
+  """Like helptext.HelpText, using the process-wide cache."""
+  return _cache.HelpText(component, trace=trace, verbose=verbose)
+
+
+def HelpTextChunks(component, trace=None, verbose=False):
+  """Like helptext.HelpTextChunks, using the process-wide cache."""
+  return _cache.HelpTextChunks(component, trace=trace, verbose=verbose)
+
+
+def UsageText(component, trace=None, verbose=False):
+  """Like helptext.UsageText, using the process-wide cache."""
+  return _cache.UsageText(component, trace=trace, verbose=verbose)
+
+
+def _Key(kind, component, trace, verbose):
+  """Returns the cache key for a screen, or None if it cannot be cached."""
+  name = _QualifiedName(component)
+  if name is None:
+    return None
+
+  members = _Members(component)
+  sources = _Sources(component, members)
+  sources.add(os.path.abspath(helptext.__file__))
+  fingerprint = tuple(
+      (path, _Fingerprint(path)) for path in sorted(sources))
+
+  if trace is None:
+    command = None
+  else:
+    command = (
+        trace.GetCommand(include_separators=True),
+        trace.GetCommand(include_separators=False),
+        trace.separator,
+        trace.NeedsSeparatingHyphenHyphen(),
+    )
+
+  key = (
+      kind,
+      type(component).__name__,
+      name,
+      fingerprint,
+      tuple(member_name for member_name, _ in members),
+      _DefaultReprs(component),
+      bool(verbose),
+      helptext.LINE_LENGTH,
+      console_attr_os.GetTerminalSnapshot().size[0],
+      formatting.Bold(''),  # Differs when colors are disabled.
+      command,
+      sys.version_info[:2],
+  )
+  return hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+
+
+def _QualifiedName(component):
+  """Returns the name that identifies component, or None if there is none."""
+  if inspect.ismodule(component):
+    name = component.__name__
+    return name if sys.modules.get(name) is component else None
+
+  if not (inspect.isclass(component) or inspect.isroutine(component)):
+    return None
+  module_name = getattr(component, '__module__', None)
+  qualname = getattr(component, '__qualname__', None)
+  if not module_name or not qualname or '<' in qualname:
+    # Lambdas and functions defined in other functions share their names.
+    return None
+
+  # The name only identifies the component if looking it up finds it.
+  target = getattr(component, '__func__', component)
+  found = sys.modules.get(module_name)
+  try:
+    for attribute in qualname.split('.'):
+      found = getattr(found, attribute)
+  except Exception:  # pylint: disable=broad-except
+    return None
+  if found is not target and getattr(found, '__func__', None) is not target:
+    return None
+  return module_name + ':' + qualname
+
+
+def _Members(component):
+  """Returns the (name, member) pairs that component's screens list."""
+  if inspect.ismodule(component) or inspect.isclass(component):
+    return inspectutils.GetStaticMembers(component)
+  return []
+
+
+def _DefaultReprs(component):
+  """Returns the reprs of the argument defaults component's screens show."""
+  if not (inspect.isclass(component) or inspect.isroutine(component)):
+    return ()
+  spec = inspectutils.GetFullArgSpec(component)
+  return (tuple(repr(default) for default in spec.defaults),
+          tuple((name, repr(spec.kwonlydefaults[name]))
+                for name in sorted(spec.kwonlydefaults)))
+
+
+def _Sources(component, members):
+  """Returns the source files that component's screens are rendered from."""
+  owners = [component]
+  if inspect.isclass(component):
+    owners.extend(inspect.getmro(component))
+  owners.extend(member for _, member in members
+                if not inspectutils.IsUnevaluatedDescriptor(member))
+
+  sources = set()
+  for owner in owners:
+    path = _ModuleFile(owner)
+    if path:
+      sources.add(os.path.abspath(path))
+  return sources
+
+
+def _ModuleFile(component):
+  """Returns the file of the module that defines component, if any."""
+  try:
+    if inspect.ismodule(component):
+      return getattr(component, '__file__', None)
+    module = sys.modules.get(getattr(component, '__module__', None))
+    return getattr(module, '__file__', None)
+  except Exception:  # pylint: disable=broad-except
+    return None
+
+
+def _Fingerprint(path):
+  try:
+    stat = os.stat(path)
+  except OSError:
+    return None
+  return (stat.st_size, stat.st_mtime)
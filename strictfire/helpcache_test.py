@@ -0,0 +1,177 @@
+# Copyright (C) 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the helpcache module."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+
+import mock
+
+from strictfire import helpcache
+from strictfire import helptext
+from strictfire import test_components as tc
+from strictfire import testutils
+from strictfire import trace
+from strictfire.console import console_attr_os
+
+MODULE_NAME = 'strictfire_helpcache_test_module'
+
+MODULE_TEMPLATE = '''
+import os
+
+
+def main(count=1):
+  """{doc}"""
+  return count
+
+
+def greet(name=os.environ.get('STRICTFIRE_HELPCACHE_TEST_NAME', 'anon')):
+  return 'Hello ' + name
+'''
+
+
+class HelpCacheTest(testutils.BaseTestCase):
+
+  def setUp(self):
+    super(HelpCacheTest, self).setUp()
+    self.directory = tempfile.mkdtemp()
+    self.cache = helpcache.HelpCache()
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+    super(HelpCacheTest, self).tearDown()
+
+  def _AssertCachedTextIsIdentical(self, component, name='cli', verbose=False):
+    t = trace.FireTrace(component, name=name)
+    for cached, rendered in ((self.cache.HelpText, helptext.HelpText),
+                             (self.cache.UsageText, helptext.UsageText)):
+      expected = rendered(component, trace=t, verbose=verbose)
+      self.assertEqual(cached(component, trace=t, verbose=verbose), expected)
+      self.assertEqual(cached(component, trace=t, verbose=verbose), expected)
+
+  def testCachedTextIsIdentical(self):
+    for component in (tc, tc.NoDefaults, tc.multiplier_with_docstring,
+                      tc.WithDefaults().text, tc.Kwargs.run,
+                      tc.HasStaticAndClassMethods.class_fn):
+      self._AssertCachedTextIsIdentical(component)
+      self._AssertCachedTextIsIdentical(component, verbose=True)
+    self.assertEqual(self.cache.misses, 24)
+    self.assertEqual(self.cache.hits, 24)
+
+  def testUncachableComponentsAreRendered(self):
+    for component in (tc.NoDefaults(), {'a': 1}, lambda x: x):
+      self._AssertCachedTextIsIdentical(component)
+    self.assertEqual((self.cache.hits, self.cache.misses), (0, 0))
+
+  def testHelpTextChunksAreCached(self):
+    component = tc.NoDefaults
+    expected = helptext.HelpText(component)
+    chunks = list(self.cache.HelpTextChunks(component))
+    self.assertGreater(len(chunks), 1)
+    self.assertEqual(''.join(chunks), expected)
+    self.assertEqual(list(self.cache.HelpTextChunks(component)), [expected])
+    self.assertEqual(self.cache.HelpText(component), expected)
+    self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+
+  def testKeyIncludesCommand(self):
+    component = tc.multiplier_with_docstring
+    first = self.cache.HelpText(
+        component, trace=trace.FireTrace(component, name='first'))
+    second = self.cache.HelpText(
+        component, trace=trace.FireTrace(component, name='second'))
+    self.assertIn('first', first)
+    self.assertIn('second', second)
+    self.assertEqual(self.cache.misses, 2)
+
+  def testKeyIncludesTerminalWidth(self):
+    snapshot = console_attr_os.GetTerminalSnapshot()
+    component = tc.NoDefaults
+    expected = self.cache.HelpText(component)
+    with mock.patch.object(snapshot, 'size', (snapshot.size[0] + 1, 24)):
+      self.assertEqual(self.cache.HelpText(component), expected)
+    self.assertEqual(self.cache.misses, 2)
+
+  def testMaxEntries(self):
+    cache = helpcache.HelpCache(max_entries=1)
+    cache.HelpText(tc.NoDefaults)
+    cache.HelpText(tc.WithDefaults)
+    cache.HelpText(tc.NoDefaults)
+    self.assertEqual(cache.misses, 3)
+
+  def testDiskCacheIsIdentical(self):
+    writer = helpcache.HelpCache(directory=self.directory)
+    expected = writer.HelpText(tc.NoDefaults, verbose=True)
+    reader = helpcache.HelpCache(directory=self.directory)
+    self.assertEqual(reader.HelpText(tc.NoDefaults, verbose=True), expected)
+    self.assertEqual((reader.hits, reader.misses), (1, 0))
+    self.assertEqual(expected, helptext.HelpText(tc.NoDefaults, verbose=True))
+
+  def testSourceChangeInvalidatesCache(self):
+    path = os.path.join(self.directory, MODULE_NAME + '.py')
+    with open(path, 'w') as f:
+      f.write(MODULE_TEMPLATE.format(doc='Does one thing.'))
+    sys.path.insert(0, self.directory)
+    try:
+      module = importlib.import_module(MODULE_NAME)
+      self.assertIn('Does one thing.', self.cache.HelpText(module.main))
+      with open(path, 'w') as f:
+        f.write(MODULE_TEMPLATE.format(doc='Does something else.'))
+      module = importlib.reload(module) if hasattr(importlib, 'reload') else (
+          reload(module))  # pylint: disable=undefined-variable
+      self.assertIn('Does something else.', self.cache.HelpText(module.main))
+      self.assertEqual(self.cache.misses, 2)
+    finally:
+      sys.path.remove(self.directory)
+      sys.modules.pop(MODULE_NAME, None)
+
+  def _ImportModule(self, doc='Does one thing.'):
+    path = os.path.join(self.directory, MODULE_NAME + '.py')
+    with open(path, 'w') as f:
+      f.write(MODULE_TEMPLATE.format(doc=doc))
+    sys.path.insert(0, self.directory)
+    self.addCleanup(sys.modules.pop, MODULE_NAME, None)
+    self.addCleanup(sys.path.remove, self.directory)
+    return importlib.import_module(MODULE_NAME)
+
+  def testDefaultFromEnvironmentIsNotStale(self):
+    writer = helpcache.HelpCache(directory=self.directory)
+    reader = helpcache.HelpCache(directory=self.directory)
+    with mock.patch.dict(os.environ,
+                         {'STRICTFIRE_HELPCACHE_TEST_NAME': 'alice'}):
+      module = self._ImportModule()
+      self.assertIn("Default: 'alice'", writer.HelpText(module.greet))
+    with mock.patch.dict(os.environ, {'STRICTFIRE_HELPCACHE_TEST_NAME': 'bob'}):
+      module = importlib.reload(module) if hasattr(importlib, 'reload') else (
+          reload(module))  # pylint: disable=undefined-variable
+      self.assertIn("Default: 'bob'", reader.HelpText(module.greet))
+    self.assertEqual((reader.hits, reader.misses), (0, 1))
+
+  def testAddedMemberIsListed(self):
+    module = self._ImportModule()
+    self.assertNotIn('added', self.cache.HelpText(module))
+    module.added = len  # Defined in no source file.
+    self.assertIn('added', self.cache.HelpText(module))
+    self.assertEqual(self.cache.misses, 2)
+
+
+if __name__ == '__main__':
+  testutils.main()
@@ -33,7 +33,12 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import copy
+import io
 import itertools
+import json
+import os
+import re
 import sys
 
 from strictfire import completion
@@ -42,7 +47,11 @@ from strictfire import decorators
 from strictfire import docstrings
 from strictfire import formatting
 from strictfire import inspectutils
+from strictfire import lazy
+from strictfire import parser
+from strictfire import trace as trace_lib
 from strictfire import value_types
+import six
 
 LINE_LENGTH = 80
 SECTION_INDENTATION = 4
@@ -61,17 +70,43 @@ def HelpText(component, trace=None, verbose=False):
   Returns:
     The full help screen as a string.
   """
-  # Preprocessing needed to create the sections:
+  return ''.join(HelpTextChunks(component, trace=trace, verbose=verbose))
+
+
+def HelpTextChunks(component, trace=None, verbose=False):
+  """Yields the help string for the current component, section by section.
+
+  Each section is only rendered once the previous one has been consumed, so the
+  first sections of the help screen can be shown while the usage details of a
+  group with many members are still being rendered.
+
+  Args:
+    component: The component to construct the help string for.
+    trace: The Fire trace of the command so far. The command executed so far
+      can be extracted from this trace.
+    verbose: Whether to include private members in the help screen.
+
+  Yields:
+    The help screen in chunks, which concatenated are HelpText's result.
+  """
+  separator = ''
+  for section in _HelpSections(component, trace=trace, verbose=verbose):
+    if section is not None:
+      yield separator + _CreateOutputSection(*section)
+      separator = '\n\n'
+
+
+def _HelpSections(component, trace=None, verbose=False):
+  """Yields the sections of the help screen, each rendered when requested."""
   info = inspectutils.Info(component)
+  yield _NameSection(component, info, trace=trace, verbose=verbose)
+
   actions_grouped_by_kind = _GetActionsGroupedByKind(component, verbose=verbose)
   spec = inspectutils.GetFullArgSpec(component)
   metadata = decorators.GetMetadata(component)
-
-  # Sections:
-  name_section = _NameSection(component, info, trace=trace, verbose=verbose)
-  synopsis_section = _SynopsisSection(
+  yield _SynopsisSection(
       component, actions_grouped_by_kind, spec, metadata, trace=trace)
-  description_section = _DescriptionSection(component, info)
+  yield _DescriptionSection(component, info)
   # TODO(dbieber): Add returns and raises sections for functions.
 
   if callable(component):
@@ -80,19 +115,12 @@ def HelpText(component, trace=None, verbose=False):
   else:
     args_and_flags_sections = []
     notes_sections = []
-  usage_details_sections = _UsageDetailsSections(component,
-                                                 actions_grouped_by_kind)
-
-  sections = (
-      [name_section, synopsis_section, description_section]
-      + args_and_flags_sections
-      + usage_details_sections
-      + notes_sections
-  )
-  return '\n\n'.join(
-      _CreateOutputSection(*section)
-      for section in sections if section is not None
-  )
+  for section in args_and_flags_sections:
+    yield section
+  for section in _UsageDetailsSections(component, actions_grouped_by_kind):
+    yield section
+  for section in notes_sections:
+    yield section
 
 
 def _NameSection(component, info, trace=None, verbose=False):
@@ -255,20 +283,17 @@ def _ArgsAndFlagsSections(info, spec, metadata):
 
 
 def _UsageDetailsSections(component, actions_grouped_by_kind):
-  """The usage details sections of the help string."""
+  """Yields the usage details sections of the help string, one at a time."""
   groups, commands, values, indexes = actions_grouped_by_kind
 
-  sections = []
   if groups.members:
-    sections.append(_MakeUsageDetailsSection(groups))
+    yield _MakeUsageDetailsSection(groups)
   if commands.members:
-    sections.append(_MakeUsageDetailsSection(commands))
+    yield _MakeUsageDetailsSection(commands)
   if values.members:
-    sections.append(_ValuesUsageDetailsSection(component, values))
+    yield _ValuesUsageDetailsSection(component, values)
   if indexes.members:
-    sections.append(('INDEXES', _NewChoicesSection('INDEX', indexes.names)))
-
-  return sections
+    yield ('INDEXES', _NewChoicesSection('INDEX', indexes.names))
 
 
 def _GetSummary(info):
@@ -351,16 +376,28 @@ def _GetActionsGroupedByKind(component, verbose=False):
   commands = ActionGroup(name='command', plural='commands')
   values = ActionGroup(name='value', plural='values')
   indexes = ActionGroup(name='index', plural='indexes')
+  action_groups = {
+      value_types.GROUP: groups,
+      value_types.COMMAND: commands,
+      value_types.VALUE: values,
+  }
 
-  members = completion.VisibleMembers(component, verbose=verbose)
+  members = completion.VisibleMembers(component, verbose=verbose, static=True)
   for member_name, member in members:
     member_name = str(member_name)
-    if value_types.IsGroup(member):
-      groups.Add(name=member_name, member=member)
-    if value_types.IsCommand(member):
-      commands.Add(name=member_name, member=member)
-    if value_types.IsValue(member):
-      values.Add(name=member_name, member=member)
+    if inspectutils.IsUnevaluatedDescriptor(member):
+      # Properties and the like are listed as values without evaluating them.
+      values.Add(name=member_name, member=member.descriptor)
+      continue
+    if isinstance(member, lazy.LazyTarget):
+      # LazyGroup members are listed without importing them.
+      if member.IsModule():
+        groups.Add(name=member_name, member=member)
+      else:
+        commands.Add(name=member_name, member=member)
+      continue
+    for kind in value_types.Classify(member):
+      action_groups[kind].Add(name=member_name, member=member)
 
   if isinstance(component, (list, tuple)) and component:
     component_len = len(component)
@@ -546,18 +583,16 @@ def _GetArgDescription(name, docstring_info):
 def _MakeUsageDetailsSection(action_group):
   """Creates a usage details section for the provided action group."""
   item_strings = []
-  for name, member in action_group.GetItems():
-    info = inspectutils.Info(member)
-    item = name
-    docstring_info = info.get('docstring_info')
-    if (docstring_info
-        and not custom_descriptions.NeedsCustomDescription(member)):
-      summary = docstring_info.summary
-    elif custom_descriptions.NeedsCustomDescription(member):
+  items = list(action_group.GetItems())
+  # Members often share docstrings, e.g. those inherited from a base class.
+  docstring_infos = docstrings.parse_many(
+      inspectutils.GetDocstring(member) for _, member in items)
+  for (name, member), docstring_info in zip(items, docstring_infos):
+    if custom_descriptions.NeedsCustomDescription(member):
       summary = custom_descriptions.GetSummary(
           member, LINE_LENGTH - SECTION_INDENTATION, LINE_LENGTH)
     else:
-      summary = None
+      summary = docstring_info.summary
     item = _CreateItem(name, summary)
     item_strings.append(item)
   return (action_group.plural.upper(),
@@ -567,9 +602,9 @@ def _MakeUsageDetailsSection(action_group):
 def _ValuesUsageDetailsSection(component, values):
   """Creates a section tuple for the values section of the usage details."""
   value_item_strings = []
+  init_info = inspectutils.Info(component.__class__.__init__)
   for value_name, value in values.GetItems():
     del value
-    init_info = inspectutils.Info(component.__class__.__init__)
     value_item = None
     if 'docstring_info' in init_info:
       init_docstring_info = init_info['docstring_info']
@@ -759,3 +794,175 @@ class ActionGroup(object):
 
   def GetItems(self):
     return zip(self.names, self.members)
+
+
+_EXPORT_EXTENSIONS = {'markdown': '.md', 'man': '.1', 'json': '.json'}
+
+_ANSI_ESCAPE_PATTERN = re.compile(r'\x1b\[[0-9;]*m')
+
+_UNSAFE_FILENAME_PATTERN = re.compile(r'[^A-Za-z0-9._-]+')
+
+# The commands ExportTree's worker processes render. Workers are forked once
+# these are set, so the commands are inherited rather than pickled.
+_export_jobs = None
+
+
+def ExportTree(component, directory, fmt='markdown', name=None, trace=None,
+               verbose=False, depth=3, processes=None):
+  """Writes help screens for component and all of its commands to directory.
+
+  The command tree is walked once, descending into groups up to depth levels
+  deep, and a help screen is written for every group and command in it. Values
+  are listed in their group's help screen, but get none of their own. Classes
+  are documented as commands; the members of their instances are not.
+
+  All help screens are rendered by the same process, sharing its docstring and
+  introspection caches, unless processes is given. Then they are rendered by
+  that many forked worker processes, which inherit those caches as warmed up
+  by walking the tree.
+
+  Args:
+    component: The component at the root of the command tree.
+    directory: The directory to write the help screens to. It is created if it
+      does not exist.
+    fmt: The format of the help screens: 'markdown', 'man' or 'json'.
+    name: The name of the CLI. Ignored if trace is given.
+    trace: The Fire trace of the command leading to component, if any.
+    verbose: Whether to include private members.
+    depth: How many levels of groups to descend into.
+    processes: The number of worker processes to render help screens with, or
+      None to render them in this process.
+  Returns:
+    The paths of the files written, one per command, in the order that the
+    commands were found in. Commands whose names map to the same file name get
+    a numbered suffix, so that no file is overwritten.
+  Raises:
+    ValueError: If fmt is not one of parser.EXPORT_FORMATS.
+  """
+  if fmt not in parser.EXPORT_FORMATS:
+    raise ValueError('Unknown help format {fmt!r}, expected one of: {formats}'
+                     .format(fmt=fmt,
+                             formats=', '.join(parser.EXPORT_FORMATS)))
+  if trace is None:
+    trace = trace_lib.FireTrace(component, name=name)
+  if not os.path.isdir(directory):
+    os.makedirs(directory)
+
+  global _export_jobs
+  _export_jobs = []
+  filenames = set()
+  for member, member_trace in _CommandTree(component, trace, depth, verbose):
+    command = member_trace.GetCommand(include_separators=False)
+    filename = (_UNSAFE_FILENAME_PATTERN.sub('_', '-'.join(command.split()))
+                or 'command')
+    # Case-insensitive file systems would also merge names that differ in case.
+    unique_filename = filename
+    suffix = 1
+    while unique_filename.lower() in filenames:
+      suffix += 1
+      unique_filename = '{filename}-{suffix}'.format(filename=filename,
+                                                      suffix=suffix)
+    filenames.add(unique_filename.lower())
+    path = os.path.join(directory, unique_filename + _EXPORT_EXTENSIONS[fmt])
+    _export_jobs.append((member, member_trace, path, fmt, verbose))
+  try:
+    if processes and hasattr(os, 'fork'):
+      import multiprocessing  # pylint: disable=g-import-not-at-top,import-outside-toplevel
+      context = (multiprocessing.get_context('fork')
+                 if hasattr(multiprocessing, 'get_context')
+                 else multiprocessing)
+      pool = context.Pool(processes)
+      try:
+        return pool.map(_ExportJob, range(len(_export_jobs)))
+      finally:
+        pool.close()
+        pool.join()
+    return [_ExportJob(index) for index in range(len(_export_jobs))]
+  finally:
+    _export_jobs = None
+
+
+def _CommandTree(component, trace, depth, verbose, ancestors=()):
+  """Yields (component, trace) for component and the commands below it."""
+  yield component, trace
+  if (depth < 1 or value_types.Classify(component) != (value_types.GROUP,)
+      or isinstance(component, (list, tuple, set, frozenset))):
+    return
+
+  ancestors += (id(component),)
+  members = completion.VisibleMembers(component, verbose=verbose, static=True)
+  for member_name, member in members:
+    if inspectutils.IsUnevaluatedDescriptor(member):
+      continue  # Properties and the like are values.
+    if isinstance(member, lazy.LazyTarget):
+      member = component[member_name]
+    if (value_types.Classify(member) == (value_types.VALUE,)
+        or id(member) in ancestors):
+      continue
+    member_name = str(member_name)
+    member_trace = copy.copy(trace)
+    member_trace.elements = list(trace.elements)
+    member_trace.AddAccessedProperty(member, member_name, [member_name],
+                                     None, None)
+    for command in _CommandTree(member, member_trace, depth - 1, verbose,
+                                ancestors):
+      yield command
+
+
+def _ExportJob(index):
+  """Writes the help screen for the index-th of _export_jobs to a file."""
+  component, trace, path, fmt, verbose = _export_jobs[index]
+  command = trace.GetCommand(include_separators=False)
+  sections = [
+      (title, _ANSI_ESCAPE_PATTERN.sub('', content))
+      for title, content in (
+          section for section in _HelpSections(component, trace=trace,
+                                               verbose=verbose)
+          if section is not None)
+  ]
+  page = _EXPORT_RENDERERS[fmt](command, sections)
+  with io.open(path, 'w', encoding='utf-8') as f:
+    f.write(six.text_type(page))
+  return path
+
+
+def _MarkdownPage(command, sections):
+  lines = ['# {command}'.format(command=command), '']
+  for title, content in sections:
+    lines.extend(['## {title}'.format(title=title), ''])
+    # Indented, the content is a code block, and keeps its layout.
+    lines.extend(formatting.Indent(content, spaces=4).split('\n'))
+    lines.append('')
+  return '\n'.join(lines)
+
+
+def _ManPage(command, sections):
+  lines = ['.TH "{title}" "1"'.format(
+      title=_ManEscape(command.upper().replace(' ', '-')))]
+  for title, content in sections:
+    lines.extend(['.SH "{title}"'.format(title=title), '.nf'])
+    lines.extend(_ManEscape(line) for line in content.split('\n'))
+    lines.append('.fi')
+  return '\n'.join(lines) + '\n'
+
+
+def _ManEscape(line):
+  line = line.replace('\\', '\\e').replace('-', '\\-')
+  if line.startswith(('.', "'")):
+    line = '\\&' + line
+  return line
+
+
+def _JsonPage(command, sections):
+  return json.dumps({
+      'command': command,
+      'sections': [{'title': title, 'content': content}
+                   for title, content in sections],
+  }, indent=2, sort_keys=True) + '\n'
+
+
+_EXPORT_RENDERERS = {
+    'markdown': _MarkdownPage,
+    'man': _ManPage,
+    'json': _JsonPage,
+}
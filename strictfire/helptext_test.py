@@ -18,8 +18,11 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import json
 import os
+import shutil
 import sys
+import tempfile
 import textwrap
 
 from strictfire import formatting
@@ -27,6 +30,8 @@ from strictfire import helptext
 from strictfire import test_components as tc
 from strictfire import testutils
 from strictfire import trace
+
+import mock
 import six
 
 
@@ -270,6 +275,18 @@ class HelpTest(testutils.BaseTestCase):
                   help_screen)
     self.assertIn('VALUES\n    VALUE is one of the following:\n', help_screen)
 
+  @testutils.skipIf(six.PY2, 'lru_cache is Python 3 only.')
+  def testHelpTextListsLruCacheFunctionsAsCommands(self):
+    for component, name in (
+        ({'decorated': tc.py3.lru_cache_decorated}, 'decorated'),  # pytype: disable=module-attr
+        (tc.py3.LruCacheDecoratedMethod(), 'lru_cache_in_class'),  # pytype: disable=module-attr
+    ):
+      help_screen = helptext.HelpText(
+          component=component, trace=trace.FireTrace(component, 'cli'))
+      self.assertIn('COMMANDS\n    COMMAND is one of the following:\n\n'
+                    '     {name}'.format(name=name), help_screen)
+      self.assertNotIn('VALUES', help_screen)
+
   def testHelpTextNoInit(self):
     component = tc.OldStyleEmpty
     help_screen = helptext.HelpText(
@@ -407,6 +424,16 @@ VALUES
     self.assertIn('VALUE is one of the following:', help_screen)
     self.assertIn('alpha', help_screen)
 
+  def testHelpTextObjectWithPropertyDoesNotEvaluateIt(self):
+    # Evaluating InvalidProperty.prop raises an error.
+    component = tc.InvalidProperty()
+    t = trace.FireTrace(component, name='InvalidProperty')
+    help_screen = helptext.HelpText(component=component, trace=t)
+    self.assertIn('COMMAND is one of the following:', help_screen)
+    self.assertIn('double', help_screen)
+    self.assertIn('VALUE is one of the following:', help_screen)
+    self.assertIn('prop', help_screen)
+
   def testHelpTextNameSectionCommandWithSeparator(self):
     component = 9
     t = trace.FireTrace(component, name='int', separator='-')
@@ -423,6 +450,95 @@ VALUES
     self.assertIn('double -', help_screen)
     self.assertIn('double - -', help_screen)
 
+  def testHelpTextChunksConcatenateToHelpText(self):
+    for component in (tc, tc.NoDefaults, tc.WithDefaults().double, [1, 2]):
+      t = trace.FireTrace(component, name='cli')
+      chunks = list(helptext.HelpTextChunks(component, trace=t))
+      self.assertGreater(len(chunks), 1)
+      self.assertEqual(''.join(chunks), helptext.HelpText(component, trace=t))
+
+  def testHelpTextChunksRenderUsageDetailsLazily(self):
+    chunks = helptext.HelpTextChunks(tc)
+    with mock.patch.object(helptext, '_MakeUsageDetailsSection',
+                           wraps=helptext._MakeUsageDetailsSection) as make:  # pylint: disable=protected-access
+      self.assertTrue(next(chunks).startswith('NAME'))
+      self.assertFalse(make.called)
+      list(chunks)
+      self.assertTrue(make.called)
+
+
+class ExportTreeTest(testutils.BaseTestCase):
+
+  def setUp(self):
+    super(ExportTreeTest, self).setUp()
+    os.environ['ANSI_COLORS_DISABLED'] = '1'
+    self.directory = tempfile.mkdtemp()
+    self.component = {'calculator': tc.WithDefaults(), 'count': 3,
+                      'no-defaults': tc.NoDefaults}
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+    super(ExportTreeTest, self).tearDown()
+
+  def _Read(self, filename):
+    with open(os.path.join(self.directory, filename)) as f:
+      return f.read()
+
+  def testExportTreeWritesOneFilePerCommand(self):
+    paths = helptext.ExportTree(self.component, self.directory, name='cli')
+    self.assertEqual(
+        [os.path.basename(path) for path in paths],
+        ['cli.md', 'cli-calculator.md', 'cli-calculator-double.md',
+         'cli-calculator-text.md', 'cli-calculator-triple.md',
+         'cli-no-defaults.md'])
+    page = self._Read('cli-calculator-double.md')
+    self.assertTrue(page.startswith('# cli calculator double\n'))
+    self.assertIn('## FLAGS', page)
+    self.assertIn('    Returns the input multiplied by 2.', page)
+
+  def testExportTreeKeepsCollidingFileNames(self):
+    component = {'a/b': tc.NoDefaults, 'a_b': tc.WithDefaults,
+                 'A_B': tc.NoDefaults}
+    paths = helptext.ExportTree(component, self.directory, name='cli', depth=1)
+    self.assertEqual([os.path.basename(path) for path in paths],
+                     ['cli.md', 'cli-a_b.md', 'cli-a_b-2.md', 'cli-A_B-3.md'])
+    self.assertEqual(len(set(os.listdir(self.directory))), 4)
+
+  def testExportTreeFormats(self):
+    helptext.ExportTree(self.component, self.directory, fmt='man', name='cli')
+    page = self._Read('cli-calculator-double.1')
+    self.assertTrue(page.startswith('.TH "CLI\\-CALCULATOR\\-DOUBLE" "1"\n'))
+    self.assertIn('.SH "FLAGS"', page)
+
+    helptext.ExportTree(self.component, self.directory, fmt='json', name='cli')
+    page = json.loads(self._Read('cli-calculator-double.json'))
+    self.assertEqual(page['command'], 'cli calculator double')
+    self.assertEqual(page['sections'][0],
+                     {'title': 'NAME', 'content': 'cli calculator double - '
+                                                  'Returns the input multiplied '
+                                                  'by 2.'})
+
+    with self.assertRaisesRegex(ValueError, 'Unknown help format'):
+      helptext.ExportTree(self.component, self.directory, fmt='html')
+
+  def testExportTreeFollowsTrace(self):
+    t = trace.FireTrace(self.component, name='cli')
+    t.AddAccessedProperty(self.component['calculator'], 'calculator',
+                          ['calculator'], None, None)
+    paths = helptext.ExportTree(self.component['calculator'], self.directory,
+                                trace=t, depth=0)
+    self.assertEqual(paths, [os.path.join(self.directory, 'cli-calculator.md')])
+
+  @testutils.skipIf(not hasattr(os, 'fork'), 'Requires fork.')
+  def testExportTreeWithProcesses(self):
+    paths = helptext.ExportTree(self.component, self.directory, name='cli')
+    pages = [self._Read(path) for path in paths]
+    self.assertEqual(
+        helptext.ExportTree(self.component, self.directory, name='cli',
+                            processes=2),
+        paths)
+    self.assertEqual([self._Read(path) for path in paths], pages)
+
 
 class UsageTest(testutils.BaseTestCase):
 
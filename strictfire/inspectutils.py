@@ -18,10 +18,14 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import functools
 import inspect
+import os
 import sys
 import types
+import weakref
 
+from strictfire import custom_descriptions
 from strictfire import docstrings
 
 import six
@@ -29,6 +33,23 @@ import six
 if six.PY34:
   import asyncio  # pylint: disable=import-error,g-import-not-at-top  # pytype: disable=import-error
 
+# Info and GetDocstring only use IPython's oinspect if this is set, since
+# importing IPython takes much longer than rendering a help screen. It defaults
+# to whether the STRICTFIRE_USE_IPYTHON environment variable is set.
+USE_IPYTHON = bool(os.environ.get('STRICTFIRE_USE_IPYTHON'))
+
+# The docstrings of the default __init__ and __call__, which Info does not
+# report.
+_DEFAULT_DOCSTRINGS = frozenset(
+    (inspect.getdoc(object.__init__), inspect.getdoc(type.__call__)))
+
+# GetFileAndLine results for functions, classes and modules.
+_file_and_line_cache = weakref.WeakKeyDictionary()
+
+# GetFullArgSpec results for functions and classes, by whether the function is
+# bound.
+_full_arg_spec_cache = weakref.WeakKeyDictionary()
+
 
 class FullArgSpec(object):
   """The arguments of a function, as in Python 3's inspect.FullArgSpec."""
@@ -181,7 +202,34 @@ def Py3GetFullArgSpec(fn):
 
 
 def GetFullArgSpec(fn):
-  """Returns a FullArgSpec describing the given callable."""
+  """Returns a FullArgSpec describing the given callable.
+
+  Results are cached for functions, methods and classes, which are inspected
+  again for every command run against the same component, e.g. in a batch.
+
+  Args:
+    fn: The function or class of interest.
+  Returns:
+    A FullArgSpec. It is shared with other callers and must not be modified.
+  """
+  key = getattr(fn, '__func__', fn)
+  if not (inspect.isfunction(key) or inspect.isclass(key)):
+    return _GetFullArgSpec(fn)
+  bound = key is not fn
+  try:
+    return _full_arg_spec_cache[key][bound]
+  except (KeyError, TypeError):
+    pass
+  result = _GetFullArgSpec(fn)
+  try:
+    _full_arg_spec_cache.setdefault(key, {})[bound] = result
+  except TypeError:  # Old-style classes cannot be weakly referenced.
+    pass
+  return result
+
+
+def _GetFullArgSpec(fn):
+  """Returns a FullArgSpec describing the given callable, uncached."""
   original_fn = fn
   fn, skip_arg = _GetArgSpecInfo(fn)
 
@@ -235,6 +283,9 @@ def GetFullArgSpec(fn):
 def GetFileAndLine(component):
   """Returns the filename and line number of component.
 
+  Results are cached for functions, methods, classes and modules, since finding
+  the line a class is defined at requires parsing its module.
+
   Args:
     component: A component to find the source information for, usually a class
         or routine.
@@ -242,12 +293,32 @@ def GetFileAndLine(component):
     filename: The name of the file where component is defined.
     lineno: The line number where component is defined.
   """
+  key = getattr(component, '__func__', component)
+  if not (inspect.isfunction(key) or inspect.isclass(key)
+          or inspect.ismodule(key)):
+    return _GetFileAndLine(component)
+  try:
+    return _file_and_line_cache[key]
+  except (KeyError, TypeError):
+    pass
+  result = _GetFileAndLine(component)
+  try:
+    _file_and_line_cache[key] = result
+  except TypeError:  # Old-style classes cannot be weakly referenced.
+    pass
+  return result
+
+
+def _GetFileAndLine(component):
+  """Returns the filename and line number of component, without caching."""
   if inspect.isbuiltin(component):
     return None, None
 
   try:
     filename = inspect.getsourcefile(component)
-  except TypeError:
+  except (TypeError, OSError):
+    # OSError is raised for components defined without a source file, such as
+    # those defined with python -c.
     return None, None
 
   try:
@@ -259,55 +330,84 @@ def GetFileAndLine(component):
   return filename, lineno
 
 
+def GetDocstring(component):
+  """Returns the docstring of component, as Info reports it.
+
+  This is much cheaper than calling Info, for when only the docstring is needed.
+
+  Args:
+    component: The component to get the docstring of.
+  Returns:
+    The docstring of component, or None if it has none.
+  """
+  if USE_IPYTHON:
+    try:
+      from IPython.core import oinspect  # pylint: disable=import-outside-toplevel,g-import-not-at-top
+      return oinspect.getdoc(component)
+    except ImportError:
+      pass
+  return inspect.getdoc(component)
+
+
 def Info(component):
   """Returns a dict with information about the given component.
 
   The dict will have at least some of the following fields.
     type_name: The type of `component`.
-    string_form: A string representation of `component`.
+    string_form: A string representation of `component`, truncated to
+      custom_descriptions.MAX_STRING_FORM_LENGTH characters.
     file: The file in which `component` is defined.
     line: The line number at which `component` is defined.
     docstring: The docstring of `component`.
+    docstring_info: The parsed docstring, a docstrings.DocstringInfo.
     init_docstring: The init docstring of `component`.
     class_docstring: The class docstring of `component`.
     call_docstring: The call docstring of `component`.
     length: The length of `component`.
 
+  IPython's oinspect is only used, to provide additional fields, if USE_IPYTHON
+  is set.
+
   Args:
     component: The component to analyze.
   Returns:
     A dict with information about the component.
   """
-  try:
-    from IPython.core import oinspect  # pylint: disable=import-outside-toplevel,g-import-not-at-top
-    inspector = oinspect.Inspector()
-    info = inspector.info(component)
+  info = None
+  if USE_IPYTHON:
+    info = _InfoIPython(component)
+  if info is None:
+    info = _InfoNative(component)
 
-    # IPython's oinspect.Inspector.info may return '<no docstring>'
-    if info['docstring'] == '<no docstring>':
-      info['docstring'] = None
-  except ImportError:
-    info = _InfoBackup(component)
+  if 'docstring' in info:
+    info['docstring_info'] = docstrings.parse(info['docstring'])
+
+  return info
 
+
+def _InfoIPython(component):
+  """Returns Info's dict using IPython's oinspect, or None if it's missing."""
   try:
-    unused_code, lineindex = inspect.findsource(component)
-    info['line'] = lineindex + 1
-  except (TypeError, IOError):
-    info['line'] = None
+    from IPython.core import oinspect  # pylint: disable=import-outside-toplevel,g-import-not-at-top
+  except ImportError:
+    return None
+  inspector = oinspect.Inspector()
+  info = inspector.info(component)
 
-  if 'docstring' in info:
-    info['docstring_info'] = docstrings.parse(info['docstring'])
+  # IPython's oinspect.Inspector.info may return '<no docstring>'
+  if info['docstring'] == '<no docstring>':
+    info['docstring'] = None
 
+  # IPython does not truncate the string form.
+  info['string_form'] = custom_descriptions.GetStringForm(component)
+  info['line'] = GetFileAndLine(component)[1]
   return info
 
 
-def _InfoBackup(component):
+def _InfoNative(component):
   """Returns a dict with information about the given component.
 
-  This function is to be called only in the case that IPython's
-  oinspect module is not available. The info dict it produces may
-  contain less information that contained in the info dict produced
-  by oinspect.
+  This provides the fields documented in Info without using IPython.
 
   Args:
     component: The component to analyze.
@@ -317,13 +417,24 @@ def _InfoBackup(component):
   info = {}
 
   info['type_name'] = type(component).__name__
-  info['string_form'] = str(component)
+  info['string_form'] = custom_descriptions.GetStringForm(component)
 
   filename, lineno = GetFileAndLine(component)
   info['file'] = filename
   info['line'] = lineno
   info['docstring'] = inspect.getdoc(component)
 
+  if inspect.isclass(component):
+    info['init_docstring'] = _OwnDocstring(
+        getattr(component, '__init__', None))
+  elif not inspect.isroutine(component) and not inspect.ismodule(component):
+    class_docstring = inspect.getdoc(type(component))
+    if class_docstring != info['docstring']:
+      info['class_docstring'] = class_docstring
+    if callable(component):
+      info['call_docstring'] = _OwnDocstring(
+          getattr(type(component), '__call__', None))
+
   try:
     info['length'] = str(len(component))
   except (TypeError, AttributeError):
@@ -332,6 +443,14 @@ def _InfoBackup(component):
   return info
 
 
+def _OwnDocstring(method):
+  """Returns the docstring of method, unless it is a default docstring."""
+  if method is None:
+    return None
+  docstring = inspect.getdoc(method)
+  return None if docstring in _DEFAULT_DOCSTRINGS else docstring
+
+
 def IsNamedTuple(component):
   """Return true if the component is a namedtuple.
 
@@ -365,8 +484,136 @@ def GetClassAttrsDict(component):
   }
 
 
+# Descriptors whose __get__ is known to be free of side effects. Binding these
+# is how a member lookup would normally resolve them, so static enumeration
+# resolves them too (e.g. methods are returned bound, like inspect.getmembers).
+_SAFE_DESCRIPTOR_TYPES = (
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    staticmethod,
+    classmethod,
+    type(str.join),  # method_descriptor
+    type(object.__init__),  # wrapper_descriptor
+    type(dict.__dict__['fromkeys']),  # classmethod_descriptor
+    type(type.__dict__['__dict__']),  # getset_descriptor
+    types.MemberDescriptorType,
+)
+if hasattr(functools, 'lru_cache'):
+  # Binds the cached function like a method, without calling it.
+  _SAFE_DESCRIPTOR_TYPES += (type(functools.lru_cache()(lambda: None)),)
+
+
+class UnevaluatedDescriptor(object):
+  """A class attribute that GetStaticMembers did not evaluate, e.g. a property.
+
+  Attributes:
+    descriptor: The descriptor, as found in the class's __dict__.
+  """
+
+  __slots__ = ('descriptor',)
+
+  def __init__(self, descriptor):
+    self.descriptor = descriptor
+
+  def __repr__(self):
+    return 'UnevaluatedDescriptor({descriptor!r})'.format(
+        descriptor=self.descriptor)
+
+
+def _StaticDict(obj):
+  """Returns obj's own __dict__ without going through its attribute lookup."""
+  try:
+    return object.__getattribute__(obj, '__dict__')
+  except (AttributeError, TypeError):
+    return {}
+
+
+def GetStaticMembers(component):
+  """Returns the members of component without invoking arbitrary descriptors.
+
+  This is a side-effect-free alternative to inspect.getmembers. Members are
+  found by walking the __dict__ of the component and of each class in its MRO
+  rather than by calling getattr, so properties and other custom descriptors
+  are not evaluated. Methods, staticmethods, classmethods and slots are still
+  resolved, as doing so never runs user code, and so are functions cached with
+  functools.lru_cache. Other callables, such as functions compiled by Cython,
+  are returned as found. Any other descriptor on the class is returned wrapped
+  in an UnevaluatedDescriptor.
+
+  Args:
+    component: The component whose members to list.
+  Returns:
+    A list of (member_name, member) tuples, sorted by member_name.
+  """
+  if inspect.ismodule(component):
+    return sorted(_StaticDict(component).items())
+
+  if inspect.isclass(component):
+    instance, owner = None, component
+    instance_dict = {}
+  else:
+    instance, owner = component, type(component)
+    instance_dict = _StaticDict(component)
+
+  class_attrs = {}
+  for cls in reversed(inspect.getmro(owner)):
+    class_attrs.update(_StaticDict(cls))
+
+  members = {}
+  for name, attr in class_attrs.items():
+    if (isinstance(attr, _SAFE_DESCRIPTOR_TYPES)
+        and hasattr(type(attr), '__get__')):
+      try:
+        members[name] = attr.__get__(instance, owner)
+      except AttributeError:
+        # An unset slot, for example. inspect.getmembers skips these too.
+        continue
+    elif (inspect.isclass(attr) or not hasattr(type(attr), '__get__')
+          or (callable(attr) and not hasattr(type(attr), '__set__'))):
+      members[name] = attr
+    else:
+      members[name] = UnevaluatedDescriptor(attr)
+
+  for name, value in instance_dict.items():
+    # Data descriptors on the class take precedence over the instance dict.
+    class_attr = class_attrs.get(name)
+    if not hasattr(type(class_attr), '__set__'):
+      members[name] = value
+
+  return sorted(members.items())
+
+
+def IsUnevaluatedDescriptor(member):
+  """Returns whether member is a descriptor GetStaticMembers did not resolve.
+
+  These are descriptors such as properties that GetStaticMembers returns
+  wrapped in an UnevaluatedDescriptor, because evaluating them could run
+  arbitrary code.
+
+  Args:
+    member: A member, as returned by GetStaticMembers.
+  Returns:
+    True if member is an unevaluated descriptor, False otherwise.
+  """
+  return isinstance(member, UnevaluatedDescriptor)
+
+
 def IsCoroutineFunction(fn):
   try:
     return six.PY34 and asyncio.iscoroutinefunction(fn)
   except:  # pylint: disable=bare-except
     return False
+
+
+def IsAwaitable(obj):
+  """Returns whether obj can be awaited, e.g. a coroutine or a future."""
+  try:
+    return six.PY34 and inspect.isawaitable(obj)
+  except:  # pylint: disable=bare-except
+    return False
+
+
+def IsAsyncIterable(obj):
+  """Returns whether obj can be iterated over with async for."""
+  return hasattr(type(obj), '__aiter__')
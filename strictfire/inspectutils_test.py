@@ -18,13 +18,17 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import inspect
 import os
+import sys
+import types
 import unittest
 
 from strictfire import inspectutils
 from strictfire import test_components as tc
 from strictfire import testutils
 
+import mock
 import six
 
 
@@ -110,6 +114,13 @@ class InspectUtilsTest(testutils.BaseTestCase):
     self.assertEqual(spec.kwonlydefaults, {})
     self.assertEqual(spec.annotations, {})
 
+  def testGetFullArgSpecIsCached(self):
+    spec = inspectutils.GetFullArgSpec(tc.NoDefaults().double)
+    self.assertIs(inspectutils.GetFullArgSpec(tc.NoDefaults().double), spec)
+    unbound = inspectutils.GetFullArgSpec(tc.NoDefaults.double)
+    self.assertEqual(unbound.args, ['self', 'count'])
+    self.assertIs(inspectutils.GetFullArgSpec(tc.NoDefaults.double), unbound)
+
   def testInfoOne(self):
     info = inspectutils.Info(1)
     self.assertEqual(info.get('type_name'), 'int')
@@ -136,6 +147,113 @@ class InspectUtilsTest(testutils.BaseTestCase):
     info = inspectutils.Info(tc.NoDefaults)
     self.assertEqual(info['docstring'], None, 'Docstring should be None')
 
+  def testInfoDocstrings(self):
+    info = inspectutils.Info(tc.ClassWithDocstring)
+    self.assertEqual(info['docstring_info'].summary,
+                     'Test class for testing help text output.')
+    self.assertIn('Constructor of the test class.', info['init_docstring'])
+    info = inspectutils.Info(tc.NoDefaults)
+    self.assertIsNone(info['init_docstring'])
+
+  def testInfoObjectDocstrings(self):
+    info = inspectutils.Info(tc.CallableWithPositionalArgs())
+    self.assertEqual(info['docstring'], 'Test class for supporting callable.')
+    self.assertNotIn('class_docstring', info)
+    self.assertIsNone(info['call_docstring'])
+    self.assertEqual(inspectutils.Info([1, 2])['length'], '2')
+
+  @testutils.skipIf(six.PY2, 'tracemalloc is only available in Python 3.')
+  def testInfoMemoryIsBounded(self):
+    import tracemalloc  # pylint: disable=g-import-not-at-top
+    for component in (list(range(10 ** 6)), dict.fromkeys(range(10 ** 5)),
+                      'x' * 10 ** 7):
+      tracemalloc.start()
+      try:
+        info = inspectutils.Info(component)
+        _, peak = tracemalloc.get_traced_memory()
+      finally:
+        tracemalloc.stop()
+      self.assertLess(len(info['string_form']), 250)
+      self.assertLess(peak, 100000)
+
+  def testInfoDoesNotUseIPythonUnlessEnabled(self):
+    oinspect = types.ModuleType('IPython.core.oinspect')
+    oinspect.Inspector = mock.Mock()
+    oinspect.Inspector.return_value.info.return_value = {
+        'docstring': '<no docstring>', 'type_name': 'ipython',
+        'string_form': 'x' * 1000}
+    core = types.ModuleType('IPython.core')
+    core.oinspect = oinspect
+    ipython = types.ModuleType('IPython')
+    ipython.core = core
+    modules = {'IPython': ipython, 'IPython.core': core,
+               'IPython.core.oinspect': oinspect}
+    with mock.patch.dict(sys.modules, modules):
+      self.assertEqual(inspectutils.Info(tc.NoDefaults)['type_name'], 'type')
+      self.assertFalse(oinspect.Inspector.called)
+      with mock.patch.object(inspectutils, 'USE_IPYTHON', True):
+        info = inspectutils.Info(tc.NoDefaults)
+      self.assertEqual(info['type_name'], 'ipython')
+      self.assertIsNone(info['docstring'])
+      self.assertEqual(info['string_form'], str(tc.NoDefaults))
+      self.assertGreater(info['line'], 0)
+
+  def testInfoWithMissingIPython(self):
+    with mock.patch.dict(sys.modules, {'IPython': None}):
+      with mock.patch.object(inspectutils, 'USE_IPYTHON', True):
+        info = inspectutils.Info(tc.NoDefaults)
+    self.assertEqual(info['type_name'], 'type')
+
+  def testGetFileAndLineIsCached(self):
+
+    class Local(object):
+
+      def method(self):
+        pass
+
+    expected = inspectutils.GetFileAndLine(Local)
+    with mock.patch.object(inspect, 'findsource',
+                           return_value=(None, 0)) as findsource:
+      self.assertEqual(inspectutils.GetFileAndLine(Local), expected)
+      self.assertEqual(inspectutils.GetFileAndLine(Local().method),
+                       (expected[0], 1))
+      inspectutils.GetFileAndLine(Local().method)
+      inspectutils.GetFileAndLine(Local.method)
+    self.assertEqual(findsource.call_count, 1)
+
+  def testGetStaticMembersDoesNotEvaluateProperties(self):
+    component = tc.InvalidProperty()
+    members = dict(inspectutils.GetStaticMembers(component))
+    self.assertIsInstance(members['prop'].descriptor, property)
+    self.assertTrue(inspectutils.IsUnevaluatedDescriptor(members['prop']))
+    self.assertEqual(members['double'](10), 20)
+    self.assertFalse(inspectutils.IsUnevaluatedDescriptor(members['double']))
+
+  @testutils.skipIf(six.PY2, 'lru_cache is Python 3 only.')
+  def testGetStaticMembersResolvesLruCacheFunctions(self):
+    members = dict(inspectutils.GetStaticMembers(tc.py3))  # pytype: disable=module-attr
+    self.assertIs(members['lru_cache_decorated'], tc.py3.lru_cache_decorated)  # pytype: disable=module-attr
+    self.assertFalse(
+        inspectutils.IsUnevaluatedDescriptor(members['lru_cache_decorated']))
+    members = dict(inspectutils.GetStaticMembers(
+        tc.py3.LruCacheDecoratedMethod()))  # pytype: disable=module-attr
+    self.assertFalse(
+        inspectutils.IsUnevaluatedDescriptor(members['lru_cache_in_class']))
+    self.assertEqual(members['lru_cache_in_class']('value'), 'value')
+
+  def testGetStaticMembersMatchesGetMembersNames(self):
+    component = tc.TypedProperties()
+    self.assertEqual(
+        [name for name, _ in inspectutils.GetStaticMembers(component)],
+        [name for name, _ in inspect.getmembers(component)])
+    members = dict(inspectutils.GetStaticMembers(component))
+    self.assertEqual(members['beta'], (1, 2, 3))
+
+  def testGetStaticMembersClass(self):
+    members = dict(inspectutils.GetStaticMembers(tc.HasStaticAndClassMethods))
+    self.assertEqual(members['static_fn'](1), 1)
+    self.assertEqual(members['class_fn'](2), 3)
+
 
 if __name__ == '__main__':
   testutils.main()
@@ -0,0 +1,125 @@
+# Copyright (C) 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Provides LazyGroup, a group of commands that are imported on demand.
+
+A CLI that aggregates many subsystems would normally pass Fire a dict of the
+imported subsystems, importing all of them on every invocation. With a
+LazyGroup, only the subcommand that is actually selected is imported:
+
+  strictfire.StrictFire(strictfire.LazyGroup({
+      'train': 'mypackage.train:main',
+      'serve': 'mypackage.serve',
+  }))
+
+Help screens and completion scripts list the declared names without importing
+anything.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+import importlib
+
+import six
+
+try:
+  from collections.abc import Mapping  # pylint: disable=g-import-not-at-top,g-importing-member
+except ImportError:  # Python 2.
+  from collections import Mapping  # pylint: disable=g-import-not-at-top,g-importing-member
+
+
+class LazyTarget(object):
+  """Stands in for a LazyGroup member that has not been imported yet."""
+
+  def __init__(self, target):
+    self.target = target
+    self.__doc__ = None
+
+  def IsModule(self):
+    """Whether the target names a module, rather than a member of a module."""
+    return ':' not in self.target
+
+  def __repr__(self):
+    return '<lazy {target}>'.format(target=self.target)
+
+
+class LazyGroup(Mapping):
+  """A group of commands whose components are imported when first accessed.
+
+  A LazyGroup maps command names to targets. A target is either a string
+  'package.module' or 'package.module:attribute.path' naming the component to
+  import, or the component itself. Looking up a name imports its target.
+  """
+
+  def __init__(self, targets):
+    """Constructs a LazyGroup.
+
+    Args:
+      targets: A dict mapping command names to targets.
+    """
+    self._targets = collections.OrderedDict(targets)
+    self._components = {}
+    # Help screens describe the group's commands, not the LazyGroup class.
+    self.__doc__ = None
+
+  def __getitem__(self, name):
+    if name not in self._components:
+      target = self._targets[name]
+      if isinstance(target, six.string_types):
+        target = _Import(target)
+      self._components[name] = target
+    return self._components[name]
+
+  def __iter__(self):
+    return iter(self._targets)
+
+  def __len__(self):
+    return len(self._targets)
+
+  def __contains__(self, name):
+    return name in self._targets
+
+  def __repr__(self):
+    return 'LazyGroup({names})'.format(names=list(self._targets))
+
+  def IsLoaded(self, name):
+    """Whether the component for name is available without an import."""
+    target = self._targets[name]
+    return (name in self._components
+            or not isinstance(target, six.string_types))
+
+  def Members(self):
+    """Returns (name, member) pairs without importing anything.
+
+    Returns:
+      A list of (name, member) tuples. The member is the component if it is
+      already loaded, and a LazyTarget otherwise.
+    """
+    return [
+        (name, self[name] if self.IsLoaded(name) else LazyTarget(target))
+        for name, target in self._targets.items()
+    ]
+
+
+def _Import(target):
+  """Imports and returns the component named by a target string."""
+  module_name, _, attribute_path = target.partition(':')
+  component = importlib.import_module(module_name)
+  if attribute_path:
+    for attribute in attribute_path.split('.'):
+      component = getattr(component, attribute)
+  return component
@@ -0,0 +1,123 @@
+# Copyright (C) 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the lazy module."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import sys
+import tempfile
+
+from strictfire import completion
+from strictfire import core
+from strictfire import helptext
+from strictfire import lazy
+from strictfire import testutils
+from strictfire import trace
+
+PACKAGE = 'strictfire_lazy_test_package'
+
+MODULE_TEMPLATE = '''
+"""Subsystem {name}."""
+
+
+def main(count=1):
+  """Runs subsystem {name}."""
+  return '{name}' * count
+'''
+
+
+class LazyGroupTest(testutils.BaseTestCase):
+
+  def setUp(self):
+    super(LazyGroupTest, self).setUp()
+    self.directory = tempfile.mkdtemp()
+    package_directory = os.path.join(self.directory, PACKAGE)
+    os.mkdir(package_directory)
+    open(os.path.join(package_directory, '__init__.py'), 'w').close()
+    for name in ('alpha', 'beta', 'gamma'):
+      with open(os.path.join(package_directory, name + '.py'), 'w') as f:
+        f.write(MODULE_TEMPLATE.format(name=name))
+    sys.path.insert(0, self.directory)
+    self.group = lazy.LazyGroup({
+        'alpha': PACKAGE + '.alpha:main',
+        'beta': PACKAGE + '.beta:main',
+        'gamma': PACKAGE + '.gamma',
+    })
+
+  def tearDown(self):
+    sys.path.remove(self.directory)
+    for module_name in list(sys.modules):
+      if module_name.startswith(PACKAGE):
+        del sys.modules[module_name]
+    shutil.rmtree(self.directory)
+    super(LazyGroupTest, self).tearDown()
+
+  def _ImportedModules(self):
+    return sorted(name for name in sys.modules
+                  if name.startswith(PACKAGE + '.'))
+
+  def testFireImportsOnlySelectedTarget(self):
+    self.assertEqual(core.StrictFire(self.group, command=['alpha']), 'alpha')
+    self.assertEqual(self._ImportedModules(), [PACKAGE + '.alpha'])
+
+  def testFireModuleTarget(self):
+    self.assertEqual(
+        core.StrictFire(self.group, command=['gamma', 'main', '--count', '2']),
+        'gammagamma')
+    self.assertEqual(self._ImportedModules(), [PACKAGE + '.gamma'])
+
+  def testFireMissingName(self):
+    with self.assertRaisesFireExit(2, 'Cannot find key: delta'):
+      core.StrictFire(self.group, command=['delta'])
+    self.assertEqual(self._ImportedModules(), [])
+
+  def testHelpTextImportsNothing(self):
+    t = trace.FireTrace(self.group, name='cli')
+    help_screen = helptext.HelpText(self.group, trace=t)
+    self.assertIn('GROUP is one of the following:', help_screen)
+    self.assertIn('COMMAND is one of the following:', help_screen)
+    self.assertIn('alpha', help_screen)
+    self.assertIn('gamma', help_screen)
+    self.assertNotIn('LazyGroup', help_screen)
+    usage = helptext.UsageText(self.group, trace=t)
+    self.assertIn('available commands:    alpha | beta', usage)
+    self.assertEqual(self._ImportedModules(), [])
+
+  def testCompletionScriptImportsNothing(self):
+    budget = completion.CompletionBudget()
+    script = completion.Script('cli', self.group, budget=budget)
+    self.assertIn('alpha', script)
+    self.assertIn('cli gamma -- --completion words', script)
+    self.assertEqual(budget.pruned[('gamma',)], None)
+    self.assertEqual(self._ImportedModules(), [])
+
+  def testLoadedMembersAreListed(self):
+    core.StrictFire(self.group, command=['alpha'])
+    members = dict(self.group.Members())
+    self.assertEqual(members['alpha'](), 'alpha')
+    self.assertIsInstance(members['beta'], lazy.LazyTarget)
+
+  def testNonStringTargets(self):
+    group = lazy.LazyGroup({'length': len})
+    self.assertTrue(group.IsLoaded('length'))
+    self.assertEqual(core.StrictFire(group, command=['length', 'abc']), 3)
+
+
+if __name__ == '__main__':
+  testutils.main()
@@ -38,6 +38,24 @@ class MainModuleTest(testutils.BaseTestCase):
       __main__.main(
           ['__main__.py', 'os', 'path', '-', 'join', 'part1', 'part2', 'part3'])
 
+  def testConnectWithoutDaemon(self):
+    with self.assertRaises(SystemExit) as context:
+      with self.assertOutputMatches(
+          stdout=None, stderr='No daemon is listening on .*--serve'):
+        __main__.main(['__main__.py', '--connect', 'no_such_module', 'arg'])
+    self.assertEqual(context.exception.code, 1)
+
+  def testServeWithInvalidIdleTimeout(self):
+    os.environ['STRICTFIRE_SERVE_IDLE_TIMEOUT'] = 'abc'
+    try:
+      with self.assertRaises(SystemExit) as context:
+        with self.assertOutputMatches(
+            stdout=None, stderr="STRICTFIRE_SERVE_IDLE_TIMEOUT .* 'abc'"):
+          __main__.main(['__main__.py', '--serve', 'tempfile'])
+    finally:
+      del os.environ['STRICTFIRE_SERVE_IDLE_TIMEOUT']
+    self.assertEqual(context.exception.code, 1)
+
 
 class MainModuleFileTest(testutils.BaseTestCase):
   """Tests to verify correct import behavior for file executables."""
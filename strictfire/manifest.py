@@ -0,0 +1,457 @@
+# Copyright (C) 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Static command manifests, for help and completion without imports.
+
+A manifest records the command tree of a module: its groups, commands and
+values, the argspecs of its commands with the reprs of their defaults, and
+their docstrings and summaries. Build one with:
+
+  python -m strictfire --build-manifest package.module
+
+This writes the manifest to the module's __pycache__ directory. From then on,
+`python -m strictfire package.module ...` consults the manifest before importing
+the module. Help, usage, completion scripts and strict argument errors are
+produced from the manifest alone; the module is only imported once a command
+actually has to run.
+
+The manifest also records a fingerprint of the source files that define the
+components in it. If any of them changes, the manifest is ignored and then
+rebuilt after the module is imported.
+
+Internally, the manifest is turned into a tree of stand-in components that
+mirror the real ones closely enough for Fire to traverse them, and Fire is run
+on those. Anything that would need the real components raises NeedsImport.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import inspect
+import json
+import os
+
+from strictfire import completion
+from strictfire import core
+from strictfire import custom_descriptions
+from strictfire import decorators
+from strictfire import docstrings
+from strictfire import helptext
+from strictfire import inspectutils
+from strictfire import lazy
+from strictfire import parser
+from strictfire import value_types
+import six
+
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = '.fire-manifest.json'
+
+# Like completion scripts, manifests only cover this many levels of members.
+DEPTH = 3
+
+ROUTINE = 'routine'
+CLASS = 'class'
+GROUP = 'group'
+OPAQUE = 'opaque'  # A member that cannot be used without importing it.
+
+
+class NeedsImport(Exception):
+  """Raised when a command cannot be handled from the manifest alone."""
+
+
+def Build(component, depth=DEPTH):
+  """Returns the manifest for component, as a JSON-serializable dict."""
+  sources = set()
+  root = _BuildNode(component, depth, sources)
+  return {
+      'version': MANIFEST_VERSION,
+      'root': root,
+      'sources': {path: _Fingerprint(path) for path in sorted(sources)},
+  }
+
+
+def Write(component, path, depth=DEPTH):
+  """Builds the manifest for component and writes it to path."""
+  directory = os.path.dirname(path)
+  if directory and not os.path.isdir(directory):
+    os.makedirs(directory)
+  with open(path, 'w') as f:
+    json.dump(Build(component, depth=depth), f)
+
+
+def Load(path):
+  """Returns the manifest stored at path, or None if it is missing or stale."""
+  try:
+    with open(path) as f:
+      manifest = json.load(f)
+  except (IOError, OSError, ValueError):
+    return None
+  if manifest.get('version') != MANIFEST_VERSION:
+    return None
+  for source, fingerprint in manifest['sources'].items():
+    if _Fingerprint(source) != fingerprint:
+      return None
+  return manifest
+
+
+def DefaultPath(source_file):
+  """The path of the manifest for the module defined in source_file."""
+  directory, filename = os.path.split(os.path.abspath(source_file))
+  module_name = os.path.splitext(filename)[0]
+  return os.path.join(directory, '__pycache__', module_name + MANIFEST_SUFFIX)
+
+
+def FindSource(module_or_filename):
+  """Finds the source file of a module without importing the module itself.
+
+  Args:
+    module_or_filename: A module name or a path to a .py file.
+  Returns:
+    The path to the source file, or None if it cannot be determined. Parent
+    packages of a module may be imported in the process.
+  """
+  if module_or_filename.endswith('.py'):
+    return module_or_filename if os.path.exists(module_or_filename) else None
+  if six.PY2:
+    return None
+  from importlib import util  # pylint: disable=g-import-not-at-top,import-outside-toplevel,no-name-in-module
+  try:
+    spec = util.find_spec(module_or_filename)  # pylint: disable=no-member
+  except (ImportError, ValueError):
+    return None
+  if spec is None or not spec.has_location or not spec.origin:
+    return None
+  if not spec.origin.endswith('.py'):
+    return None
+  return spec.origin
+
+
+def Fire(manifest, command, name):
+  """Runs StrictFire using the manifest in place of the real component.
+
+  Args:
+    manifest: A manifest, as returned by Load.
+    command: The list of command line arguments.
+    name: The name of the command.
+  Returns:
+    The result of StrictFire, for commands that only display information.
+  Raises:
+    NeedsImport: If the command cannot be handled without importing the module.
+    FireExit: As raised by StrictFire.
+  """
+  args, flag_args = parser.SeparateFlagArgs(command)
+  parsed_flag_args, _ = parser.ParseFlagArgs(flag_args)
+  if (parsed_flag_args.interactive or parsed_flag_args.trace
+      or parsed_flag_args.verbose or parsed_flag_args.help_all is not None
+      or parsed_flag_args.batch is not None
+      or parsed_flag_args.map is not None):
+    # These flags show things the manifest does not record.
+    raise NeedsImport()
+  _CheckPath(manifest['root'], args, parsed_flag_args.separator)
+  return core.StrictFire(Component(manifest), command=command, name=name)
+
+
+def _CheckPath(node, args, separator):
+  """Raises NeedsImport unless the members args access are in the manifest."""
+  for arg in args:
+    if arg == separator:
+      raise NeedsImport()
+    if arg.startswith('-') or 'members' not in node:
+      # The remaining args are flags or arguments for a command; the stand-in
+      # components check those.
+      return
+    members = node['members']
+    if arg in members:
+      node = members[arg]
+    elif arg.replace('-', '_') in members:
+      node = members[arg.replace('-', '_')]
+    else:
+      # The manifest only records visible members.
+      raise NeedsImport()
+    if node['kind'] == OPAQUE:
+      raise NeedsImport()
+
+
+def _Fingerprint(path):
+  try:
+    stat = os.stat(path)
+  except OSError:
+    return None
+  return [stat.st_size, stat.st_mtime]
+
+
+def _AddSource(component, sources):
+  try:
+    source = inspect.getsourcefile(component)
+  except TypeError:
+    return
+  if source:
+    sources.add(os.path.abspath(source))
+
+
+def _ListedAs(member):
+  """How a help screen lists member: as a 'group', 'command' or 'value'."""
+  if inspectutils.IsUnevaluatedDescriptor(member):
+    return 'value'
+  if isinstance(member, lazy.LazyTarget):
+    return 'group' if member.IsModule() else 'command'
+  return value_types.Classify(member)[0]
+
+
+def _Summary(component):
+  """The summary help screens show for component when listing it."""
+  if custom_descriptions.NeedsCustomDescription(component):
+    return custom_descriptions.GetSummary(
+        component, helptext.LINE_LENGTH - helptext.SECTION_INDENTATION,
+        helptext.LINE_LENGTH)
+  return docstrings.parse(inspect.getdoc(component)).summary
+
+
+def _BuildNode(component, depth, sources):
+  """Returns the manifest node describing component."""
+  listed_as = _ListedAs(component)
+  descriptor = inspectutils.IsUnevaluatedDescriptor(component)
+  if descriptor:
+    component = component.descriptor
+  node = {
+      'doc': inspect.getdoc(component),
+      'summary': _Summary(component),
+  }
+  if custom_descriptions.NeedsCustomDescription(component):
+    # The docstrings of builtin types are not shown in help screens.
+    node['doc'] = node['summary']
+  is_group = (
+      listed_as == 'group'
+      and not isinstance(component, (lazy.LazyTarget, list, tuple, set,
+                                     frozenset))
+      and not callable(component)
+      and not (isinstance(component, dict)
+               and value_types.IsSimpleGroup(component)))
+
+  if not descriptor and (inspect.isroutine(component)
+                         or inspect.isclass(component)):
+    _AddSource(component, sources)
+    spec = inspectutils.GetFullArgSpec(component)
+    metadata = decorators.GetMetadata(component)
+    node['kind'] = CLASS if inspect.isclass(component) else ROUTINE
+    node['spec'] = _SpecNode(spec)
+    node['accepts_positional_args'] = bool(
+        metadata.get(decorators.ACCEPTS_POSITIONAL_ARGS))
+  elif is_group and depth >= 1:
+    if inspect.ismodule(component):
+      _AddSource(component, sources)
+    node['kind'] = GROUP
+    node['is_dict'] = isinstance(component, dict)
+    if not inspect.ismodule(component) and not node['is_dict']:
+      # Help screens describe an object's values using its __init__ docstring.
+      node['init_doc'] = inspect.getdoc(type(component).__init__)
+  else:
+    node['kind'] = OPAQUE
+    node['listed_as'] = listed_as
+    node['descriptor'] = descriptor
+    return node
+
+  if inspect.isroutine(component) or depth < 1:
+    return node
+
+  # As for completion scripts, methods are included for classes. Help screens
+  # hide them on the stand-in class just as they do on the real one.
+  class_attrs = {} if inspect.isclass(component) else None
+  real_class_attrs = inspectutils.GetClassAttrsDict(component) or {}
+  node['members'] = members = {}
+  for member_name, member in completion.VisibleMembers(
+      component, class_attrs=class_attrs, static=True):
+    member_name = str(member_name)
+    members[member_name] = _BuildNode(member, depth - 1, sources)
+    class_attr = real_class_attrs.get(member_name)
+    if class_attr is not None:
+      members[member_name]['class_attr_kind'] = class_attr.kind
+  return node
+
+
+def _SpecNode(spec):
+  return {
+      'args': spec.args,
+      'varargs': spec.varargs,
+      'varkw': spec.varkw,
+      'defaults': [repr(default) for default in spec.defaults],
+      'kwonlyargs': spec.kwonlyargs,
+      'kwonlydefaults': {
+          name: repr(default) for name, default in spec.kwonlydefaults.items()},
+      'annotations': {
+          name: _TypeName(annotation)
+          for name, annotation in spec.annotations.items() if name != 'return'},
+  }
+
+
+def _TypeName(annotation):
+  # This matches how helptext describes types.
+  try:
+    return annotation.__qualname__
+  except AttributeError:
+    return repr(annotation)
+
+
+class _Repr(object):
+  """Stands in for a default value, reproducing its repr."""
+
+  def __init__(self, text):
+    self.text = text
+
+  def __repr__(self):
+    return self.text
+
+
+class _Annotation(object):
+  """Stands in for a type annotation, reproducing its name."""
+
+  def __init__(self, name):
+    self.__qualname__ = name
+
+  def __repr__(self):
+    return self.__qualname__
+
+
+class _StubGroup(object):
+  """Stands in for a group, such as a module or an object."""
+
+  def __init__(self, doc=None):
+    self.__doc__ = doc
+
+
+class _StubValue(object):
+  """Stands in for a value, which can only be used once it is imported.
+
+  The manifest does not record the members of values, so completion scripts
+  built from a manifest do not complete them.
+  """
+
+  def __str__(self):
+    raise NeedsImport()
+
+
+def Component(manifest):
+  """Returns the stand-in component for the manifest's root."""
+  return _Stub('root', manifest['root'])
+
+
+def _Signature(spec_node, leading=()):
+  """Builds an inspect.Signature matching the recorded argspec."""
+  parameter = inspect.Parameter
+  args = list(leading) + spec_node['args']
+  defaults = [_Repr(text) for text in spec_node['defaults']]
+  first_default = len(args) - len(defaults)
+  annotations = {name: _Annotation(type_name)
+                 for name, type_name in spec_node['annotations'].items()}
+
+  def _Parameter(name, kind, default=parameter.empty):
+    return parameter(name, kind, default=default,
+                     annotation=annotations.get(name, parameter.empty))
+
+  parameters = []
+  for index, arg in enumerate(args):
+    default = (defaults[index - first_default] if index >= first_default
+               else parameter.empty)
+    parameters.append(_Parameter(arg, parameter.POSITIONAL_OR_KEYWORD, default))
+  if spec_node['varargs']:
+    parameters.append(_Parameter(spec_node['varargs'], parameter.VAR_POSITIONAL))
+  for arg in spec_node['kwonlyargs']:
+    default = spec_node['kwonlydefaults'].get(arg)
+    parameters.append(_Parameter(
+        arg, parameter.KEYWORD_ONLY,
+        _Repr(default) if default is not None else parameter.empty))
+  if spec_node['varkw']:
+    parameters.append(_Parameter(spec_node['varkw'], parameter.VAR_KEYWORD))
+  return inspect.Signature(parameters)
+
+
+def _StubFunction(name, doc, signature=None):
+  def _Function(*args, **kwargs):
+    del args, kwargs  # Unused.
+    raise NeedsImport()
+  _Function.__name__ = str(name)
+  _Function.__doc__ = doc
+  if signature is not None:
+    _Function.__signature__ = signature
+  return _Function
+
+
+def _Stub(name, node):
+  """Returns the stand-in component for a manifest node."""
+  kind = node['kind']
+  if kind == OPAQUE:
+    if node['descriptor']:
+      return property(doc=node['doc'])
+    if node['listed_as'] == 'command':
+      return _StubFunction(name, node['doc'])
+    if node['listed_as'] == 'value':
+      return _StubValue()
+    return _StubGroup(node['summary'])
+
+  if kind == ROUTINE:
+    stub = _StubFunction(name, node['doc'], _Signature(node['spec']))
+  elif kind == CLASS:
+    class_dict = {'__doc__': node['doc']}
+    for member_name, member_node in node.get('members', {}).items():
+      class_dict[member_name] = _ClassMember(member_name, member_node)
+    stub = type(str(name), (object,), class_dict)
+    stub.__init__ = _StubFunction('__init__', None)
+    stub.__signature__ = _Signature(node['spec'])
+  elif node.get('is_dict'):
+    # Dicts list their members in order, and have custom descriptions.
+    return {member_name: _Stub(member_name, member_node)
+            for member_name, member_node in node.get('members', {}).items()}
+  else:
+    # Unevaluated descriptors, like properties, only work on the class.
+    members = node.get('members', {})
+    class_dict = {member_name: _Stub(member_name, member_node)
+                  for member_name, member_node in members.items()
+                  if member_node.get('descriptor')}
+    if node.get('init_doc'):
+      def __init__(self, doc=None):  # pylint: disable=invalid-name
+        _StubGroup.__init__(self, doc)
+      __init__.__doc__ = node['init_doc']
+      class_dict['__init__'] = __init__
+    group_class = _StubGroup
+    if class_dict:
+      group_class = type(str('_StubGroup'), (_StubGroup,), class_dict)
+    stub = group_class(node['doc'])
+    for member_name, member_node in members.items():
+      if not member_node.get('descriptor'):
+        setattr(stub, member_name, _Stub(member_name, member_node))
+    return stub
+
+  accepts_positional_args = node['accepts_positional_args']
+  if accepts_positional_args != inspect.isroutine(stub):
+    # Only decorated components have metadata, and it is visible as a member.
+    decorators._SetMetadata(  # pylint: disable=protected-access
+        stub, decorators.ACCEPTS_POSITIONAL_ARGS, accepts_positional_args)
+  return stub
+
+
+def _ClassMember(name, node):
+  """Returns the stand-in for a member of a class, as stored on the class."""
+  class_attr_kind = node.get('class_attr_kind')
+  if class_attr_kind == 'class method' and node['kind'] == ROUTINE:
+    # The recorded argspec is that of the bound classmethod.
+    stub = _StubFunction(name, node['doc'],
+                         _Signature(node['spec'], leading=('cls',)))
+    return classmethod(stub)
+  stub = _Stub(name, node)
+  if class_attr_kind == 'static method':
+    return staticmethod(stub)
+  if class_attr_kind == 'property' and not isinstance(stub, property):
+    return property(doc=node['doc'])
+  return stub
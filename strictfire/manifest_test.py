@@ -0,0 +1,187 @@
+# Copyright (C) 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the manifest module."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import mock
+
+from strictfire import __main__
+from strictfire import completion
+from strictfire import helptext
+from strictfire import manifest
+from strictfire import test_components as tc
+from strictfire import testutils
+from strictfire import trace
+
+MODULE_NAME = 'strictfire_manifest_test_module'
+
+MODULE_SOURCE = '''
+"""A module for testing manifests."""
+
+IMPORTED = True
+CONFIG = {'alpha': 1}
+
+
+def greet(name, greeting='Hello', excited=False):
+  """Greets someone.
+
+  Args:
+    name: Who to greet.
+    greeting: The greeting to use.
+    excited: Whether to shout.
+  """
+  return greeting + ' ' + name + ('!' if excited else '')
+
+
+tools = {'greet': greet, 'twice': lambda value: value * 2}
+'''
+
+
+class ManifestTest(testutils.BaseTestCase):
+
+  def _AssertSameHelp(self, component, name):
+    stub = manifest.Component(manifest.Build(component))
+    self.assertEqual(
+        helptext.HelpText(stub, trace=trace.FireTrace(stub, name=name)),
+        helptext.HelpText(component,
+                          trace=trace.FireTrace(component, name=name)))
+    self.assertEqual(
+        helptext.UsageText(stub, trace=trace.FireTrace(stub, name=name)),
+        helptext.UsageText(component,
+                           trace=trace.FireTrace(component, name=name)))
+
+  def testHelpMatchesFunction(self):
+    self._AssertSameHelp(tc.multiplier_with_docstring, 'multiplier')
+    self._AssertSameHelp(tc.fn_with_kwarg_and_defaults, 'fn')
+
+  def testHelpMatchesClass(self):
+    self._AssertSameHelp(tc.ClassWithDocstring, 'ClassWithDocstring')
+    self._AssertSameHelp(tc.HasStaticAndClassMethods, 'HasStaticAndClassMethods')
+    self._AssertSameHelp(tc.py3.WithDefaultsAndTypes, 'WithDefaultsAndTypes')
+
+  def testHelpMatchesObject(self):
+    self._AssertSameHelp(tc.ClassWithDocstring(), 'ClassWithDocstring')
+    self._AssertSameHelp(tc.InvalidProperty(), 'InvalidProperty')
+    self._AssertSameHelp({'double': tc.NoDefaults().double, 'nested': {
+        'value': 1, 'identity': tc.identity}}, 'dict')
+
+  def testCompletionMatchesClass(self):
+    stub = manifest.Component(manifest.Build(tc.MixedDefaults))
+    self.assertEqual(
+        sorted(completion._Commands(stub)),  # pylint: disable=protected-access
+        sorted(completion._Commands(tc.MixedDefaults)))  # pylint: disable=protected-access
+
+  def testManifestIsSerializable(self):
+    data = manifest.Build(tc)
+    self.assertEqual(json.loads(json.dumps(data)), data)
+    self.assertIn(os.path.abspath(tc.__file__).replace('.pyc', '.py'),
+                  data['sources'])
+
+
+class ManifestFireTest(testutils.BaseTestCase):
+
+  def setUp(self):
+    super(ManifestFireTest, self).setUp()
+    self.directory = tempfile.mkdtemp()
+    self.source = os.path.join(self.directory, MODULE_NAME + '.py')
+    with open(self.source, 'w') as f:
+      f.write(MODULE_SOURCE)
+    sys.path.insert(0, self.directory)
+    self.path = __main__.build_manifest(MODULE_NAME)
+    del sys.modules[MODULE_NAME]
+
+  def tearDown(self):
+    sys.path.remove(self.directory)
+    sys.modules.pop(MODULE_NAME, None)
+    shutil.rmtree(self.directory)
+    super(ManifestFireTest, self).tearDown()
+
+  def testDefaultPath(self):
+    self.assertEqual(self.path, os.path.join(
+        self.directory, '__pycache__', MODULE_NAME + '.fire-manifest.json'))
+    self.assertEqual(manifest.FindSource(MODULE_NAME), self.source)
+
+  def testHelpWithoutImport(self):
+    with self.assertRaisesFireExit(0, 'GROUPS.*tools.*COMMANDS.*greet'):
+      __main__.main(['__main__.py', MODULE_NAME, '--', '--help'])
+    with self.assertRaisesFireExit(0, 'Greets someone.*--greeting'):
+      __main__.main(['__main__.py', MODULE_NAME, 'greet', '--help'])
+    self.assertNotIn(MODULE_NAME, sys.modules)
+
+  def testStrictErrorsWithoutImport(self):
+    with self.assertRaisesFireExit(2, 'Unknown argument.*--bogus'):
+      __main__.main(['__main__.py', MODULE_NAME, 'greet', 'Bob', '--bogus'])
+    with self.assertRaisesFireExit(2, 'no value for the required argument'):
+      __main__.main(['__main__.py', MODULE_NAME, 'greet'])
+    self.assertNotIn(MODULE_NAME, sys.modules)
+
+  def testCompletionWithoutImport(self):
+    with self.assertOutputMatches(stdout='greet'):
+      __main__.main(['__main__.py', MODULE_NAME, '--', '--completion'])
+    self.assertNotIn(MODULE_NAME, sys.modules)
+
+  def testRunningCommandImports(self):
+    with self.assertOutputMatches(stdout='Hi Bob!'):
+      __main__.main(['__main__.py', MODULE_NAME, 'tools', 'greet', 'Bob',
+                     '--greeting', 'Hi', '--excited'])
+    self.assertIn(MODULE_NAME, sys.modules)
+
+  def testValuesImport(self):
+    with self.assertOutputMatches(stdout='alpha: 1'):
+      __main__.main(['__main__.py', MODULE_NAME, 'CONFIG'])
+    self.assertIn(MODULE_NAME, sys.modules)
+
+  def testStaleManifestIsRebuilt(self):
+    with open(self.source, 'a') as f:
+      f.write('\n\ndef farewell():\n  return "Bye"\n')
+    self.assertIsNone(manifest.Load(self.path))
+    with self.assertRaisesFireExit(0, 'farewell'):
+      __main__.main(['__main__.py', MODULE_NAME, '--', '--help'])
+    self.assertIn(MODULE_NAME, sys.modules)
+    data = manifest.Load(self.path)
+    self.assertIn('farewell', data['root']['members'])
+
+  def testUnwritableStaleManifestIsIgnored(self):
+    with open(self.source, 'a') as f:
+      f.write('\n\ndef farewell():\n  return "Bye"\n')
+    with mock.patch.object(manifest, 'Write',
+                           side_effect=OSError('Read-only file system')):
+      with self.assertOutputMatches(stdout='Bye'):
+        __main__.main(['__main__.py', MODULE_NAME, 'farewell'])
+    self.assertIsNone(manifest.Load(self.path))
+
+  def testNeedsImport(self):
+    data = manifest.Load(self.path)
+    with self.assertRaises(manifest.NeedsImport):
+      manifest.Fire(data, ['greet', 'Bob'], name=MODULE_NAME)
+    with self.assertRaises(manifest.NeedsImport):
+      manifest.Fire(data, ['--', '--interactive'], name=MODULE_NAME)
+    with self.assertRaises(manifest.NeedsImport):
+      manifest.Fire(data, ['unknown'], name=MODULE_NAME)
+    with self.assertRaisesFireExit(2, 'Unknown argument'):
+      manifest.Fire(data, ['greet', 'Bob', '--bogus'], name=MODULE_NAME)
+
+
+if __name__ == '__main__':
+  testutils.main()
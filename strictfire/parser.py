@@ -18,22 +18,189 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
-import argparse
 import ast
+import re
+
+# The formats --help-format accepts.
+EXPORT_FORMATS = ('markdown', 'man', 'json')
+
+# The formats --batch-format accepts.
+BATCH_FORMATS = ('text', 'json')
+
+# The worker pools --batch-pool accepts: threads suit components that wait on
+# I/O, forked processes suit components that compute.
+BATCH_POOLS = ('thread', 'process')
+
+
+def _PositiveInt(value):
+  """Converts a flag's value to an int of at least 1, as an argparse type."""
+  try:
+    number = int(value)
+  except ValueError:
+    number = 0
+  if number < 1:
+    import argparse  # pylint: disable=g-import-not-at-top
+    raise argparse.ArgumentTypeError(
+        'expected a positive integer, got {value!r}'.format(value=value))
+  return number
+
+
+# The Fire flags, as the args and kwargs of argparse's add_argument.
+FLAGS = (
+    (('--verbose', '-v'), {'action': 'store_true'}),
+    (('--interactive', '-i'), {'action': 'store_true'}),
+    (('--separator',), {'default': '-'}),
+    (('--completion',), {'nargs': '?', 'const': 'bash', 'type': str}),
+    (('--help', '-h'), {'action': 'store_true'}),
+    (('--help-all',), {'metavar': 'DIRECTORY'}),
+    (('--help-format',), {'default': 'markdown', 'choices': EXPORT_FORMATS}),
+    (('--batch',), {'metavar': 'FILE'}),
+    (('--batch-format',), {'default': 'text', 'choices': BATCH_FORMATS}),
+    (('--batch-pool',), {'default': 'thread', 'choices': BATCH_POOLS}),
+    (('--jobs', '-j'), {'type': _PositiveInt, 'default': 1}),
+    (('--chunk-size',), {'type': _PositiveInt, 'default': 1}),
+    (('--map',), {'metavar': 'ARGNAME'}),
+    (('--trace', '-t'), {'action': 'store_true'}),
+)
+
+# Depending on the flags, argparse takes args like these as values or as flags.
+_NEGATIVE_NUMBER_PATTERN = re.compile(r'^-\d+$|^-\d*\.\d+$')
 
 
 def CreateParser():
+  import argparse  # pylint: disable=g-import-not-at-top
   parser = argparse.ArgumentParser(add_help=False)
-  parser.add_argument('--verbose', '-v', action='store_true')
-  parser.add_argument('--interactive', '-i', action='store_true')
-  parser.add_argument('--separator', default='-')
-  parser.add_argument('--completion', nargs='?', const='bash', type=str)
-  parser.add_argument('--help', '-h', action='store_true')
-  parser.add_argument('--trace', '-t', action='store_true')
+  for names, kwargs in FLAGS:
+    parser.add_argument(*names, **kwargs)
   # TODO(dbieber): Consider allowing name to be passed as an argument.
   return parser
 
 
+class FlagArgs(object):
+  """The values of the Fire flags, as attributes like argparse's Namespace."""
+
+  def __init__(self, **values):
+    self.__dict__.update(values)
+
+  def __eq__(self, other):
+    return vars(self) == vars(other)
+
+  def __ne__(self, other):
+    return not self == other
+
+  def __repr__(self):
+    return 'FlagArgs({values})'.format(values=', '.join(
+        '{name}={value!r}'.format(name=name, value=value)
+        for name, value in sorted(vars(self).items())))
+
+
+def ParseFlagArgs(flag_args):
+  """Parses the Fire flags in flag_args like CreateParser's parse_known_args.
+
+  The common forms of the flags, such as --separator X, --separator=X and -v,
+  are scanned for without argparse. Anything else, such as an abbreviated flag,
+  combined short flags or an invalid value, is left to CreateParser's parser,
+  which is built once and only then, so that it reports errors the same way.
+
+  Args:
+    flag_args: The args after the final isolated '--'.
+  Returns:
+    A tuple of the FlagArgs with the value of every flag, and a list of the args
+    that are not Fire flags.
+  Raises:
+    SystemExit: From argparse, if a flag is given an invalid value.
+  """
+  try:
+    return _ScanFlagArgs(flag_args)
+  except _UnusualSyntax:
+    parsed_flag_args, unused_args = _GetParser().parse_known_args(flag_args)
+    return FlagArgs(**vars(parsed_flag_args)), unused_args
+
+
+class _UnusualSyntax(Exception):
+  """Raised when flag args should be left to argparse."""
+
+
+def _CompileFlags():
+  """Returns the defaults of FLAGS by dest, and their specs by option string."""
+  defaults = {}
+  specs = {}
+  for names, kwargs in FLAGS:
+    dest = names[0].lstrip('-').replace('-', '_')
+    action = kwargs.get('action', 'store')
+    defaults[dest] = kwargs.get('default', False if action == 'store_true'
+                                else None)
+    spec = (dest, action, kwargs.get('nargs'), kwargs.get('const'),
+            kwargs.get('type'), kwargs.get('choices'))
+    for name in names:
+      specs[name] = spec
+  return defaults, specs
+
+
+_defaults, _specs = _CompileFlags()
+_long_options = tuple(name for name in _specs if name.startswith('--'))
+_parser = None
+
+
+def _GetParser():
+  global _parser
+  if _parser is None:
+    _parser = CreateParser()
+  return _parser
+
+
+def _IsValue(arg):
+  """Returns whether arg is plainly a value rather than a flag."""
+  return not arg.startswith('-') or arg == '-'
+
+
+def _ScanFlagArgs(flag_args):
+  """Parses flag_args for ParseFlagArgs, raising _UnusualSyntax if unsure."""
+  values = dict(_defaults)
+  unused_args = []
+  index = 0
+  while index < len(flag_args):
+    arg = flag_args[index]
+    index += 1
+    if _IsValue(arg):
+      unused_args.append(arg)
+      continue
+    if (arg == '--' or ' ' in arg or _NEGATIVE_NUMBER_PATTERN.match(arg)
+        or (not arg.startswith('--') and len(arg) > 2)):
+      raise _UnusualSyntax()  # E.g. -vi, -j4 or -1.
+    name, has_value, value = arg.partition('=')
+    spec = _specs.get(name)
+    if spec is None:
+      if any(option.startswith(name) for option in _long_options):
+        raise _UnusualSyntax()  # An abbreviation, or an ambiguous one.
+      unused_args.append(arg)
+      continue
+
+    dest, action, nargs, const, convert, choices = spec
+    if action == 'store_true':
+      if has_value:
+        raise _UnusualSyntax()  # An error.
+      values[dest] = True
+      continue
+    if not has_value:
+      if index < len(flag_args) and _IsValue(flag_args[index]):
+        value = flag_args[index]
+        index += 1
+      elif nargs == '?':
+        value = const
+      else:
+        raise _UnusualSyntax()  # An error, as the value is missing.
+    if convert is not None:
+      try:
+        value = convert(value)
+      except Exception:  # pylint: disable=broad-except
+        raise _UnusualSyntax()  # An error, which argparse reports.
+    if choices is not None and value not in choices:
+      raise _UnusualSyntax()  # An error.
+    values[dest] = value
+  return FlagArgs(**values), unused_args
+
+
 def SeparateFlagArgs(args):
   """Splits a list of args into those for Flags and those for Fire.
 
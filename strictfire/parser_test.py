@@ -27,6 +27,51 @@ class ParserTest(testutils.BaseTestCase):
   def testCreateParser(self):
     self.assertIsNotNone(parser.CreateParser())
 
+  def testParseFlagArgsMatchesArgparse(self):
+    argparser = parser.CreateParser()
+    for flag_args in (
+        [],
+        ['--verbose', '-i', '--trace'],
+        ['--separator', 'X', '--separator=-'],
+        ['--completion'],
+        ['--completion', 'fish', '-v'],
+        ['--completion', '--help'],
+        ['--help-all', 'docs', '--help-format=man'],
+        ['--batch', '-', '--batch-format', 'json', '-j', '4'],
+        ['--batch-format=text'],
+        ['--map', 'id', '--jobs=2', '--chunk-size', '8', '--batch-pool',
+         'process'],
+        ['--unknown', 'value', '-x', '--other=1', '-v'],
+        # These are left to argparse.
+        ['--verb'],
+        ['-vi'],
+        ['-j4'],
+        ['--separator', '-1'],
+        ['--separator', 'a b'],
+    ):
+      parsed_flag_args, unused_args = argparser.parse_known_args(flag_args)
+      self.assertEqual(
+          parser.ParseFlagArgs(flag_args),
+          (parser.FlagArgs(**vars(parsed_flag_args)), unused_args),
+          flag_args)
+
+  def testParseFlagArgsErrors(self):
+    for flag_args in (['--jobs', 'many'], ['--separator'], ['--help=yes'],
+                      ['--help-', 'x'], ['--batch-format', 'xml'],
+                      ['--help-format', 'html'], ['--batch-pool', 'bogus'],
+                      ['--jobs', '0'], ['--jobs', '-1'], ['--chunk-size=-2']):
+      with self.assertRaises(SystemExit):
+        with self.assertOutputMatches(stdout=None, stderr='error'):
+          parser.ParseFlagArgs(flag_args)
+
+  def testParseFlagArgsDefaults(self):
+    parsed_flag_args, unused_args = parser.ParseFlagArgs([])
+    self.assertEqual(unused_args, [])
+    self.assertFalse(parsed_flag_args.verbose)
+    self.assertEqual(parsed_flag_args.separator, '-')
+    self.assertIsNone(parsed_flag_args.completion)
+    self.assertEqual(parsed_flag_args.jobs, 1)
+
   def testSeparateFlagArgs(self):
     self.assertEqual(parser.SeparateFlagArgs([]), ([], []))
     self.assertEqual(parser.SeparateFlagArgs(['a', 'b']), (['a', 'b'], []))
@@ -0,0 +1,431 @@
+# Copyright (C) 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Serves a Fire CLI from a daemon that keeps its component loaded.
+
+A daemon started with Serve listens on a UNIX socket. Connect sends it the
+args of a command, along with the current directory, the environment and the
+file descriptors of stdin, stdout and stderr. The daemon forks a process for
+the command, which runs it with StrictFire as if it had been run by the
+client, writing directly to the client's stdout and stderr. Its exit code is
+sent back to the client once it is done.
+
+Since each command runs in its own forked process, a command cannot affect the
+ones after it, while all of them share what the daemon loaded once. Before
+serving, the daemon also resolves the argspecs and docstrings of the
+component's commands with Prewarm, so that the forked processes inherit them
+rather than each resolving them again.
+
+  python -m strictfire --serve module &
+  python -m strictfire --connect module [arg] ...
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import array
+import gc
+import inspect
+import io
+import json
+import os
+import re
+import signal
+import socket
+import stat
+import struct
+import sys
+import tempfile
+import time
+import traceback
+
+from strictfire import completion
+from strictfire import core
+from strictfire import docstrings
+from strictfire import inspectutils
+from strictfire import lazy
+from strictfire import value_types
+from strictfire.console import console_attr
+from strictfire.console import console_attr_os
+
+# How long a daemon waits for a command before it exits, in seconds.
+IDLE_TIMEOUT = 600
+
+# Like completion scripts and manifests, prewarming covers this many levels of
+# members.
+PREWARM_DEPTH = 3
+
+# The file descriptors a client sends, which the command runs with.
+_STANDARD_FDS = (0, 1, 2)
+
+# The request is sent as its length and then its JSON. The daemon sends the
+# pid of the process running the command, and then its exit code.
+_LENGTH = struct.Struct('!I')
+_INT = struct.Struct('!i')
+
+# The pid, uid and gid of a UNIX socket's peer, as SO_PEERCRED returns them.
+_CREDENTIALS = struct.Struct('3i')
+
+_UNSAFE_FILENAME_PATTERN = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+def DefaultAddress(name):
+  """Returns the path of the socket a daemon for the CLI name listens on.
+
+  The socket is in $XDG_RUNTIME_DIR if it is set, and otherwise in a directory
+  of the temporary directory that only the current user can access, which is
+  created if needed.
+
+  Args:
+    name: The name of the CLI.
+  Returns:
+    The path of the socket.
+  Raises:
+    NotImplementedError: If the platform cannot serve CLIs.
+    IOError: If the directory of the socket can be accessed by other users.
+  """
+  _CheckSupported()
+  directory = os.environ.get('XDG_RUNTIME_DIR')
+  if not directory:
+    directory = os.path.join(tempfile.gettempdir(),
+                             'strictfire-{uid}'.format(uid=os.getuid()))
+    try:
+      os.mkdir(directory, 0o700)
+    except OSError:
+      if not os.path.isdir(directory):
+        raise
+  _CheckPrivate(directory)
+  filename = 'strictfire-{name}.sock'.format(
+      name=_UNSAFE_FILENAME_PATTERN.sub('_', name))
+  return os.path.join(directory, filename)
+
+
+def Serve(component, name, address=None, idle_timeout=IDLE_TIMEOUT,
+          prewarm=True):
+  """Runs the commands that clients send for component until idle.
+
+  Args:
+    component: The component to run commands against.
+    name: The name of the CLI.
+    address: The path of the UNIX socket to listen on, DefaultAddress(name) if
+      None. Only the current user can connect to it.
+    idle_timeout: How long to wait, in seconds, for a command before returning.
+      The daemon is not idle while a command is running.
+    prewarm: Whether to Prewarm component before serving.
+  Raises:
+    NotImplementedError: If the platform cannot pass file descriptors over UNIX
+      sockets or fork.
+    IOError: If another daemon is listening on address.
+  """
+  _CheckSupported()
+  _OpenStandardFds()
+  address = address or DefaultAddress(name)
+  if os.path.exists(address):
+    if _IsListening(address):
+      raise IOError('A daemon is already listening on {address}.'.format(
+          address=address))
+    os.remove(address)
+
+  listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  umask = os.umask(0o077)
+  try:
+    listener.bind(address)
+  finally:
+    os.umask(umask)
+  listener.listen(socket.SOMAXCONN)
+
+  if prewarm:
+    Prewarm(component)
+  if hasattr(gc, 'freeze'):
+    # Keeps the garbage collector of the forked processes from writing to, and
+    # so copying, the memory holding everything loaded so far.
+    gc.freeze()
+
+  children = set()
+  last_active = time.time()
+  try:
+    while True:
+      _ReapChildren(children)
+      if children:
+        last_active = time.time()
+      remaining = idle_timeout - (time.time() - last_active)
+      if remaining <= 0:
+        return
+      # Wake up at least every second to reap the finished commands.
+      listener.settimeout(min(remaining, 1.0))
+      try:
+        connection, _ = listener.accept()
+      except socket.timeout:
+        continue
+      last_active = time.time()
+      for stream in (sys.stdout, sys.stderr):
+        stream.flush()
+      pid = os.fork()
+      if pid == 0:
+        listener.close()
+        _HandleConnection(component, name, connection)
+      children.add(pid)
+      connection.close()
+  finally:
+    listener.close()
+    if os.path.exists(address):
+      os.remove(address)
+
+
+def Prewarm(component, depth=PREWARM_DEPTH):
+  """Resolves the argspecs and docstrings of component's commands.
+
+  This fills the caches of inspectutils.GetFullArgSpec and docstrings.parse
+  with what running or getting help for the commands up to depth levels below
+  component looks up. Like help screens, it neither evaluates properties nor
+  imports lazy members.
+
+  Args:
+    component: The component whose commands to resolve.
+    depth: How many levels of members to resolve.
+  Returns:
+    The number of routines and classes resolved.
+  """
+  return _Prewarm(component, depth, set())
+
+
+def _Prewarm(component, depth, seen):
+  if id(component) in seen:
+    return 0
+  seen.add(id(component))
+  docstrings.parse(inspect.getdoc(component))
+  count = 0
+  if inspect.isroutine(component) or inspect.isclass(component):
+    inspectutils.GetFullArgSpec(component)
+    count += 1
+  if (depth < 1 or inspect.isroutine(component)
+      or value_types.Classify(component) == (value_types.VALUE,)
+      or isinstance(component, (lazy.LazyGroup, list, tuple, set, frozenset))):
+    return count
+  class_attrs = {} if inspect.isclass(component) else None
+  for _, member in completion.VisibleMembers(
+      component, class_attrs=class_attrs, static=True):
+    if (inspectutils.IsUnevaluatedDescriptor(member)
+        or isinstance(member, lazy.LazyTarget)):
+      continue
+    count += _Prewarm(member, depth - 1, seen)
+  return count
+
+
+def Connect(address, args, files=None):
+  """Runs a command on the daemon listening on address, as if it ran here.
+
+  Args:
+    address: The path of the daemon's UNIX socket.
+    args: The args of the command.
+    files: The stdin, stdout and stderr to run the command with, as files or
+      file descriptors. The standard ones by default.
+  Returns:
+    The exit code of the command.
+  Raises:
+    NotImplementedError: If the platform cannot pass file descriptors over UNIX
+      sockets.
+    IOError: If the daemon cannot be reached, belongs to another user, or stops
+      before the command is done.
+  """
+  _CheckSupported()
+  if files is None:
+    files = _STANDARD_FDS
+  fds = [f if isinstance(f, int) else f.fileno() for f in files]
+  request = json.dumps({
+      'args': list(args),
+      'cwd': os.getcwd(),
+      'env': dict(os.environ),
+  }).encode('utf-8')
+
+  connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  try:
+    try:
+      uid = os.stat(address).st_uid
+      connection.connect(address)
+    except (IOError, OSError, socket.error):
+      raise IOError('No daemon is listening on {address}; start one with '
+                    '--serve.'.format(address=address))
+    _CheckOwner(address, uid)
+    if hasattr(socket, 'SO_PEERCRED'):
+      credentials = connection.getsockopt(
+          socket.SOL_SOCKET, socket.SO_PEERCRED, _CREDENTIALS.size)
+      _CheckOwner(address, _CREDENTIALS.unpack(credentials)[1])
+    connection.sendmsg(
+        [_LENGTH.pack(len(request))],
+        [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array('i', fds))])
+    connection.sendall(request)
+    pid, = _INT.unpack(_Receive(connection, _INT.size))
+    while True:
+      try:
+        code, = _INT.unpack(_Receive(connection, _INT.size))
+        return code
+      except KeyboardInterrupt:
+        # The command does not run in the terminal's foreground process group,
+        # so it is interrupted on the client's behalf.
+        os.kill(pid, signal.SIGINT)
+  finally:
+    connection.close()
+
+
+def _CheckPrivate(directory):
+  """Raises IOError unless only the current user can access directory."""
+  status = os.lstat(directory)
+  if (not stat.S_ISDIR(status.st_mode) or status.st_uid != os.getuid()
+      or stat.S_IMODE(status.st_mode) & 0o077):
+    raise IOError(
+        '{directory} must be a directory that only its owner can access.'
+        .format(directory=directory))
+
+
+def _CheckOwner(address, uid):
+  """Raises IOError unless the daemon on address runs as the current user."""
+  if uid != os.getuid():
+    raise IOError('The daemon listening on {address} belongs to another user.'
+                  .format(address=address))
+
+
+def _CheckSupported():
+  if not (hasattr(socket, 'AF_UNIX') and hasattr(socket, 'SCM_RIGHTS')
+          and hasattr(socket.socket, 'sendmsg') and hasattr(os, 'fork')):
+    raise NotImplementedError(
+        'Serving a CLI requires UNIX sockets that can pass file descriptors, '
+        'and fork.')
+
+
+def _OpenStandardFds():
+  """Opens os.devnull as the standard fds that are closed.
+
+  Otherwise sockets, and the files clients send, could be given those fds, and
+  be replaced by the client's files in the processes running commands.
+  """
+  for fd in _STANDARD_FDS:
+    try:
+      os.fstat(fd)
+    except OSError:
+      null = os.open(os.devnull, os.O_RDWR)
+      if null != fd:
+        os.dup2(null, fd)
+        os.close(null)
+
+
+def _IsListening(address):
+  """Returns whether a daemon accepts connections on address."""
+  probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  try:
+    probe.connect(address)
+  except socket.error:
+    return False
+  finally:
+    probe.close()
+  return True
+
+
+def _ReapChildren(children):
+  """Forgets the processes in children that have finished running a command."""
+  for pid in list(children):
+    try:
+      finished, _ = os.waitpid(pid, os.WNOHANG)
+    except OSError:  # The process was already reaped.
+      finished = pid
+    if finished:
+      children.discard(pid)
+
+
+def _Receive(connection, size):
+  """Returns the next size bytes from connection."""
+  data = b''
+  while len(data) < size:
+    chunk = connection.recv(size - len(data))
+    if not chunk:
+      raise IOError('The connection was closed.')
+    data += chunk
+  return data
+
+
+def _HandleConnection(component, name, connection):
+  """Runs the command a client sent on connection, in a forked process."""
+  code = 1
+  try:
+    connection.sendall(_INT.pack(os.getpid()))
+    code = _RunRequest(component, name, connection)
+  except BaseException:  # pylint: disable=broad-except
+    traceback.print_exc()
+  finally:
+    try:
+      connection.sendall(_INT.pack(code))
+    except socket.error:
+      pass
+    # Don't run the daemon's cleanup, e.g. removing the socket.
+    os._exit(0)  # pylint: disable=protected-access
+
+
+def _RunRequest(component, name, connection):
+  """Runs the command of the request on connection, returning its exit code."""
+  fds = array.array('i')
+  data, ancdata, _, _ = connection.recvmsg(
+      _LENGTH.size, socket.CMSG_LEN(len(_STANDARD_FDS) * fds.itemsize))
+  for level, kind, fd_data in ancdata:
+    if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+      fds.frombytes(fd_data[:len(fd_data) - len(fd_data) % fds.itemsize])
+  for target, fd in zip(_STANDARD_FDS, fds):
+    os.dup2(fd, target)
+    os.close(fd)
+  data += _Receive(connection, _LENGTH.size - len(data))
+  length, = _LENGTH.unpack(data)
+  request = json.loads(_Receive(connection, length).decode('utf-8'))
+
+  os.chdir(request['cwd'])
+  os.environ.clear()
+  os.environ.update(request['env'])
+  sys.argv = [name] + request['args']
+  # Buffer output as if the daemon had been started with the client's files,
+  # and forget the daemon's terminal, if any.
+  sys.stdin = _Reopen(0, 'r', sys.stdin)
+  sys.stdout = _Reopen(1, 'w', sys.stdout, line_buffering=os.isatty(1))
+  sys.stderr = _Reopen(2, 'w', sys.stderr, line_buffering=True)
+  console_attr_os.ResetTerminalSnapshot()
+  console_attr.ResetConsoleAttr()
+  signal.signal(signal.SIGINT, signal.default_int_handler)
+  try:
+    core.StrictFire(component, command=request['args'], name=name)
+  except SystemExit as e:
+    return _ExitCode(e.code)
+  except KeyboardInterrupt:
+    return 128 + signal.SIGINT
+  except BaseException:  # pylint: disable=broad-except
+    traceback.print_exc()
+    return 1
+  finally:
+    for stream in (sys.stdout, sys.stderr):
+      stream.flush()
+  return 0
+
+
+def _Reopen(fd, mode, stream, line_buffering=False):
+  """Returns a text stream for fd, with the encoding of stream if any."""
+  return io.open(fd, mode, buffering=1 if line_buffering else -1,
+                 encoding=getattr(stream, 'encoding', None),
+                 errors=getattr(stream, 'errors', None), closefd=False)
+
+
+def _ExitCode(code):
+  """Returns the exit code of a process that raised SystemExit(code)."""
+  if code is None:
+    return 0
+  if isinstance(code, int):
+    return code
+  print(code, file=sys.stderr)
+  return 1
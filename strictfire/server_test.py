@@ -0,0 +1,190 @@
+# Copyright (C) 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the server module."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import signal
+import stat
+import tempfile
+import time
+
+import mock
+
+from strictfire import inspectutils
+from strictfire import server
+from strictfire import testutils
+
+
+class Counter(object):
+
+  def __init__(self):
+    self.count = 0
+
+  def increment(self):
+    self.count += 1
+    return self.count
+
+  def cwd(self):
+    return os.getcwd()
+
+  def env(self, name):
+    return os.environ.get(name)
+
+  def add(self, x, y):
+    return x + y
+
+
+def _IsSupported():
+  try:
+    server._CheckSupported()  # pylint: disable=protected-access
+  except NotImplementedError:
+    return False
+  return True
+
+
+@testutils.skipIf(not _IsSupported(), 'Requires UNIX sockets and fork.')
+class ServerTest(testutils.BaseTestCase):
+
+  def setUp(self):
+    super(ServerTest, self).setUp()
+    self.directory = tempfile.mkdtemp()
+    self.address = os.path.join(self.directory, 'counter.sock')
+    self.daemon = self._StartDaemon(idle_timeout=30)
+
+  def tearDown(self):
+    if self.daemon:
+      os.kill(self.daemon, signal.SIGTERM)
+      os.waitpid(self.daemon, 0)
+    shutil.rmtree(self.directory)
+    super(ServerTest, self).tearDown()
+
+  def _StartDaemon(self, idle_timeout, closed_fds=()):
+    pid = os.fork()
+    if pid == 0:
+      try:
+        for fd in closed_fds:
+          os.close(fd)
+        server.Serve(Counter(), 'counter', self.address,
+                     idle_timeout=idle_timeout)
+      finally:
+        os._exit(0)  # pylint: disable=protected-access
+    for _ in range(100):
+      if server._IsListening(self.address):  # pylint: disable=protected-access
+        break
+      time.sleep(0.05)
+    return pid
+
+  def _Connect(self, args):
+    """Runs args on the daemon, returning the exit code, stdout and stderr."""
+    paths = [os.path.join(self.directory, name)
+             for name in ('stdin', 'stdout', 'stderr')]
+    open(paths[0], 'w').close()
+    with open(paths[0]) as stdin, open(paths[1], 'w') as stdout, \
+        open(paths[2], 'w') as stderr:
+      code = server.Connect(self.address, args, files=(stdin, stdout, stderr))
+    outputs = []
+    for path in paths[1:]:
+      with open(path) as f:
+        outputs.append(f.read())
+    return code, outputs[0], outputs[1]
+
+  def testRunsCommand(self):
+    self.assertEqual(self._Connect(['add', '1', '2']), (0, '3\n', ''))
+
+  def testCommandsAreIsolated(self):
+    self.assertEqual(self._Connect(['increment']), (0, '1\n', ''))
+    self.assertEqual(self._Connect(['increment']), (0, '1\n', ''))
+
+  def testUsageError(self):
+    code, stdout, stderr = self._Connect(['add', '1'])
+    self.assertEqual(code, 2)
+    self.assertEqual(stdout, '')
+    self.assertIn('Usage: counter add X Y', stderr)
+
+  def testRunsInClientDirectoryAndEnvironment(self):
+    cwd = os.getcwd()
+    os.environ['STRICTFIRE_SERVER_TEST'] = 'value'
+    try:
+      os.chdir(self.directory)
+      self.assertEqual(self._Connect(['cwd'])[1],
+                       os.path.realpath(self.directory) + '\n')
+      self.assertEqual(self._Connect(['env', 'STRICTFIRE_SERVER_TEST'])[1],
+                       'value\n')
+    finally:
+      os.chdir(cwd)
+      del os.environ['STRICTFIRE_SERVER_TEST']
+
+  def testRefusesSecondDaemon(self):
+    with self.assertRaisesRegex(IOError, 'already listening'):
+      server.Serve(Counter(), 'counter', self.address)
+
+  def testExitsWhenIdle(self):
+    os.kill(self.daemon, signal.SIGTERM)
+    os.waitpid(self.daemon, 0)
+    self.daemon = None
+    pid = self._StartDaemon(idle_timeout=0.5)
+    self.assertEqual(self._Connect(['add', '2', '3']), (0, '5\n', ''))
+    os.waitpid(pid, 0)
+    self.assertFalse(os.path.exists(self.address))
+
+  def testDaemonWithoutStandardFds(self):
+    os.kill(self.daemon, signal.SIGTERM)
+    os.waitpid(self.daemon, 0)
+    self.daemon = self._StartDaemon(idle_timeout=30, closed_fds=(0, 1))
+    self.assertEqual(self._Connect(['add', '2', '3']), (0, '5\n', ''))
+
+  def testPrewarm(self):
+    component = Counter()
+    self.assertEqual(server.Prewarm(component), 4)
+    self.assertIn(Counter.add,
+                  inspectutils._full_arg_spec_cache)  # pylint: disable=protected-access
+    self.assertEqual(server.Prewarm(Counter, depth=0), 1)
+
+  def testRefusesDaemonOfAnotherUser(self):
+    with mock.patch.object(os, 'getuid', return_value=os.getuid() + 1):
+      with self.assertRaisesRegex(IOError, 'another user'):
+        self._Connect(['add', '1', '2'])
+
+  def testConnectWithoutDaemon(self):
+    with self.assertRaisesRegex(IOError, 'No daemon is listening'):
+      server.Connect(os.path.join(self.directory, 'missing.sock'), [])
+
+  def testDefaultAddress(self):
+    with mock.patch.dict(os.environ, {'XDG_RUNTIME_DIR': ''}):
+      address = server.DefaultAddress('path/to module.py')
+    directory = os.path.dirname(address)
+    self.assertEqual(os.path.dirname(directory), tempfile.gettempdir())
+    self.assertEqual(stat.S_IMODE(os.stat(directory).st_mode), 0o700)
+    self.assertEqual(os.path.basename(address),
+                     'strictfire-path_to_module.py.sock')
+
+  def testDefaultAddressInRuntimeDirectory(self):
+    os.chmod(self.directory, 0o700)
+    with mock.patch.dict(os.environ, {'XDG_RUNTIME_DIR': self.directory}):
+      self.assertEqual(server.DefaultAddress('counter'),
+                       os.path.join(self.directory, 'strictfire-counter.sock'))
+    os.chmod(self.directory, 0o755)
+    with mock.patch.dict(os.environ, {'XDG_RUNTIME_DIR': self.directory}):
+      with self.assertRaisesRegex(IOError, 'only its owner'):
+        server.DefaultAddress('counter')
+
+
+if __name__ == '__main__':
+  testutils.main()
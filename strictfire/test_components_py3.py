@@ -52,10 +52,32 @@ def lru_cache_decorated(arg1):
 
 class WithAsyncio(object):
 
+  def __init__(self):
+    self.loops = []
+
   @asyncio.coroutine
   def double(self, count=0):
     return 2 * count
 
+  async def triple(self, count=0):
+    return 3 * count
+
+  def deferred_triple(self, count=0):
+    return self.triple(count)
+
+  async def countdown(self, count=3):
+    for i in range(count, 0, -1):
+      await asyncio.sleep(0)
+      yield i
+
+  async def chain(self):
+    self.loops.append(asyncio.get_event_loop())
+    return self
+
+  async def loop_count(self):
+    self.loops.append(asyncio.get_event_loop())
+    return len(set(self.loops))
+
 
 class WithTypes(object):
   """Class with functions that have default arguments and types."""
@@ -63,6 +63,9 @@ class FireTrace(object):
     self.verbose = verbose
     self.show_help = show_help
     self.show_trace = show_trace
+    # With --map, the args left for the final routine or class, which is then
+    # called for each line of stdin rather than by Fire.
+    self.map_args = None
 
   def GetResult(self):
     """Returns the component from the last element of the trace."""
@@ -19,6 +19,7 @@ from __future__ import division
 from __future__ import print_function
 
 import inspect
+import weakref
 
 from strictfire import inspectutils
 import six
@@ -27,10 +28,42 @@ import six
 VALUE_TYPES = (bool, six.string_types, six.integer_types, float, complex,
                type(Ellipsis), type(None), type(NotImplemented))
 
+# The kinds of components that help screens list, as returned by Classify.
+GROUP = 'group'
+COMMAND = 'command'
+VALUE = 'value'
+
+# HasCustomStr's result for each type. It depends only on the type, and is
+# expensive to compute since it classifies every attribute along the MRO.
+_has_custom_str_by_type = weakref.WeakKeyDictionary()
+
+
+def Classify(component):
+  """Returns the kinds of component, in a single pass.
+
+  This is equivalent to checking IsGroup, IsCommand and IsValue separately, but
+  checks whether component is a command and whether it is a value only once.
+
+  Args:
+    component: The component to classify.
+  Returns:
+    A non-empty tuple of the kinds of component. It is (GROUP,) for groups, and
+    otherwise contains COMMAND, VALUE or both, in that order.
+  """
+  is_command = IsCommand(component)
+  is_value = IsValue(component)
+  if is_command and is_value:
+    return (COMMAND, VALUE)
+  if is_command:
+    return (COMMAND,)
+  if is_value:
+    return (VALUE,)
+  return (GROUP,)
+
 
 def IsGroup(component):
   # TODO(dbieber): Check if there are any subcomponents.
-  return not IsCommand(component) and not IsValue(component)
+  return Classify(component) == (GROUP,)
 
 
 def IsCommand(component):
@@ -77,9 +110,20 @@ def HasCustomStr(component):
   Returns:
     Whether `component` has a custom __str__ method.
   """
-  if hasattr(component, '__str__'):
-    class_attrs = inspectutils.GetClassAttrsDict(type(component)) or {}
-    str_attr = class_attrs.get('__str__')
-    if str_attr and str_attr.defining_class is not object:
-      return True
-  return False
+  if not hasattr(component, '__str__'):
+    return False
+  type_ = type(component)
+  try:
+    return _has_custom_str_by_type[type_]
+  except (KeyError, TypeError):
+    pass
+  class_attrs = inspectutils.GetClassAttrsDict(type_) or {}
+  str_attr = class_attrs.get('__str__')
+  has_custom_str = bool(str_attr and str_attr.defining_class is not object)
+  try:
+    _has_custom_str_by_type[type_] = has_custom_str
+  except TypeError:
+    # Some types, e.g. old-style classes in Python 2, cannot be weakly
+    # referenced. Their results are not cached.
+    pass
+  return has_custom_str
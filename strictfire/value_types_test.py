@@ -0,0 +1,71 @@
+# Copyright (C) 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the value_types module."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from strictfire import inspectutils
+from strictfire import test_components as tc
+from strictfire import testutils
+from strictfire import value_types
+
+import mock
+
+
+class ValueTypesTest(testutils.BaseTestCase):
+
+  def testClassifyMatchesPredicates(self):
+    for component in (tc, tc.NoDefaults, tc.NoDefaults(), tc.identity, 1, 'a',
+                      None, {'a': 1}, [1], tc.BinaryCanvas(), tc.Color.RED,
+                      tc.Subdict(), len, str.upper):
+      kinds = value_types.Classify(component)
+      self.assertEqual(value_types.GROUP in kinds,
+                       value_types.IsGroup(component))
+      self.assertEqual(value_types.COMMAND in kinds,
+                       value_types.IsCommand(component))
+      self.assertEqual(value_types.VALUE in kinds,
+                       value_types.IsValue(component))
+
+  def testClassify(self):
+    self.assertEqual(value_types.Classify(tc.NoDefaults),
+                     (value_types.COMMAND,))
+    self.assertEqual(value_types.Classify(tc.BinaryCanvas()),
+                     (value_types.VALUE,))
+    self.assertEqual(value_types.Classify(tc.NoDefaults()),
+                     (value_types.GROUP,))
+
+  def testHasCustomStrIsCachedPerType(self):
+
+    class Local(object):
+
+      def __str__(self):
+        return 'local'
+
+    class LocalWithoutStr(object):
+      pass
+
+    with mock.patch.object(inspectutils, 'GetClassAttrsDict',
+                           wraps=inspectutils.GetClassAttrsDict) as attrs:
+      self.assertTrue(value_types.HasCustomStr(Local()))
+      self.assertTrue(value_types.HasCustomStr(Local()))
+      self.assertFalse(value_types.HasCustomStr(LocalWithoutStr()))
+      self.assertFalse(value_types.HasCustomStr(LocalWithoutStr()))
+    self.assertEqual(attrs.call_count, 2)
+
+
+if __name__ == '__main__':
+  testutils.main()